@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+NCSU Research Assistant - HTTP API
+==================================
+
+A small JSON API around NCSUAdvancedResearcher.research for services that
+would rather not go through the Streamlit interface. Uses asyncio and the
+standard library only.
+
+Endpoints:
+    POST   /research         {"query": "...", "config": {...}} -> research results
+                             (add "wait": false to get a job id back immediately);
+                             a failed run answers 500, or 502 when the LLM failed
+    POST   /research/stream  same body, answered as server-sent events: stage
+                             progress, then the whole answer in one event
+    GET    /jobs/<id>        status, progress and (once done) results of a run
+    DELETE /jobs/<id>        cancel a run
+    GET    /health           worker, queue and shared resource statistics
+
+Identical queries (same normalized text and config overrides) that arrive
+while one is still running share that run instead of starting another.
+
+Usage:
+    python api_server.py --port 8000 --workers 4
+    python api_server.py --config api_config.yaml --set llm_provider=mock
+    curl -X POST localhost:8000/research -d '{"query": "How do I apply for graduation?"}'
+    curl -N -X POST localhost:8000/research/stream -d '{"query": "How do I apply for graduation?"}'
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from http import HTTPStatus
+from typing import Any, Dict, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from ncsu_advanced_config_base import LLMProviderError, NCSUAdvancedResearcher
+from utils.config import load_config
+from utils.history import normalize_query
+from utils.jobs import DONE, FAILED, FINISHED, JobQueue, ResearchJob
+from utils.logger import configure_logging
+from utils.registry import get_registry
+
+# Settings a client may change per request; everything else (provider keys,
+# output paths, target site) is fixed by whoever runs the server
+REQUEST_CONFIG_KEYS = (
+    'top_k', 'max_pages', 'relevance_threshold', 'enable_grading', 'enhanced_extraction',
+    'pipeline_mode', 'early_stop_pages', 'early_stop_tokens', 'early_stop_score', 'snippet_first', 'snippet_confidence',
+    'min_content_length', 'max_content_length',
+)
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class HTTPError(Exception):
+    """Turned into a JSON error response"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ResearchService:
+    """Queues research runs on a worker pool and coalesces identical in-flight queries"""
+
+    def __init__(self, base_config: Dict[str, Any], workers: int = 2, max_queued: int = 50,
+                 save_results: bool = True):
+        self.base_config = base_config
+        self.max_queued = max_queued
+        self.save = save_results
+        self.registry = get_registry()
+        self.jobs = JobQueue(self._run, workers=workers)
+        self._inflight: Dict[str, ResearchJob] = {}
+        self.coalesced = 0
+        self.logger = logging.getLogger(__name__)
+
+    def _run(self, job: ResearchJob, progress) -> Dict[str, Any]:
+        researcher = NCSUAdvancedResearcher(job.config, registry=self.registry)
+        results = researcher.research(job.query, progress=progress)
+        saved_files = researcher.save_results(results) if self.save else {}
+        return {'results': results, 'saved_files': saved_files}
+
+    @staticmethod
+    def _key(query: str, overrides: Dict[str, Any]) -> str:
+        # Same normalization as the grade, search and answer caches
+        return json.dumps([normalize_query(query), overrides], sort_keys=True)
+
+    def start(self, query: str, overrides: Dict[str, Any]) -> Tuple[ResearchJob, bool]:
+        """Return the job answering ``query`` and whether it was already running"""
+        key = self._key(query, overrides)
+        job = self._inflight.get(key)
+        if job is not None and job.status not in FINISHED and not job.cancel_event.is_set():
+            self.coalesced += 1
+            return job, True
+
+        stats = self.jobs.stats()
+        if stats['queued'] >= self.max_queued:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Research queue is full, try again later")
+        self._inflight = {k: j for k, j in self._inflight.items() if j.status not in FINISHED}
+        job = self.jobs.submit(query, dict(self.base_config, **overrides))
+        self._inflight[key] = job
+        return job, False
+
+    async def wait(self, job: ResearchJob):
+        """Wait for ``job`` to finish without tying up an event loop thread"""
+        async for _ in self.events(job):
+            pass
+
+    async def events(self, job: ResearchJob):
+        """Yield a job's progress events as they happen, ending with its 'finished' event"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def listener(event):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:  # loop already closed
+                pass
+
+        try:
+            for event in job.subscribe(listener):
+                yield event
+                if event['stage'] == 'finished':
+                    return
+            while True:
+                event = await queue.get()
+                yield event
+                if event['stage'] == 'finished':
+                    return
+        finally:
+            job.unsubscribe(listener)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'jobs': self.jobs.stats(),
+            'coalesced_requests': self.coalesced,
+            'resources': self.registry.stats(),
+        }
+
+
+def job_payload(job: ResearchJob, coalesced: bool = False, include_pages: bool = False) -> Dict[str, Any]:
+    """JSON body describing a job, with its results once it is done"""
+    payload = dict(job.snapshot(), coalesced=coalesced)
+    payload.pop('stages', None)
+    if job.status == DONE:
+        results = job.result['results']
+        payload['results'] = results if include_pages else {k: v for k, v in results.items() if k != 'pages'}
+        payload['saved_files'] = job.result['saved_files']
+    return payload
+
+
+def result_status(job: ResearchJob) -> HTTPStatus:
+    """HTTP status for a finished job: 502 when the LLM failed, 500 for any other failure"""
+    if job.status == FAILED:
+        return HTTPStatus.BAD_GATEWAY if isinstance(job.exception, LLMProviderError) else HTTPStatus.INTERNAL_SERVER_ERROR
+    if job.status == DONE and job.result['results'].get('answer_error'):
+        # The pipeline finished but the answer is a placeholder
+        return HTTPStatus.BAD_GATEWAY
+    return HTTPStatus.OK
+
+
+def parse_request_body(body: bytes) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """Validate a research request; returns (query, config overrides, full body)"""
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+    query = data.get('query')
+    if not isinstance(query, str) or not query.strip():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "'query' is required")
+    overrides = data.get('config') or {}
+    if not isinstance(overrides, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "'config' must be an object")
+    unknown = sorted(set(overrides) - set(REQUEST_CONFIG_KEYS))
+    if unknown:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Config keys not allowed per request: {', '.join(unknown)}")
+    return query.strip(), overrides, data
+
+
+class APIServer:
+    """Minimal HTTP/1.1 server (one request per connection) on asyncio streams"""
+
+    def __init__(self, service: ResearchService, host: str = '127.0.0.1', port: int = 8000):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger(__name__)
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"🌐 NCSU research API listening on http://{self.host}:{self.port} "
+              f"({self.service.jobs.workers} workers)")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, path, body = await self._read_request(reader)
+            await self._route(method, path, body, writer)
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # client went away; its job (possibly shared) keeps running
+        except Exception as e:
+            self.logger.exception("Unhandled API error")
+            await self._send_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)})
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        if not request_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        try:
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), urlparse(target).path.rstrip('/') or '/', body
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        if path == '/health' and method == 'GET':
+            await self._send_json(writer, HTTPStatus.OK, dict(self.service.stats(), status='ok'))
+        elif path == '/research' and method == 'POST':
+            query, overrides, data = parse_request_body(body)
+            job, coalesced = self.service.start(query, overrides)
+            if data.get('wait', True):
+                await self.service.wait(job)
+                await self._send_json(writer, result_status(job),
+                                      job_payload(job, coalesced, data.get('include_pages', False)))
+            else:
+                await self._send_json(writer, HTTPStatus.ACCEPTED, job_payload(job, coalesced))
+        elif path == '/research/stream' and method == 'POST':
+            query, overrides, _ = parse_request_body(body)
+            job, coalesced = self.service.start(query, overrides)
+            await self._stream(writer, job, coalesced)
+        elif path.startswith('/jobs/') and method in ('GET', 'DELETE'):
+            job = self.service.jobs.get(path[len('/jobs/'):])
+            if job is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown job")
+            if method == 'DELETE':
+                job.cancel()
+            await self._send_json(writer, HTTPStatus.OK, job_payload(job))
+        else:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+
+    async def _stream(self, writer: asyncio.StreamWriter, job: ResearchJob, coalesced: bool):
+        """Send progress as server-sent events, then the answer and sources
+
+        The answer is generated in one LLM call, so it arrives whole in a single
+        'answer' event rather than as chunks.
+        """
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+        await self._send_event(writer, 'job', {'id': job.id, 'coalesced': coalesced})
+        async for event in self.service.events(job):
+            if event['stage'] != 'finished':
+                await self._send_event(writer, 'progress', event)
+
+        if job.status == DONE:
+            results = job.result['results']
+            await self._send_event(writer, 'answer', {
+                'query': results['query'],
+                'answer': results['final_answer'],
+                'answer_error': results.get('answer_error'),
+                'answer_path': results.get('answer_path'),
+                'answer_reused': results.get('answer_reused'),
+                'sources': results['sources'],
+            })
+        else:
+            await self._send_event(writer, 'error', {'status': job.status, 'error': job.error})
+        await self._send_event(writer, 'done', {'status': job.status})
+
+    @staticmethod
+    async def _send_event(writer: asyncio.StreamWriter, name: str, data: Dict[str, Any]):
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        writer.write(f"event: {name}\ndata: {payload}\n\n".encode('utf-8'))
+        await writer.drain()
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: HTTPStatus, data: Dict[str, Any]):
+        body = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP JSON API for NCSU research")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=int(os.getenv('NCSU_RESEARCH_WORKERS', '2')),
+                        help="Research runs that may execute at once")
+    parser.add_argument('--max-queued', type=int, default=50,
+                        help="Reject new runs with 503 once this many are waiting")
+    parser.add_argument('--config', help="YAML or JSON file with researcher config")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="Extra researcher config (value parsed as JSON when possible)")
+    parser.add_argument('--no-save', dest='save', action='store_false',
+                        help="Don't write results to output_dir")
+    parser.add_argument('--log-format', choices=('text', 'json'), default=os.getenv('NCSU_LOG_FORMAT', 'text'),
+                        help="json writes one object per log record, tagged with the job id")
+    args = parser.parse_args()
+
+    configure_logging(args.log_format)
+    config = load_config(args.config, args.set)
+    # Step summaries only; per-result lines from every request would flood the log
+    config.setdefault('verbosity', 'normal')
+    service = ResearchService(config, workers=args.workers, max_queued=args.max_queued, save_results=args.save)
+    try:
+        asyncio.run(APIServer(service, args.host, args.port).serve())
+    except KeyboardInterrupt:
+        service.jobs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+NCSU Batch Research
+===================
+
+Runs every query in a JSON Lines file through NCSUAdvancedResearcher and
+streams one result record per query to an output JSON Lines file. Intended
+for pre-computing answers to frequently asked questions overnight.
+
+Input lines are either a JSON string or an object:
+    {"id": "grad-apply", "query": "How do I apply for graduation?", "config": {"max_pages": 10}}
+
+Queries run in parallel on one process-wide resource registry, so the LLM
+client, scraper HTTP session, grade cache and research history (page reuse)
+are shared by the whole batch. Records are appended and flushed as each
+query finishes; rerunning with the same output file skips queries that
+already succeeded, so a crashed batch picks up where it stopped.
+
+Usage:
+    python batch_research.py faq_queries.jsonl --output faq_answers.jsonl --parallel 4
+    python batch_research.py faq_queries.jsonl -o faq_answers.jsonl --config batch.yaml --set max_pages=10
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Set
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from ncsu_advanced_config_base import NCSUAdvancedResearcher
+from utils.config import load_config
+from utils.logger import configure_logging, correlation_scope
+from utils.metrics import percentile
+from utils.registry import get_registry
+
+
+def read_queries(path: str) -> List[Dict[str, Any]]:
+    """Parse the input file into ``{'id', 'query', 'config'}`` items"""
+    items = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            if isinstance(data, str):
+                data = {'query': data}
+            query = (data.get('query') or '').strip()
+            if not query:
+                raise ValueError(f"{path}:{line_no}: missing 'query'")
+            items.append({
+                'id': str(data.get('id') or ' '.join(query.lower().split())),
+                'query': query,
+                'config': data.get('config') or {},
+            })
+    return items
+
+
+def completed_ids(path: str) -> Set[str]:
+    """IDs that already have a successful record in ``path``
+
+    A crash can leave a half-written last line; it is cut off here so new
+    records start on a line of their own.
+    """
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get('status') == 'done':
+            done.add(record['id'])
+    return done
+
+
+class BatchRunner:
+    """Runs queries in parallel and appends a record for each as it finishes"""
+
+    def __init__(self, base_config: Dict[str, Any], output_path: str, parallel: int = 4,
+                 save_results: bool = False, full_results: bool = False):
+        self.base_config = base_config
+        self.output_path = output_path
+        self.parallel = parallel
+        self.save = save_results
+        self.full = full_results
+        self.registry = get_registry()
+        self._lock = threading.Lock()
+        self.timings: List[float] = []
+        self.counts = {'done': 0, 'failed': 0, 'skipped': 0}
+        self.totals: Dict[str, float] = {}
+
+    def run_one(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        record = {'id': item['id'], 'query': item['query']}
+        try:
+            researcher = NCSUAdvancedResearcher(dict(self.base_config, **item['config']), registry=self.registry)
+            with correlation_scope(item['id']):
+                results = researcher.research(item['query'])
+            if self.save:
+                record['saved_files'] = researcher.save_results(results)
+            record.update(status='done', answer=results['final_answer'], sources=results['sources'],
+                          answer_path=results.get('answer_path'))
+            if results.get('answer_error'):
+                # Sources were found but the LLM failed; leave it for the next run to retry
+                record.update(status='failed', error=f"LLMProviderError: {results['answer_error']}")
+            if self.full:
+                record['results'] = {k: v for k, v in results.items() if k != 'pages'}
+            self._tally(results.get('metrics', {}))
+        except Exception as e:
+            record.update(status='failed', error=f"{type(e).__name__}: {e}")
+        record['seconds'] = round(time.perf_counter() - started, 3)
+        return record
+
+    def _tally(self, metrics: Dict[str, Any]):
+        with self._lock:
+            for name, value in metrics.get('counters', {}).items():
+                self.totals[name] = self.totals.get(name, 0) + value
+            for name, usage in metrics.get('llm', {}).items():
+                key = f"llm_calls.{name}"
+                self.totals[key] = self.totals.get(key, 0) + usage.get('calls', 0)
+            for name, cache in metrics.get('caches', {}).items():
+                for kind in ('hits', 'misses'):
+                    key = f"cache.{name}.{kind}"
+                    self.totals[key] = self.totals.get(key, 0) + cache.get(kind, 0)
+
+    def run(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        seen = completed_ids(self.output_path)
+        pending = []
+        for item in items:
+            # Already answered in an earlier run, or repeated in this file
+            if item['id'] not in seen:
+                seen.add(item['id'])
+                pending.append(item)
+        self.counts['skipped'] = len(items) - len(pending)
+        if self.counts['skipped']:
+            print(f"⏭️  Skipping {self.counts['skipped']} queries already in {self.output_path} or repeated",
+                  file=sys.stderr)
+
+        started = time.perf_counter()
+        with open(self.output_path, 'a', encoding='utf-8') as out, \
+                ThreadPoolExecutor(self.parallel, thread_name_prefix='batch') as pool:
+            futures = [pool.submit(self.run_one, item) for item in pending]
+            for finished, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                self.counts[record['status']] += 1
+                if record['status'] == 'done':
+                    self.timings.append(record['seconds'])
+                icon = '✅' if record['status'] == 'done' else '❌'
+                print(f"{icon} [{finished}/{len(pending)}] {record['query']} ({record['seconds']:.1f}s)",
+                      file=sys.stderr)
+        return self.summary(time.perf_counter() - started)
+
+    def summary(self, wall: float) -> Dict[str, Any]:
+        ran = self.counts['done'] + self.counts['failed']
+        return {
+            'queries': dict(self.counts),
+            'wall_seconds': round(wall, 3),
+            'throughput_qps': round(ran / wall, 4) if wall else 0.0,
+            'latency': {
+                'p50': percentile(self.timings, 50),
+                'p95': percentile(self.timings, 95),
+                'max': max(self.timings) if self.timings else 0.0,
+            },
+            'totals': dict(self.totals),
+            'resources': self.registry.stats(),
+        }
+
+
+def print_summary(summary: Dict[str, Any]):
+    counts = summary['queries']
+    latency = summary['latency']
+    print(f"\n📊 BATCH SUMMARY")
+    print("=" * 70)
+    print(f"✅ {counts['done']} done | ❌ {counts['failed']} failed | ⏭️  {counts['skipped']} skipped")
+    print(f"🚀 Throughput: {summary['throughput_qps']:.2f} queries/s over {summary['wall_seconds']:.1f}s")
+    print(f"⏱️  Per query: p50 {latency['p50']:.2f}s | p95 {latency['p95']:.2f}s | max {latency['max']:.2f}s")
+    totals = summary['totals']
+    if totals:
+        print(f"🌐 Pages fetched: {int(totals.get('pages_fetched', 0))} | "
+              f"reused from history: {int(totals.get('pages_reused', 0))} | "
+              f"bytes: {int(totals.get('bytes_fetched', 0)):,}")
+        hits, misses = totals.get('cache.grade.hits', 0), totals.get('cache.grade.misses', 0)
+        if hits + misses:
+            print(f"🧮 Grade cache: {int(hits)}/{int(hits + misses)} hits ({hits / (hits + misses):.0%})")
+    for row in summary['resources']:
+        print(f"🧰 {row['resource']}: reused {row['hits']}x, built in {row['init_seconds'] * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSON Lines file of queries through the research pipeline")
+    parser.add_argument('input', help="JSON Lines file of queries")
+    parser.add_argument('-o', '--output', help="JSON Lines results file (default: <input>.results.jsonl)")
+    parser.add_argument('-p', '--parallel', type=int, default=4, help="Queries to research at once")
+    parser.add_argument('--config', help="YAML or JSON file with researcher config")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="Extra researcher config (value parsed as JSON when possible)")
+    parser.add_argument('--save', action='store_true', help="Also write each run to output_dir")
+    parser.add_argument('--full', action='store_true', help="Include the full results dict in each record")
+    parser.add_argument('--json', help="Write the summary to this file")
+    parser.add_argument('--verbose', action='store_true', help="Show the researcher's step-by-step output")
+    parser.add_argument('--log-format', choices=('text', 'json'), default='text',
+                        help="json writes one object per log record, tagged with the query id")
+    args = parser.parse_args()
+
+    configure_logging(args.log_format)
+    config = load_config(args.config, args.set)
+    # Step-by-step output from parallel runs is just noise unless asked for
+    config.setdefault('verbosity', 'verbose' if args.verbose else 'quiet')
+    output = args.output or os.path.splitext(args.input)[0] + '.results.jsonl'
+    runner = BatchRunner(config, output, parallel=args.parallel, save_results=args.save, full_results=args.full)
+    summary = runner.run(read_queries(args.input))
+    print_summary(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Summary written to {args.json}")
+    sys.exit(1 if summary['queries']['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
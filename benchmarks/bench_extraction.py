@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Main-Content Extraction Benchmark
+=================================
+
+Runs the plain page-text extraction and the main-content extractor
+(``enhanced_extraction``) over every fixture page and reports how many
+characters each keeps against how much of the real page body survives:
+
+- body recall: share of the fixture body's words present in the extracted text
+- precision: share of extracted words that come from the body (the rest is template chrome)
+- query coverage: for each benchmark query, share of its terms still found in the
+  pages the fixture search returns for it
+
+It also reports SimHash distances between the extracted texts, which is what
+the near-duplicate threshold (``near_duplicate_distance``) is chosen from:
+copies of one text in another template and edited mirrors (``mirror_of`` in
+the fixture index) against the closest distinct pages, in full and cut down
+to their first paragraph (short pages are where the shared template weighs most).
+
+Usage:
+    python benchmarks/bench_extraction.py
+"""
+
+import argparse
+import itertools
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from fixture_server import FixtureServer  # noqa: E402
+from scraper.dedup import DEFAULT_MAX_DISTANCE, FINGERPRINT_BITS, hamming, simhash  # noqa: E402
+from scraper.extraction import extract_main_text, page_text  # noqa: E402
+from utils.context_packer import query_terms  # noqa: E402
+
+_TAG = re.compile(r'<[^>]+>')
+_WORD = re.compile(r'[a-z0-9]+')
+
+EXTRACTORS = {
+    'page text': page_text,
+    'main content': extract_main_text,
+}
+
+
+def words(text: str) -> Counter:
+    return Counter(_WORD.findall(text.lower()))
+
+
+def overlap(a: Counter, b: Counter) -> int:
+    return sum((a & b).values())
+
+
+def simhash_distances(server: FixtureServer, texts: dict) -> dict:
+    """Farthest same-text copy and mirror, closest distinct pair (bits), over ``texts`` by path"""
+    fingerprints = {path: simhash(text) for path, text in texts.items()}
+    pages = server.pages
+    # A mirror is an edited copy of another page's text
+    origin = {path: pages[page.get('mirror_of', path)]['file'] for path, page in pages.items()}
+    groups = {'copies': [], 'mirrors': [], 'distinct': []}
+    for a, b in itertools.combinations(fingerprints, 2):
+        if pages[a]['file'] == pages[b]['file']:
+            group = 'copies'
+        elif origin[a] == origin[b]:
+            group = 'mirrors'
+        else:
+            group = 'distinct'
+        groups[group].append(hamming(fingerprints[a], fingerprints[b]))
+    return {
+        'copies_max': max(groups['copies'], default=None),
+        'mirrors_max': max(groups['mirrors'], default=None),
+        'distinct_min': min(groups['distinct'], default=None),
+    }
+
+
+def short_pages(server: FixtureServer) -> dict:
+    """HTML of each distinct full-template page with only its first paragraph of body"""
+    short = {}
+    for path, page in server.pages.items():
+        if page.get('template', 'full') != 'full' or page.get('mirror_of'):
+            continue
+        body = (server.fixtures_dir / 'pages' / page['file']).read_text(encoding='utf-8')
+        first = re.search(r'<p>.*?</p>', body, re.S)
+        short[path] = server.render(page, first.group(0) if first else body)
+    return short
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Characters kept vs relevance retained by the extractors")
+    parser.add_argument('--queries', default=str(Path(__file__).parent / 'queries.json'))
+    parser.add_argument('--json', help="Write per-page results to this file")
+    args = parser.parse_args()
+
+    server = FixtureServer()
+    bodies = {}
+    for path, page in server.pages.items():
+        body = (server.fixtures_dir / 'pages' / page['file']).read_text(encoding='utf-8')
+        bodies[path] = words(page['title'] + ' ' + _TAG.sub(' ', body))
+
+    extracted = {name: {} for name in EXTRACTORS}
+    seconds = {name: 0.0 for name in EXTRACTORS}
+    for name, extract in EXTRACTORS.items():
+        for path, page in server.pages.items():
+            started = time.perf_counter()
+            extracted[name][path] = extract(BeautifulSoup(page['html'], 'html.parser'))
+            seconds[name] += time.perf_counter() - started
+
+    rows = {}
+    for name in EXTRACTORS:
+        chars = recall = precision = 0.0
+        for path, text in extracted[name].items():
+            found = words(text)
+            chars += len(text)
+            recall += overlap(found, bodies[path]) / max(1, sum(bodies[path].values()))
+            precision += overlap(found, bodies[path]) / max(1, sum(found.values()))
+        n = len(extracted[name])
+        rows[name] = {'chars': chars, 'recall': recall / n, 'precision': precision / n, 'seconds': seconds[name]}
+
+    # Query coverage over the pages the (fixture) search would send to the grader
+    queries = json.loads(Path(args.queries).read_text(encoding='utf-8'))
+    for name in EXTRACTORS:
+        coverage = []
+        for query in queries:
+            terms = query_terms(query)
+            hits = [urlparse(href).path for href in re.findall(r'href="([^"]+)"', server.search(query).decode('utf-8'))]
+            pages = [path for path in hits if path in extracted[name]]
+            if not terms or not pages:
+                continue
+            found = set().union(*(words(extracted[name][p]) for p in pages))
+            coverage.append(sum(1 for t in terms if t in found) / len(terms))
+        rows[name]['query_coverage'] = sum(coverage) / len(coverage) if coverage else 0.0
+
+    base = rows['page text']
+    print(f"\n📊 EXTRACTION ({len(server.pages)} fixture pages, {len(queries)} queries)")
+    print("=" * 78)
+    print(f"{'':<14}{'chars':>10}{'kept':>8}{'body recall':>13}{'precision':>11}{'query cov.':>12}{'ms/page':>10}")
+    for name, r in rows.items():
+        print(f"{name:<14}{r['chars']:>10,.0f}{r['chars'] / base['chars']:>8.0%}{r['recall']:>13.1%}"
+              f"{r['precision']:>11.1%}{r['query_coverage']:>12.1%}{r['seconds'] * 1000 / len(server.pages):>10.2f}")
+
+    short = short_pages(server)
+    print(f"\n🧬 SIMHASH DISTANCES (bits of {FINGERPRINT_BITS}; near_duplicate_distance default {DEFAULT_MAX_DISTANCE})")
+    print("=" * 78)
+    print(f"{'':<14}{'copies (max)':>14}{'mirrors (max)':>15}{'distinct (min)':>16}{'short pages (min)':>19}")
+    for name, extract in EXTRACTORS.items():
+        distances = simhash_distances(server, extracted[name])
+        distances['short_distinct_min'] = simhash_distances(
+            server, {path: extract(BeautifulSoup(markup, 'html.parser')) for path, markup in short.items()}
+        )['distinct_min']
+        rows[name]['simhash'] = distances
+        print(f"{name:<14}{distances['copies_max']:>14}{distances['mirrors_max']:>15}"
+              f"{distances['distinct_min']:>16}{distances['short_distinct_min']:>19}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'summary': rows, 'pages': extracted}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Page Model Benchmark
+====================
+
+Builds a batch of ScrapedPage objects and reads their word counts the way
+research() does (extracted pages, graded pages, totals), comparing the old
+dataclass that re-split the content on every count with the slotted model
+and its compact byte buffer. Reports time, peak traced heap and the memory
+the pages hold.
+
+Usage:
+    python benchmarks/bench_models.py --pages 300 --chars 50000
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from scraper.models import ScrapedPage  # noqa: E402
+
+
+@dataclass
+class LegacyScrapedPage:
+    """ScrapedPage as it was before the slotted model"""
+    title: str
+    url: str
+    content: str
+    extraction_success: bool = True
+    word_count: int = 0
+
+    def __post_init__(self):
+        if not self.word_count:
+            self.word_count = len(self.content.split())
+
+
+def make_texts(count: int, chars: int, seed: int = 11):
+    rng = random.Random(seed)
+    # A few accented words so the text is not pure ASCII, like real pages
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(3000)]
+    words += ['café', 'résumé', 'naïve', 'Raleigh–Durham']
+    texts = []
+    for _ in range(count):
+        out, length = [], 0
+        while length < chars:
+            word = rng.choice(words)
+            out.append(word)
+            length += len(word) + 1
+        texts.append(' '.join(out))
+    return texts
+
+
+def run(label, build, texts):
+    tracemalloc.start()
+    started = time.perf_counter()
+    pages = []
+    for i, text in enumerate(texts):
+        # Fresh copy per page, as the scraper produces new strings
+        pages.append(build(f"Page {i}", f"https://www.ncsu.edu/p/{i}", text.encode('utf-8').decode('utf-8')))
+    held = tracemalloc.get_traced_memory()[0]
+    total = 0
+    for page in pages:
+        if isinstance(page, LegacyScrapedPage):
+            # research() used to re-split the content for each of these
+            total += len(page.content.split()) + len(page.content.split()) + len(page.content.split())
+        else:
+            total += page.word_count + page.word_count + page.word_count
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'label': label, 'seconds': elapsed, 'held': held, 'peak': peak, 'words': total}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Allocation and peak memory of the page models")
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--chars', type=int, default=50000, help="Characters per page")
+    args = parser.parse_args()
+
+    texts = make_texts(args.pages, args.chars)
+    rows = [
+        run('dataclass + split()', LegacyScrapedPage, texts),
+        run('slots, lazy counts', ScrapedPage, texts),
+        run('slots, compact bytes', lambda t, u, c: ScrapedPage(t, u, c, compact=True), texts),
+    ]
+    assert len({r['words'] for r in rows}) == 1, "word counts differ between models"
+
+    print(f"\n📊 PAGE MODELS ({args.pages} pages x {args.chars:,} chars)")
+    print("=" * 70)
+    print("(times include tracemalloc overhead, so they exaggerate allocation cost)")
+    print(f"{'':<24}{'time (s)':>10}{'held (MB)':>12}{'peak (MB)':>12}")
+    for r in rows:
+        print(f"{r['label']:<24}{r['seconds']:>10.3f}{r['held'] / 1e6:>12.1f}{r['peak'] / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Page Store Memory Benchmark
+===========================
+
+Compares the results dict of one research() call with page bodies copied
+into every stage (the old layout) against the content-addressed layout
+where stages hold a ``content_id`` and ``results['pages']`` holds each
+body once. Reports traced heap size and the size of the saved JSON.
+
+Usage:
+    python benchmarks/bench_page_store.py --pages 20 --chars 50000
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from utils.page_store import PageStore  # noqa: E402
+
+
+def make_pages(count: int, chars: int, seed: int = 7):
+    rng = random.Random(seed)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(2000)]
+    pages = []
+    for i in range(count):
+        text = []
+        length = 0
+        while length < chars:
+            word = rng.choice(words)
+            text.append(word)
+            length += len(word) + 1
+        pages.append({'title': f"Page {i}", 'url': f"https://www.ncsu.edu/page-{i}", 'content': ' '.join(text)})
+    return pages
+
+
+def legacy_results(pages):
+    """Stage lists each carrying the page text, plus the unused combined_content"""
+    extracted = [dict(p, word_count=len(p['content'].split()), extraction_success=True) for p in pages]
+    graded = [dict(title=p['title'], url=p['url'], content=p['content'], word_count=p['word_count'],
+                   relevance_score=0.5) for p in extracted]
+    combined_content = "\n\n".join(
+        f"Title: {p['title']}\nURL: {p['url']}\nContent: {p['content']}" for p in graded
+    )
+    results = {'extracted_pages': extracted, 'graded_pages': graded, 'filtered_pages': list(graded)}
+    return results, combined_content
+
+
+def store_results(pages):
+    """Stage lists referring to bodies in results['pages'] by content_id"""
+    results = {'pages': {}}
+    store = PageStore(results['pages'])
+    extracted = [dict(title=p['title'], url=p['url'], content_id=store.put(p['content']),
+                      word_count=len(p['content'].split()), extraction_success=True) for p in pages]
+    graded = [dict(title=p['title'], url=p['url'], content_id=p['content_id'], word_count=p['word_count'],
+                   relevance_score=0.5) for p in extracted]
+    results.update(extracted_pages=extracted, graded_pages=graded, filtered_pages=list(graded))
+    return results, None
+
+
+def measure(build, pages):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Page bodies arrive as fresh strings from the scraper, so copy them inside the trace
+    fresh = [dict(p, content=''.join(list(p['content']))) for p in pages]
+    results, extra = build(fresh)
+    del fresh
+    held = tracemalloc.get_traced_memory()[0] - before
+    json_bytes = len(json.dumps(results, indent=2).encode('utf-8'))
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    del results, extra
+    return {'held_bytes': held, 'peak_bytes': peak, 'json_bytes': json_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and JSON size of the results page layout")
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--chars', type=int, default=50000, help="Characters per page")
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.chars)
+    legacy = measure(legacy_results, pages)
+    stored = measure(store_results, pages)
+
+    print(f"\n📊 PAGE LAYOUT ({args.pages} pages x {args.chars:,} chars)")
+    print("=" * 62)
+    print(f"{'':<22}{'inline (MB)':>14}{'store (MB)':>14}{'ratio':>10}")
+    for label, key in (('results held', 'held_bytes'), ('peak while saving', 'peak_bytes'), ('saved JSON', 'json_bytes')):
+        a, b = legacy[key], stored[key]
+        print(f"{label:<22}{a / 1e6:>14.2f}{b / 1e6:>14.2f}{(a / b if b else 0):>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
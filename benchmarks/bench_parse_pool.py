@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Parse Pool Benchmark
+====================
+
+Extracts text from the fixture pages (padded to realistic sizes) using a
+pool of fetch threads, first parsing in-thread as before and then through
+ParsePool worker processes, and reports pages/second for each. This is the
+work concurrent fetching leaves serialized on the GIL.
+
+Usage:
+    python benchmarks/bench_parse_pool.py --pages 200 --threads 8 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixture_server import FixtureServer  # noqa: E402
+from scraper.parse_pool import ParsePool, extract_page_text  # noqa: E402
+
+
+def make_pages(count: int, pad_paragraphs: int):
+    """Fixture pages with extra prose so they weigh in like real ncsu.edu pages"""
+    server = FixtureServer()
+    filler = ''.join(
+        f"<p>Paragraph {i} of supplementary policy text describing deadlines, offices, forms and "
+        f"eligibility requirements for students, faculty and staff at NC State.</p>"
+        for i in range(pad_paragraphs)
+    ).encode('utf-8')
+    bodies = [page['html'].replace(b'</main>', filler + b'</main>') for page in server.pages.values()]
+    return [bodies[i % len(bodies)] for i in range(count)]
+
+
+def run(label: str, parse, pages, threads: int):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        chars = sum(len(text) for text in pool.map(parse, pages))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28}{elapsed:>10.2f}{len(pages) / elapsed:>14.1f}{chars:>14,}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-thread vs process-pool HTML parsing")
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8, help="Concurrent fetch threads handing over pages")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Parse pool processes")
+    parser.add_argument('--pad', type=int, default=150, help="Extra paragraphs added to each fixture page")
+    parser.add_argument('--min-bytes', type=int, default=16384)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.pad)
+    avg_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"\n🧪 {len(pages)} pages, {avg_kb:.0f} KB average, {args.threads} threads, {args.workers} workers")
+    print(f"{'':<28}{'seconds':>10}{'pages/s':>14}{'chars':>14}")
+    print("-" * 66)
+
+    inline = run("in-thread (GIL)", extract_page_text, pages, args.threads)
+
+    parse_pool = ParsePool(args.workers, min_bytes=args.min_bytes)
+    parse_pool.warm_up()
+    # Let the workers finish starting so the timing covers parsing only
+    parse_pool.run(extract_page_text, pages[0])
+    pooled = run(f"parse pool ({args.workers} processes)",
+                 lambda body: parse_pool.run(extract_page_text, body), pages, args.threads)
+    print(f"\n🚀 Speedup: {inline / pooled:.2f}x   pool stats: {parse_pool.stats()}")
+    parse_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Local NCSU Fixture Server
+=========================
+
+Serves recorded NCSU search and content pages over HTTP so the research
+pipeline can be benchmarked without touching ncsu.edu.
+
+Usage:
+    python benchmarks/fixture_server.py --port 8765
+    # then point the researcher at it:
+    #   base_url=http://127.0.0.1:8765, search_url=http://127.0.0.1:8765/search/,
+    #   allowed_domain=127.0.0.1
+"""
+
+import argparse
+import html
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+_TAG = re.compile(r'<[^>]+>')
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+class FixtureServer:
+    """Threaded HTTP server for the recorded fixture pages"""
+
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.requests_served = 0
+        # (time.monotonic() on arrival, path) of every request, e.g. to check pacing
+        self.request_log: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+        self._load()
+
+    def _load(self):
+        index = json.loads((self.fixtures_dir / "index.json").read_text(encoding="utf-8"))
+        self.templates = {
+            'full': (self.fixtures_dir / "_template.html").read_text(encoding="utf-8"),
+            'print': (self.fixtures_dir / "_print_template.html").read_text(encoding="utf-8"),
+        }
+        self.pages: Dict[str, Dict] = {}
+        for entry in index['pages']:
+            body = (self.fixtures_dir / "pages" / entry['file']).read_text(encoding="utf-8")
+            self.pages[entry['path']] = dict(
+                entry,
+                html=self.render(entry, body),
+                terms=set(_WORD.findall((entry['title'] + ' ' + entry['snippet'] + ' ' + _TAG.sub(' ', body)).lower())),
+            )
+
+    def render(self, entry: Dict, body: str) -> bytes:
+        """HTML of ``body`` in the site template an index entry asks for"""
+        section_url = '/' + entry['path'].strip('/').split('/')[0]
+        return (self.templates[entry.get('template', 'full')]
+                .replace('{title}', html.escape(entry['title']))
+                .replace('{section}', html.escape(entry['section']))
+                .replace('{section_url}', section_url)
+                .replace('{body}', body)).encode('utf-8')
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def researcher_config(self) -> Dict[str, str]:
+        """Config overrides that point NCSUAdvancedResearcher at this server"""
+        return {
+            'base_url': self.base_url,
+            'search_url': f"{self.base_url}/search/",
+            'allowed_domain': self.host,
+            'selenium_enabled': False,
+            'scrape_delay': 0,
+        }
+
+    def search(self, query: str, max_results: int = 20) -> bytes:
+        """Render a search results page ranked by query-term overlap"""
+        terms = [t for t in _WORD.findall(query.lower()) if len(t) > 2]
+        scored = []
+        for path, page in self.pages.items():
+            score = sum(1 for t in terms if t in page['terms'])
+            if score:
+                scored.append((-score, path))
+        scored.sort()
+
+        items = []
+        for _, path in scored[:max_results]:
+            page = self.pages[path]
+            items.append(
+                '<div class="search-result">'
+                f'<h3 class="result-title"><a href="{self.base_url}{path}">{html.escape(page["title"])}</a></h3>'
+                f'<p class="result-snippet">{html.escape(page["snippet"])}</p>'
+                '</div>'
+            )
+        return (
+            '<!DOCTYPE html><html><head><title>Search | NC State University</title></head><body>'
+            f'<h1>Search results for {html.escape(query)}</h1>'
+            + ''.join(items) +
+            '</body></html>'
+        ).encode('utf-8')
+
+    def start(self) -> str:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                arrived = time.monotonic()
+                if server.latency:
+                    time.sleep(server.latency)
+                with server._lock:
+                    server.requests_served += 1
+                    server.request_log.append((arrived, self.path))
+                parsed = urlparse(self.path)
+                if parsed.path.rstrip('/') == '/search':
+                    query = parse_qs(parsed.query).get('q', [''])[0]
+                    body = server.search(query)
+                else:
+                    page = server.pages.get(parsed.path.rstrip('/'))
+                    if page is None:
+                        self.send_error(404)
+                        return
+                    body = page['html']
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded NCSU pages locally")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to wait before each response")
+    args = parser.parse_args()
+
+    server = FixtureServer(host=args.host, port=args.port, latency=args.latency)
+    server.start()
+    print(f"🧪 Serving {len(server.pages)} fixture pages at {server.base_url}")
+    print(f"🔧 Researcher config: {json.dumps(server.researcher_config())}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
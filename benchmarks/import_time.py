@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Import-Time Report
+==================
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter,
+parses the timings into a tree and reports the slowest imports. Fails (exit
+code 1) when the total exceeds ``--budget-ms`` or when a module that should
+only load on first use (Selenium, the LLM SDKs, yaml, BeautifulSoup,
+requests) shows up at startup, so cold-start regressions are caught in CI.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module api_server --budget-ms 150 --top 15
+    python benchmarks/import_time.py --allow requests --json imports.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Heavy optional dependencies that are imported inside the functions using them
+DEFERRED_MODULES = ('selenium', 'openai', 'anthropic', 'yaml', 'bs4', 'requests')
+
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def measure(module: str) -> List[Dict[str, Any]]:
+    """Import ``module`` in a fresh interpreter and return its importtime records in load order"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT), str(ROOT / 'src'), os.getenv('PYTHONPATH', '')]))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=str(ROOT), env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    records = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': (len(indent) - 1) // 2,
+            })
+    return records
+
+
+def report(module: str, repeat: int = 3) -> Dict[str, Any]:
+    """Fastest of ``repeat`` cold imports of ``module``, summarized"""
+    runs = [measure(module) for _ in range(repeat)]
+    records = min(runs, key=lambda r: sum(rec['self_ms'] for rec in r))
+    top = next((r for r in records if r['module'] == module and r['depth'] == 0), None)
+    loaded = {r['module'] for r in records}
+    return {
+        'module': module,
+        'total_ms': top['cumulative_ms'] if top else sum(r['self_ms'] for r in records if r['depth'] == 0),
+        'modules_loaded': len(records),
+        'deferred_loaded': sorted(m for m in DEFERRED_MODULES if m in loaded),
+        'slowest_cumulative': sorted(records, key=lambda r: r['cumulative_ms'], reverse=True),
+        'slowest_self': sorted(records, key=lambda r: r['self_ms'], reverse=True),
+    }
+
+
+def print_report(summary: Dict[str, Any], top: int):
+    print(f"\n⏱️  IMPORT TIME: {summary['module']}")
+    print("=" * 70)
+    print(f"Total {summary['total_ms']:.1f} ms, {summary['modules_loaded']} modules loaded")
+
+    print(f"\n{'Slowest (cumulative)':<50}{'cum (ms)':>10}{'self (ms)':>10}")
+    print("-" * 70)
+    for r in summary['slowest_cumulative'][:top]:
+        print(f"{'  ' * min(r['depth'], 6) + r['module']:<50}{r['cumulative_ms']:>10.1f}{r['self_ms']:>10.1f}")
+
+    print(f"\n{'Slowest (self)':<50}{'self (ms)':>10}")
+    print("-" * 60)
+    for r in summary['slowest_self'][:top]:
+        print(f"{r['module']:<50}{r['self_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and check module import time")
+    parser.add_argument('--module', action='append',
+                        help="Module to import (repeatable, default: ncsu_advanced_config_base)")
+    parser.add_argument('--repeat', type=int, default=3, help="Cold imports per module (fastest is kept)")
+    parser.add_argument('--top', type=int, default=10, help="Rows per table")
+    parser.add_argument('--budget-ms', type=float, help="Fail if a module takes longer than this to import")
+    parser.add_argument('--allow', action='append', default=[], metavar='MODULE',
+                        help="Deferred module that may be imported at startup")
+    parser.add_argument('--json', help="Write the summaries to this file")
+    args = parser.parse_args()
+
+    failures = []
+    summaries = []
+    for module in args.module or ['ncsu_advanced_config_base']:
+        summary = report(module, args.repeat)
+        summaries.append(summary)
+        print_report(summary, args.top)
+        eager = [m for m in summary['deferred_loaded'] if m not in args.allow]
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} at startup")
+        if args.budget_ms is not None and summary['total_ms'] > args.budget_ms:
+            failures.append(f"{module} took {summary['total_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+    print()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Import time within limits")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
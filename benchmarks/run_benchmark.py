@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Offline End-to-End Benchmark
+============================
+
+Drives NCSUAdvancedResearcher.research over a fixed query set against the
+local fixture server and a latency-simulating MockLLMProvider, then reports
+per-stage latency, p50/p95/p99 end-to-end time, throughput and peak memory.
+
+Usage:
+    python benchmarks/run_benchmark.py --repeat 3 --llm-latency 0.2 --llm-tps 80
+    python benchmarks/run_benchmark.py --set max_pages=10 --set relevance_threshold=0.5 --json bench.json
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+from utils.config import parse_overrides  # noqa: E402
+from utils.metrics import percentile  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def build_config(server: FixtureServer, args, output_dir: str) -> Dict[str, Any]:
+    config = {
+        'llm_provider': 'mock',
+        'top_k': args.top_k,
+        'max_pages': args.max_pages,
+        'relevance_threshold': args.threshold,
+        'enable_grading': True,
+        'min_content_length': 100,
+        'max_content_length': 50000,
+        'timeout': 10,
+        'output_dir': output_dir,
+        'mock_latency': args.llm_latency,
+        'mock_tokens_per_second': args.llm_tps,
+        'mock_prompt_tokens_per_second': args.llm_prompt_tps,
+        'mock_grade_score': None,
+        'verbosity': 'verbose' if args.verbose else 'quiet',
+    }
+    config.update(server.researcher_config())
+    config.update(parse_overrides(args.set))
+    return config
+
+
+def run(args) -> Dict[str, Any]:
+    queries = json.loads(Path(args.queries).read_text(encoding='utf-8'))
+    if args.limit:
+        queries = queries[:args.limit]
+
+    if not args.verbose:
+        logging.getLogger('ncsu_advanced_researcher').setLevel(logging.WARNING)
+        logging.getLogger('scraper').setLevel(logging.WARNING)
+
+    runs = []
+    with FixtureServer(port=args.port, latency=args.server_latency) as server, tempfile.TemporaryDirectory() as output_dir:
+        config = build_config(server, args, output_dir)
+        researcher = NCSUAdvancedResearcher(config)
+
+        # Warm-up run so imports and connection setup don't skew the first sample
+        if args.warmup:
+            researcher.research(queries[0])
+
+        if args.trace_malloc:
+            tracemalloc.start()
+        wall_started = time.perf_counter()
+        for _ in range(args.repeat):
+            for query in queries:
+                started = time.perf_counter()
+                results = researcher.research(query)
+                elapsed = time.perf_counter() - started
+                runs.append({
+                    'query': query,
+                    'seconds': elapsed,
+                    'metrics': results.get('metrics', {}),
+                    'sources': len(results.get('sources', [])),
+                    'pipeline': results.get('pipeline', {}),
+                    'answer_chars': len(results.get('final_answer', '')),
+                })
+        wall = time.perf_counter() - wall_started
+        traced_peak = None
+        if args.trace_malloc:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        requests_served = server.requests_served
+
+    return summarize(runs, wall, traced_peak, requests_served, config)
+
+
+def summarize(runs: List[Dict[str, Any]], wall: float, traced_peak, requests_served: int,
+              config: Dict[str, Any]) -> Dict[str, Any]:
+    e2e = [r['seconds'] for r in runs]
+    overlaps = [r['pipeline']['overlap'] for r in runs if r.get('pipeline')]
+
+    stage_samples: Dict[str, List[float]] = {}
+    llm_totals: Dict[str, Dict[str, float]] = {}
+    for r in runs:
+        for name, stage in r['metrics'].get('stages', {}).items():
+            stage_samples.setdefault(name, []).append(stage['seconds'])
+        for name, usage in r['metrics'].get('llm', {}).items():
+            totals = llm_totals.setdefault(name, {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+            for key in totals:
+                totals[key] += usage.get(key, 0)
+
+    stages = {
+        name: {
+            'mean': statistics.mean(samples),
+            'p50': percentile(samples, 50),
+            'p95': percentile(samples, 95),
+            'max': max(samples),
+        }
+        for name, samples in stage_samples.items()
+    }
+
+    max_rss = None
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != 'darwin':
+            max_rss *= 1024  # Linux reports kilobytes
+
+    return {
+        'queries': len(runs),
+        'wall_seconds': wall,
+        'throughput_qps': len(runs) / wall if wall else 0.0,
+        'e2e': {
+            'mean': statistics.mean(e2e) if e2e else 0.0,
+            'p50': percentile(e2e, 50),
+            'p95': percentile(e2e, 95),
+            'p99': percentile(e2e, 99),
+            'max': max(e2e) if e2e else 0.0,
+        },
+        'stages': stages,
+        'pipeline_overlap': statistics.mean(overlaps) if overlaps else None,
+        'llm': llm_totals,
+        'peak_traced_bytes': traced_peak,
+        'max_rss_bytes': max_rss,
+        'http_requests': requests_served,
+        'config': {k: v for k, v in config.items() if k != 'output_dir'},
+        'runs': [{k: v for k, v in r.items() if k != 'metrics'} for r in runs],
+    }
+
+
+def print_report(summary: Dict[str, Any]):
+    print(f"\n📊 BENCHMARK RESULTS ({summary['queries']} queries, {summary['http_requests']} HTTP requests)")
+    print("=" * 70)
+    e2e = summary['e2e']
+    print(f"⏱️  End-to-end: mean {e2e['mean']:.3f}s | p50 {e2e['p50']:.3f}s | "
+          f"p95 {e2e['p95']:.3f}s | p99 {e2e['p99']:.3f}s | max {e2e['max']:.3f}s")
+    print(f"🚀 Throughput: {summary['throughput_qps']:.2f} queries/s over {summary['wall_seconds']:.2f}s")
+    if summary['max_rss_bytes']:
+        print(f"💾 Max RSS: {summary['max_rss_bytes'] / 1e6:.1f} MB")
+    if summary['peak_traced_bytes'] is not None:
+        print(f"💾 Peak traced Python heap: {summary['peak_traced_bytes'] / 1e6:.1f} MB")
+    if summary['pipeline_overlap'] is not None:
+        print(f"🔀 Pipeline overlap (work / wall): {summary['pipeline_overlap']:.2f}x")
+
+    print(f"\n{'Stage':<16}{'mean (s)':>12}{'p50 (s)':>12}{'p95 (s)':>12}{'max (s)':>12}")
+    print("-" * 64)
+    for name, s in summary['stages'].items():
+        print(f"{name:<16}{s['mean']:>12.4f}{s['p50']:>12.4f}{s['p95']:>12.4f}{s['max']:>12.4f}")
+
+    if summary['llm']:
+        print(f"\n{'LLM stage':<16}{'calls':>10}{'prompt tok':>14}{'completion tok':>16}")
+        print("-" * 56)
+        for name, u in summary['llm'].items():
+            print(f"{name:<16}{u['calls']:>10}{u['prompt_tokens']:>14,}{u['completion_tokens']:>16,}")
+
+
+def print_comparison(sequential: Dict[str, Any], streaming: Dict[str, Any]):
+    print(f"\n🔀 SEQUENTIAL vs STREAMING")
+    print("=" * 70)
+    print(f"{'':<20}{'sequential':>14}{'streaming':>14}{'speedup':>12}")
+    for label, key in (('e2e p50 (s)', 'p50'), ('e2e p95 (s)', 'p95'), ('e2e p99 (s)', 'p99')):
+        a, b = sequential['e2e'][key], streaming['e2e'][key]
+        print(f"{label:<20}{a:>14.3f}{b:>14.3f}{(a / b if b else 0):>11.2f}x")
+    a, b = sequential['throughput_qps'], streaming['throughput_qps']
+    print(f"{'throughput (q/s)':<20}{a:>14.2f}{b:>14.2f}{(b / a if a else 0):>11.2f}x")
+    print(f"{'overlap (work/wall)':<20}{sequential['pipeline_overlap'] or 0:>14.2f}{streaming['pipeline_overlap'] or 0:>14.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark for the research pipeline")
+    parser.add_argument('--queries', default=str(Path(__file__).parent / 'queries.json'))
+    parser.add_argument('--limit', type=int, default=0, help="Only run the first N queries")
+    parser.add_argument('--repeat', type=int, default=1, help="Times to run the query set")
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--max-pages', type=int, default=20)
+    parser.add_argument('--threshold', type=float, default=0.4)
+    parser.add_argument('--llm-latency', type=float, default=0.05, help="Mock LLM seconds per call")
+    parser.add_argument('--llm-tps', type=float, default=None, help="Mock LLM completion tokens/second")
+    parser.add_argument('--llm-prompt-tps', type=float, default=None, help="Mock LLM prompt tokens/second")
+    parser.add_argument('--server-latency', type=float, default=0.0, help="Fixture server seconds per request")
+    parser.add_argument('--port', type=int, default=0,
+                        help="Fixture server port (pin it when recording or replaying a cassette)")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="Extra researcher config (value parsed as JSON when possible)")
+    parser.add_argument('--no-warmup', dest='warmup', action='store_false')
+    parser.add_argument('--trace-malloc', action='store_true',
+                        help="Track peak Python heap with tracemalloc (slows the run)")
+    parser.add_argument('--compare-pipeline', action='store_true',
+                        help="Run the query set in sequential and streaming pipeline modes and compare")
+    parser.add_argument('--json', help="Write the full summary to this file")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    if args.compare_pipeline:
+        summary = {}
+        for mode in ('sequential', 'streaming'):
+            args.set = [s for s in args.set if not s.startswith('pipeline_mode=')] + [f'pipeline_mode="{mode}"']
+            summary[mode] = run(args)
+            print(f"\n🔧 pipeline_mode={mode}")
+            print_report(summary[mode])
+        print_comparison(summary['sequential'], summary['streaming'])
+    else:
+        summary = run(args)
+        print_report(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Summary written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,47 +25,165 @@ Configuration:
 """
 
 # import argparse  # Not needed for embedded config
+import contextvars
+import hashlib
 import json
+import logging
 import os
+import queue
+import random
+import sqlite3
 import sys
-import yaml
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import astuple
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from scraper.ncsu_scraper import NCSUScraper
 from scraper.content_aggregator import ContentAggregator
-from scraper.models import ScrapingConfig
-from utils.logger import setup_logger
+from scraper.dedup import DEFAULT_MAX_DISTANCE, NearDuplicateIndex
+from scraper.models import ScrapingConfig, ScrapedPage, SearchResult
+from utils.logger import VERBOSITY, correlation_id, correlation_scope, setup_logger
+from utils.context_packer import ContextPacker, PackResult, context_budget, get_tokenizer
+from utils.metrics import ResearchMetrics, percentile, to_json_lines, to_prometheus
+from utils.page_store import PageStore
+from utils.persistence import get_writer, prune_files
+from utils.history import get_history, normalize_query
+from utils.registry import LRUCache, ResourceRegistry
+from utils.jobs import ResearchCancelled
+
+
+# Model used when a provider is configured without one, e.g. a fallback given only by name
+DEFAULT_LLM_MODELS = {'openai': 'gpt-4.1-mini', 'anthropic': 'claude-haiku-4-5'}
+
+# Settings that change the answer to a query; a stored answer is only reused when they match
+# (the answer provider's name and model are part of the key as well)
+ANSWER_CACHE_KEYS = (
+    'top_k', 'max_pages', 'relevance_threshold', 'enable_grading', 'grade_llm', 'grade_escalation_margin',
+    'snippet_first', 'snippet_confidence', 'context_token_budget', 'min_content_length', 'max_content_length',
+    'llm_provider', 'llm_model', 'llm_fallbacks', 'llm_fallback_model', 'llm_temperature', 'llm_max_tokens', 'search_url',
+    'allowed_domain', 'enhanced_extraction', 'near_duplicate_detection', 'near_duplicate_distance',
+    'cross_source_dedup', 'early_stop_pages', 'early_stop_tokens', 'early_stop_score', 'pipeline_answer_after',
+)
+# Results fields kept with a stored answer and restored when it is reused
+STORED_ANSWER_FIELDS = ('final_answer', 'sources', 'answer_path', 'search_results', 'context', 'snippet_confidence')
+
+
+class _EnoughContent(Exception):
+    """Raised from a page callback to stop fetching once an early-stop rule is met"""
+
+
+class LLMProviderError(Exception):
+    """An LLM call failed (API error, timeout, or every provider of a hedged call)"""
 
 
 class LLMProvider:
-    """Base class for LLM providers"""
+    """Base class for LLM providers
+    
+    Subclasses implement ``complete()``, which raises LLMProviderError on
+    failure. ``generate_response()`` is the older interface that returns the
+    error as text instead.
+    """
     
     def __init__(self, provider_name: str, model: str = None, temperature: float = 0.7, max_tokens: int = 1000):
         self.provider_name = provider_name
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self._usage = threading.local()
+    
+    def complete(self, prompt: str) -> str:
+        """Generate response from LLM, raising LLMProviderError if the call fails"""
+        raise NotImplementedError
     
     def generate_response(self, prompt: str) -> str:
         """Generate response from LLM"""
-        raise NotImplementedError
+        try:
+            return self.complete(prompt)
+        except LLMProviderError as e:
+            return f"Error generating response: {str(e)}"
+    
+    @property
+    def last_usage(self) -> Optional[Dict[str, int]]:
+        """Token usage reported by the API for the last call on this thread, if any"""
+        return getattr(self._usage, 'value', None)
+    
+    def clear_usage(self):
+        self._usage.value = None
+    
+    def _record_usage(self, prompt_tokens: int, completion_tokens: int, estimated: bool = False):
+        self._usage.value = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                             'estimated': estimated}
 
 
 class MockLLMProvider(LLMProvider):
-    """Mock LLM provider for testing"""
+    """Mock LLM provider for testing
+    
+    ``latency`` (seconds per call) and the token rates simulate a real
+    endpoint for benchmarks. ``grade_score=None`` grades by query-term
+    overlap instead of returning a fixed score.
+    
+    Faults can be injected to exercise fallbacks: a ``stall_rate`` fraction
+    of calls take ``stall_seconds`` longer (a slow tail), and a
+    ``failure_rate`` fraction raise LLMProviderError after their delay.
+    ``seed`` makes the sequence repeatable.
+    """
     
-    def __init__(self):
+    def __init__(self, latency: float = 0.0, tokens_per_second: Optional[float] = None,
+                 prompt_tokens_per_second: Optional[float] = None, grade_score: Optional[float] = 0.333,
+                 failure_rate: float = 0.0, stall_rate: float = 0.0, stall_seconds: float = 0.0,
+                 seed: Optional[int] = None):
         super().__init__("mock", "mock-model", 0.7, 1000)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.grade_score = grade_score
+        self.failure_rate = failure_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self._random = random.Random(seed)
     
-    def generate_response(self, prompt: str) -> str:
-        if "grade" in prompt.lower() or "relevance" in prompt.lower():
+    def complete(self, prompt: str) -> str:
+        response = self._mock_response(prompt)
+        
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(response) // 4
+        delay = self.latency
+        if self.prompt_tokens_per_second:
+            delay += prompt_tokens / self.prompt_tokens_per_second
+        if self.tokens_per_second:
+            delay += completion_tokens / self.tokens_per_second
+        if self.stall_rate and self._random.random() < self.stall_rate:
+            delay += self.stall_seconds
+        if delay > 0:
+            time.sleep(delay)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise LLMProviderError("Mock provider failure (injected)")
+        self._record_usage(prompt_tokens, completion_tokens)
+        return response
+    
+    def _mock_grade(self, prompt: str) -> str:
+        if self.grade_score is not None:
+            return f"{self.grade_score:.3f}"
+        query = prompt.split('USER QUERY:')[-1].split('CONTENT TO GRADE:')[0].lower().split()
+        content = prompt.split('CONTENT TO GRADE:')[-1].split('GRADING INSTRUCTIONS:')[0].lower()
+        terms = [t.strip('?.,!') for t in query if len(t) > 3]
+        if not terms:
+            return "0.500"
+        return f"{sum(1 for t in terms if t in content) / len(terms):.3f}"
+    
+    def _mock_response(self, prompt: str) -> str:
+        if "content grader" in prompt.lower() or "grade how relevant" in prompt.lower():
             # Return a mock relevance score
-            return "0.333"
+            return self._mock_grade(prompt)
         else:
             # Return a mock answer
             return f"""Based on the NCSU website content I analyzed, here's what I found regarding your question: "{prompt.split('Question:')[-1].split('Content:')[0].strip() if 'Question:' in prompt else 'your query'}"
@@ -87,7 +205,8 @@ The NCSU website provides comprehensive information about your query. The conten
 class OpenAIProvider(LLMProvider):
     """OpenAI LLM provider"""
     
-    def __init__(self, model: str = "gpt-4o", temperature: float = 0.7, max_tokens: int = 8000):
+    def __init__(self, model: str = DEFAULT_LLM_MODELS['openai'], temperature: float = 0.7, max_tokens: int = 8000,
+                 request_timeout: Optional[float] = None):
         super().__init__("openai", model, temperature, max_tokens)
         try:
             import openai
@@ -101,11 +220,13 @@ class OpenAIProvider(LLMProvider):
                     "Or add it to the config: 'openai_api_key': 'your-key-here'"
                 )
             
-            self.client = openai.OpenAI(api_key=api_key)
+            # The SDK default waits up to 10 minutes (with retries) before giving up
+            options = {'timeout': request_timeout} if request_timeout else {}
+            self.client = openai.OpenAI(api_key=api_key, **options)
         except ImportError:
             raise ImportError("OpenAI package not installed. Run: pip install openai")
     
-    def generate_response(self, prompt: str) -> str:
+    def complete(self, prompt: str) -> str:
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -113,15 +234,18 @@ class OpenAIProvider(LLMProvider):
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
             )
+            if getattr(response, 'usage', None):
+                self._record_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
             return response.choices[0].message.content.strip()
         except Exception as e:
-            return f"Error generating response: {str(e)}"
+            raise LLMProviderError(f"OpenAI {self.model}: {e}") from e
 
 
 class AnthropicProvider(LLMProvider):
     """Anthropic Claude LLM provider"""
     
-    def __init__(self, model: str = "claude-3-sonnet-20240229", temperature: float = 0.7, max_tokens: int = 1000):
+    def __init__(self, model: str = DEFAULT_LLM_MODELS['anthropic'], temperature: float = 0.7, max_tokens: int = 1000,
+                 request_timeout: Optional[float] = None):
         super().__init__("anthropic", model, temperature, max_tokens)
         try:
             import anthropic
@@ -135,11 +259,12 @@ class AnthropicProvider(LLMProvider):
                     "Or add it to the config: 'anthropic_api_key': 'your-key-here'"
                 )
             
-            self.client = anthropic.Anthropic(api_key=api_key)
+            options = {'timeout': request_timeout} if request_timeout else {}
+            self.client = anthropic.Anthropic(api_key=api_key, **options)
         except ImportError:
             raise ImportError("Anthropic package not installed. Run: pip install anthropic")
     
-    def generate_response(self, prompt: str) -> str:
+    def complete(self, prompt: str) -> str:
         try:
             response = self.client.messages.create(
                 model=self.model,
@@ -147,65 +272,410 @@ class AnthropicProvider(LLMProvider):
                 temperature=self.temperature,
                 messages=[{"role": "user", "content": prompt}]
             )
+            if getattr(response, 'usage', None):
+                self._record_usage(response.usage.input_tokens, response.usage.output_tokens)
             return response.content[0].text.strip()
         except Exception as e:
-            return f"Error generating response: {str(e)}"
+            raise LLMProviderError(f"Anthropic {self.model}: {e}") from e
+
+
+class HedgedLLMProvider(LLMProvider):
+    """Calls a primary provider, racing or falling back to backups
+    
+    If the primary has not answered ``hedge_after`` seconds after it was
+    started, the next provider is started alongside it and the first good
+    response wins; a provider that fails hands over to the next one at once.
+    ``hedge_after`` may also be a percentile such as ``'p95'`` of the
+    primary's recent latencies (``hedge_after_default`` seconds until
+    ``min_samples`` calls have been seen), so only the slow tail is hedged.
+    
+    Each attempt runs on its own daemon thread; a losing attempt is left to
+    finish and its response is discarded. ``timeout`` bounds the whole call.
+    
+    ``last_usage`` covers every attempt of the call: attempts still running
+    when the winner returns are billed for the same prompt, so each is counted
+    at the winner's token counts (and the usage is marked estimated). The
+    tokens each provider actually reported are kept in ``stats()``.
+    """
+    
+    def __init__(self, providers: List[LLMProvider], hedge_after: Union[float, str] = 3.0,
+                 timeout: Optional[float] = None, hedge_after_default: float = 3.0, min_samples: int = 20):
+        if not providers:
+            raise ValueError("HedgedLLMProvider needs at least one provider")
+        primary = providers[0]
+        names = '+'.join(dict.fromkeys(p.provider_name for p in providers))
+        super().__init__(names, primary.model, primary.temperature, primary.max_tokens)
+        self.providers = providers
+        self.hedge_after = hedge_after
+        self.timeout = timeout
+        self.hedge_after_default = hedge_after_default
+        self.min_samples = min_samples
+        self.labels: List[str] = []
+        for i, provider in enumerate(providers):
+            label = f"{provider.provider_name}/{provider.model}"
+            self.labels.append(f"{label}#{i}" if label in self.labels else label)
+        self._lock = threading.Lock()
+        self._latencies = [deque(maxlen=500) for _ in providers]
+        self._counts = [{'calls': 0, 'wins': 0, 'errors': 0, 'hedges': 0, 'fallbacks': 0,
+                         'prompt_tokens': 0, 'completion_tokens': 0} for _ in providers]
+    
+    def hedge_delay(self) -> float:
+        """Seconds to wait on one provider before starting the next"""
+        if isinstance(self.hedge_after, str) and self.hedge_after.lower().startswith('p'):
+            with self._lock:
+                samples = list(self._latencies[0])
+            if len(samples) < self.min_samples:
+                return self.hedge_after_default
+            return percentile(samples, float(self.hedge_after[1:]))
+        return float(self.hedge_after)
+    
+    def _attempt(self, index: int, prompt: str, outcomes: queue.Queue):
+        provider = self.providers[index]
+        provider.clear_usage()
+        started = time.perf_counter()
+        try:
+            response = provider.complete(prompt)
+        except Exception as e:
+            with self._lock:
+                self._counts[index]['errors'] += 1
+            outcomes.put((index, None, None, str(e) or type(e).__name__))
+            return
+        # Usage is thread-local to the provider, so it is read here and handed back
+        usage = provider.last_usage
+        with self._lock:
+            self._latencies[index].append(time.perf_counter() - started)
+            if usage:
+                self._counts[index]['prompt_tokens'] += usage['prompt_tokens']
+                self._counts[index]['completion_tokens'] += usage['completion_tokens']
+        outcomes.put((index, response, usage, None))
+    
+    def complete(self, prompt: str) -> str:
+        outcomes: queue.Queue = queue.Queue()
+        deadline = None if self.timeout is None else time.perf_counter() + self.timeout
+        hedge_delay = self.hedge_delay()
+        errors: List[str] = []
+        launched = running = 0
+        last_launch = 0.0
+        
+        def launch(reason: Optional[str]):
+            nonlocal launched, running, last_launch
+            index = launched
+            with self._lock:
+                self._counts[index]['calls'] += 1
+                if reason:
+                    self._counts[index][reason] += 1
+            threading.Thread(target=contextvars.copy_context().run, args=(self._attempt, index, prompt, outcomes),
+                             name=f"llm-{self.labels[index]}", daemon=True).start()
+            launched += 1
+            running += 1
+            last_launch = time.perf_counter()
+        
+        launch(None)
+        while True:
+            now = time.perf_counter()
+            timeout_left = None
+            if launched < len(self.providers):
+                timeout_left = max(0.0, last_launch + hedge_delay - now)
+            if deadline is not None:
+                if now >= deadline:
+                    raise LLMProviderError(f"No LLM response within {self.timeout}s "
+                                           f"({', '.join(self.labels[:launched])})")
+                timeout_left = deadline - now if timeout_left is None else min(timeout_left, deadline - now)
+            try:
+                index, response, usage, error = outcomes.get(timeout=timeout_left)
+            except queue.Empty:
+                if launched < len(self.providers) and time.perf_counter() >= last_launch + hedge_delay:
+                    launch('hedges')
+                continue
+            running -= 1
+            if error is None:
+                with self._lock:
+                    self._counts[index]['wins'] += 1
+                if usage:
+                    # The other attempts still running will be billed about as much as the winner
+                    attempts = running + 1
+                    self._record_usage(usage['prompt_tokens'] * attempts, usage['completion_tokens'] * attempts,
+                                       estimated=usage.get('estimated', False) or attempts > 1)
+                return response
+            errors.append(f"{self.labels[index]}: {error}")
+            if launched < len(self.providers):
+                launch('fallbacks')
+            elif not running:
+                raise LLMProviderError("All LLM providers failed - " + "; ".join(errors))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Calls, wins, errors, reported tokens and latency percentiles per provider"""
+        hedge_delay = self.hedge_delay()
+        with self._lock:
+            return {
+                'hedge_after_seconds': round(hedge_delay, 4),
+                'providers': {
+                    label: dict(
+                        counts,
+                        p50_seconds=round(percentile(latencies, 50), 4),
+                        p95_seconds=round(percentile(latencies, 95), 4),
+                        p99_seconds=round(percentile(latencies, 99), 4),
+                    )
+                    for label, counts, latencies in zip(self.labels, self._counts, self._latencies)
+                },
+            }
+
+
+# Config keys that decide which LLM client a researcher needs
+LLM_CONFIG_KEYS = ('llm_provider', 'llm_model', 'llm_temperature', 'llm_max_tokens', 'llm_request_timeout',
+                   'llm_fallbacks', 'llm_fallback_model', 'llm_hedge_after', 'llm_timeout', 'mock_latency',
+                   'mock_tokens_per_second', 'mock_prompt_tokens_per_second', 'mock_grade_score',
+                   'mock_failure_rate', 'mock_stall_rate', 'mock_stall_seconds', 'mock_seed')
+
+
+def _no_progress(stage: str, done: int = 0, total: int = 0, **info):
+    """Default research() progress callback"""
 
 
 class NCSUAdvancedResearcher:
-    """Advanced NCSU research assistant with configurable parameters"""
+    """Advanced NCSU research assistant with configurable parameters
+    
+    Pass a ResourceRegistry to share the LLM client, scraper (and its HTTP
+    pool), grade cache and history between researchers in one process.
+    """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], registry: Optional[ResourceRegistry] = None):
         self.config = config
+        self.registry = registry
         self.logger = setup_logger("ncsu_advanced_researcher")
+        # Step-by-step console output; 'verbosity' is 'verbose' (every result), 'normal' (steps) or 'quiet'
+        self.console = setup_logger("ncsu_advanced_researcher.console", "DEBUG")
+        self.report_level = VERBOSITY.get(config.get('verbosity', 'verbose'), logging.DEBUG)
+        # Metrics of the latest research() call, kept even when it raised (e.g. to count LLM spend)
+        self.last_metrics: Optional[ResearchMetrics] = None
         
         # Initialize LLM provider
-        self.llm_provider = self._setup_llm_provider()
+        self.llm_provider = self._shared_llm(config)
+        
+        # Grading provider: 'grade_llm' overrides (e.g. a cheaper model); the answer provider otherwise
+        grade_llm = config.get('grade_llm')
+        self.grade_provider = self._shared_llm(self._llm_settings(config, grade_llm)) if grade_llm else self.llm_provider
+        
+        # Tokenizer used to budget answer prompts (pluggable via config['tokenizer'])
+        self.tokenizer = get_tokenizer(self.llm_provider.model, config.get('tokenizer'))
         
         # Initialize scraper
         scraper_config = ScrapingConfig(
             selenium_enabled=config.get('selenium_enabled', False),
             enhanced_extraction=config.get('enhanced_extraction', True),
-            timeout=config.get('timeout', 30)
+            timeout=config.get('timeout', 30),
+            delay=config.get('scrape_delay', 1.0),
+            base_url=config.get('base_url', 'https://www.ncsu.edu'),
+            search_url=config.get('search_url', 'https://www.ncsu.edu/search/'),
+            allowed_domain=config.get('allowed_domain', 'ncsu.edu'),
+            cassette_path=config.get('cassette_path'),
+            cassette_mode=config.get('cassette_mode', 'replay'),
+            cassette_latency=config.get('cassette_latency', 'realistic'),
+            compact_content=config.get('compact_page_content', False),
+            parse_workers=config.get('parse_workers', 0),
+            parse_min_bytes=config.get('parse_min_bytes', 16384),
+            adaptive_concurrency=config.get('adaptive_concurrency', False),
+            host_max_concurrency=config.get('host_max_concurrency', 8),
+            host_latency_target=config.get('host_latency_target', 2.0)
         )
-        self.scraper = NCSUScraper(config=scraper_config)
+        self.scraper = self._shared('scraper', lambda: NCSUScraper(config=scraper_config),
+                                    *(repr(value) for value in astuple(scraper_config)))
         
-        # Initialize content aggregator
-        self.aggregator = ContentAggregator()
+        # LLM grades keyed by query and page text (0 = no caching)
+        grade_cache_size = config.get('grade_cache_size', 0)
+        self.grade_cache = self._shared('grade_cache', lambda: LRUCache(grade_cache_size),
+                                        grade_cache_size) if grade_cache_size else None
         
         # Create output directory
         self.output_dir = Path(config.get('output_dir', 'results'))
-        self.output_dir.mkdir(exist_ok=True)
+        self._shared('output_dir', lambda: self.output_dir.mkdir(exist_ok=True), str(self.output_dir))
+        
+        # Research history (SQLite + FTS5): indexes every run and serves recently fetched pages
+        history_path = config.get('history_path')
+        self.history = self._shared('history', lambda: get_history(history_path), history_path) if history_path else None
+        
+        lines = [
+            f"🎯 NCSU Advanced Researcher initialized",
+            f"🤖 LLM Provider: {self.llm_provider.provider_name}",
+        ]
+        if self.grade_provider is not self.llm_provider:
+            lines.append(f"🧮 Grading LLM: {self.grade_provider.provider_name} ({self.grade_provider.model})")
+        lines += [
+            f"🔍 Top-K Results: {config.get('top_k', 10)}",
+            f"📄 Max Pages to Extract: {config.get('max_pages', 5)}",
+            f"📊 Relevance Threshold: {config.get('relevance_threshold', 0.6)}",
+            f"🎯 Content Grading: {'Enabled' if config.get('enable_grading', True) else 'Disabled'}",
+            f"📁 Output Directory: {self.output_dir}",
+        ]
+        if self.history:
+            lines.append(f"🕘 Research History: {history_path}")
+        self._report("\n".join(lines), logging.DEBUG)
+    
+    def _report(self, message: str, level: int = logging.INFO, **fields):
+        """Console line for ``level``: DEBUG for per-result detail, INFO for steps
+        and totals, WARNING and up for problems; ``fields`` are added to JSON logs"""
+        if level >= self.report_level:
+            self.console.log(level, message, extra=dict(fields, console=True))
+    
+    def _shared(self, kind: str, factory, *key):
+        """Resource from the registry when one was given, otherwise a private instance"""
+        if self.registry is None:
+            return factory()
+        return self.registry.get(kind, factory, *key)
+    
+    def _shared_llm(self, settings: Dict[str, Any]) -> LLMProvider:
+        """LLM provider for ``settings``, shared with any researcher configured the same way"""
+        return self._shared('llm', lambda: self._setup_llm_provider(settings),
+                            *(repr(settings.get(key)) for key in LLM_CONFIG_KEYS))
+    
+    @staticmethod
+    def _llm_settings(base: Dict[str, Any], override, default_model: Optional[str] = None) -> Dict[str, Any]:
+        """``base`` config with LLM overrides applied; ``override`` may be just a provider name
+
+        An override without a model gets ``default_model`` if given; a switch
+        to another provider otherwise gets its entry in DEFAULT_LLM_MODELS.
+        """
+        if isinstance(override, str):
+            override = {'llm_provider': override}
+        settings = dict(base, **override)
+        if 'llm_model' in override:
+            return settings
+        if default_model:
+            settings['llm_model'] = default_model
+        elif settings.get('llm_provider') != base.get('llm_provider'):
+            # The base model name means nothing to another provider
+            settings.pop('llm_model', None)
+            model = DEFAULT_LLM_MODELS.get(str(settings.get('llm_provider')).lower())
+            if model:
+                settings['llm_model'] = model
+        return settings
+    
+    def _setup_llm_provider(self, settings: Optional[Dict[str, Any]] = None) -> LLMProvider:
+        """Setup LLM provider based on configuration
+        
+        'llm_fallbacks' lists backup providers as config overrides (or just a
+        provider name), e.g. ``[{'llm_provider': 'anthropic', 'llm_model':
+        'claude-haiku-4-5'}]``; with any configured, calls are hedged across
+        them after 'llm_hedge_after' seconds (or e.g. 'p95'). A fallback
+        without its own model uses 'llm_fallback_model', or on another
+        provider that provider's default from DEFAULT_LLM_MODELS.
+        """
+        settings = self.config if settings is None else settings
+        primary = self._build_llm_provider(settings)
+        fallbacks = settings.get('llm_fallbacks') or []
+        if not fallbacks:
+            return primary
         
-        print(f"🎯 NCSU Advanced Researcher initialized")
-        print(f"🤖 LLM Provider: {self.llm_provider.provider_name}")
-        print(f"🔍 Top-K Results: {config.get('top_k', 10)}")
-        print(f"📄 Max Pages to Extract: {config.get('max_pages', 5)}")
-        print(f"📊 Relevance Threshold: {config.get('relevance_threshold', 0.6)}")
-        print(f"🎯 Content Grading: {'Enabled' if config.get('enable_grading', True) else 'Disabled'}")
-        print(f"📁 Output Directory: {self.output_dir}")
+        backups = [self._build_llm_provider(self._llm_settings(settings, override, settings.get('llm_fallback_model')))
+                   for override in fallbacks]
+        return HedgedLLMProvider([primary] + backups,
+                                 hedge_after=settings.get('llm_hedge_after', 3.0),
+                                 timeout=settings.get('llm_timeout'))
     
-    def _setup_llm_provider(self) -> LLMProvider:
-        """Setup LLM provider based on configuration"""
-        provider_name = self.config.get('llm_provider', 'mock').lower()
+    @staticmethod
+    def _build_llm_provider(settings: Dict[str, Any]) -> LLMProvider:
+        provider_name = settings.get('llm_provider', 'mock').lower()
         
         if provider_name == 'openai':
             return OpenAIProvider(
-                model=self.config.get('llm_model', 'gpt-3.5-turbo'),
-                temperature=self.config.get('llm_temperature', 0.7),
-                max_tokens=self.config.get('llm_max_tokens', 1000)
+                model=settings.get('llm_model') or DEFAULT_LLM_MODELS['openai'],
+                temperature=settings.get('llm_temperature', 0.7),
+                max_tokens=settings.get('llm_max_tokens', 1000),
+                request_timeout=settings.get('llm_request_timeout')
             )
         elif provider_name == 'anthropic':
             return AnthropicProvider(
-                model=self.config.get('llm_model', 'claude-3-sonnet-20240229'),
-                temperature=self.config.get('llm_temperature', 0.7),
-                max_tokens=self.config.get('llm_max_tokens', 1000)
+                model=settings.get('llm_model') or DEFAULT_LLM_MODELS['anthropic'],
+                temperature=settings.get('llm_temperature', 0.7),
+                max_tokens=settings.get('llm_max_tokens', 1000),
+                request_timeout=settings.get('llm_request_timeout')
             )
         else:
-            return MockLLMProvider()
+            return MockLLMProvider(
+                latency=settings.get('mock_latency', 0.0),
+                tokens_per_second=settings.get('mock_tokens_per_second'),
+                prompt_tokens_per_second=settings.get('mock_prompt_tokens_per_second'),
+                grade_score=settings.get('mock_grade_score', 0.333),
+                failure_rate=settings.get('mock_failure_rate', 0.0),
+                stall_rate=settings.get('mock_stall_rate', 0.0),
+                stall_seconds=settings.get('mock_stall_seconds', 0.0),
+                seed=settings.get('mock_seed')
+            )
+    
+    def _call_llm(self, prompt: str, stage: str, metrics: Optional[ResearchMetrics] = None,
+                  provider: Optional[LLMProvider] = None, stopped: Optional[threading.Event] = None) -> str:
+        """Call the LLM (the answer provider unless ``provider`` is given), recording
+        latency and token usage for ``stage``
+        
+        Nothing is recorded once ``stopped`` is set (the run no longer wants
+        the result). Raises LLMProviderError when the call (and any fallback) failed.
+        """
+        provider = provider or self.llm_provider
+        provider.clear_usage()
+        started = time.perf_counter()
+        try:
+            response = provider.complete(prompt)
+        except LLMProviderError:
+            metrics = self._live_metrics(metrics, stopped)
+            if metrics is not None:
+                metrics.incr(f'llm_errors.{stage}')
+            raise
+        elapsed = time.perf_counter() - started
+        
+        metrics = self._live_metrics(metrics, stopped)
+        if metrics is not None:
+            usage = provider.last_usage
+            if usage:
+                metrics.record_llm(stage, usage['prompt_tokens'], usage['completion_tokens'], elapsed,
+                                   estimated=usage.get('estimated', False))
+            else:
+                # Provider doesn't report usage (e.g. mock) - count it ourselves
+                metrics.record_llm(stage, self.tokenizer.count(prompt), self.tokenizer.count(response),
+                                   elapsed, estimated=True)
+        return response
+    
+    @staticmethod
+    def _live_metrics(metrics: Optional[ResearchMetrics],
+                      stopped: Optional[threading.Event]) -> Optional[ResearchMetrics]:
+        """``metrics``, or None once ``stopped`` is set and the run has stopped recording"""
+        if stopped is not None and stopped.is_set():
+            return None
+        return metrics
     
-    def grade_content_relevance(self, content: str, query: str) -> float:
-        """Grade content relevance using LLM"""
+    def grade_content_relevance(self, content: str, query: str, metrics: Optional[ResearchMetrics] = None,
+                                stopped: Optional[threading.Event] = None) -> float:
+        """Grade content relevance using LLM
+        
+        Pages are graded by the grading provider. With 'grade_escalation_margin'
+        set and a separate 'grade_llm', a score within that margin of the
+        relevance threshold (or one that can't be parsed) is graded again by
+        the answer provider, so the stronger model only sees borderline pages.
+        
+        Once ``stopped`` is set (the run stopped early and abandoned this
+        grading), the grade is still returned but not recorded in ``metrics``
+        or the research history.
+        """
+        escalation = self._grade_escalation()
+        cache_key = (self.grade_provider.provider_name, self.grade_provider.model, escalation,
+                     normalize_query(query), PageStore.content_id(content))
+        if self.grade_cache is not None:
+            cached = self.grade_cache.get(cache_key)
+            if self._live_metrics(metrics, stopped) is not None:
+                metrics.record_cache('grade', cached is not None)
+            if cached is not None:
+                return cached
+        
+        # Grades from earlier runs (or a cache warming run) in the research history
+        history_key = None
+        if self.history and self.config.get('history_reuse_grades', True):
+            history_key = self._history_key('grade', *cache_key)
+            stored = self.history.get_grade(history_key)
+            if self._live_metrics(metrics, stopped) is not None:
+                metrics.record_cache('history_grades', stored is not None)
+            if stored is not None:
+                if self.grade_cache is not None:
+                    self.grade_cache.put(cache_key, stored)
+                return stored
         
         # Use full content for grading - no truncation
         content_to_grade = content
@@ -235,20 +705,92 @@ SCORING SCALE:
 Return ONLY a decimal number between 0.0 and 1.0 (e.g., 0.85):"""
         
         try:
-            response = self.llm_provider.generate_response(prompt)
-            # Extract number from response
-            import re
-            match = re.search(r'(\d+\.?\d*)', response)
-            if match:
-                score = float(match.group(1))
-                return max(0.0, min(1.0, score))  # Clamp between 0 and 1
-            return 0.5  # Default if parsing fails
+            score = self._parse_grade(self._call_llm(prompt, 'grade', metrics, self.grade_provider, stopped))
         except Exception as e:
             self.logger.warning(f"Error grading content: {e}")
             return 0.5
+        
+        if escalation and (score is None or abs(score - self.config.get('relevance_threshold', 0.6)) <= escalation[1]):
+            if self._live_metrics(metrics, stopped) is not None:
+                metrics.incr('grades_escalated')
+            try:
+                escalated = self._parse_grade(self._call_llm(prompt, 'grade_escalated', metrics, stopped=stopped))
+                score = escalated if escalated is not None else score
+            except Exception as e:
+                # Keep the first-pass score
+                self.logger.warning(f"Error re-grading borderline content: {e}")
+        
+        if score is None:
+            return 0.5  # Default if parsing fails
+        if self.grade_cache is not None:
+            self.grade_cache.put(cache_key, score)
+        if history_key is not None and not (stopped is not None and stopped.is_set()):
+            try:
+                self.history.put_grade(history_key, score)
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not store grade in history: {e}")
+        return score
     
-    def generate_answer(self, content: str, query: str, sources: List[Dict]) -> str:
-        """Generate final answer using LLM"""
+    @staticmethod
+    def _history_key(*parts) -> str:
+        """Stable key for a history cache table from JSON-serializable parts"""
+        return hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+    
+    def _answer_key(self, query: str) -> str:
+        return self._history_key('answer', self.llm_provider.provider_name, self.llm_provider.model,
+                                 normalize_query(query), [self.config.get(key) for key in ANSWER_CACHE_KEYS])
+    
+    def stored_answer(self, query: str, max_age_hours: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Answer to ``query`` under this config stored in the research history, if any and fresh enough"""
+        if not self.history:
+            return None
+        return self.history.get_answer(self._answer_key(query),
+                                       max_age_hours * 3600 if max_age_hours is not None else None)
+    
+    def _search(self, query: str, metrics: ResearchMetrics) -> List[SearchResult]:
+        """Site search, served from the research history when the same search ran recently"""
+        max_results = self.config.get('top_k', 10)
+        history_key = None
+        if self.history and self.config.get('history_reuse_searches', True):
+            history_key = self._history_key('search', self.scraper.config.search_url, normalize_query(query),
+                                            max_results)
+            max_age_hours = self.config.get('history_search_max_age_hours', 24)
+            stored = self.history.get_search(history_key, max_age_hours * 3600 if max_age_hours is not None else None)
+            metrics.record_cache('history_searches', stored is not None)
+            if stored is not None:
+                return [SearchResult(r['title'], r['url'], r['snippet']) for r in stored]
+        
+        search_results = self.scraper.search(query, max_results=max_results) or []
+        if history_key is not None and search_results:
+            try:
+                self.history.put_search(history_key, [
+                    {'title': r.title, 'url': str(r.url), 'snippet': r.snippet} for r in search_results
+                ])
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not store search results in history: {e}")
+        return search_results
+    
+    def _grade_escalation(self) -> Optional[tuple]:
+        """(answer model, margin) when borderline grades are re-graded, else None"""
+        margin = self.config.get('grade_escalation_margin')
+        if margin is None or self.grade_provider is self.llm_provider:
+            return None
+        return (self.llm_provider.model, margin)
+    
+    @staticmethod
+    def _parse_grade(response: str) -> Optional[float]:
+        """Relevance score from a grading response, clamped to [0, 1]; None if there is none"""
+        import re
+        match = re.search(r'(\d+\.?\d*)', response)
+        if match:
+            return max(0.0, min(1.0, float(match.group(1))))
+        return None
+    
+    def pack_context(self, query: str, sources: List[Dict], min_content_length: Optional[int] = None) -> PackResult:
+        """Select the source text that fits the answer model's token budget
+        
+        ``min_content_length`` defaults to the config value (search snippets pass 0).
+        """
         
         # --- 1. Deduplicate Sources based on URL ---
         unique_sources = []
@@ -261,82 +803,112 @@ Return ONLY a decimal number between 0.0 and 1.0 (e.g., 0.85):"""
                 seen_urls.add(norm_url)
                 unique_sources.append(source)
         
-        # Use unique sources for the rest of the function
-        sources = unique_sources
-
-        def extract_main_content(content: str, max_chars: int = 200000) -> str:
-            """
-            Extract main content - intelligently handle long content
-            - If content is within limit: keep it full
-            - If content exceeds limit: truncate smartly (keep beginning + end)
-            """
-            # Handle None or empty content
-            if content is None:
-                return ""
-            
-            if len(content) <= max_chars:
-                # Content within limit, keep full
-                return content
-            
-            # Content too long, smart truncation: keep 70% start + 30% end
-            keep_start = int(max_chars * 0.7)
-            keep_end = int(max_chars * 0.3)
-            
-            truncated = (
-                content[:keep_start] + 
-                f"\n\n... [Content truncated - original: {len(content):,} chars, showing: {max_chars:,} chars] ...\n\n" +
-                content[-keep_end:]
-            )
-            
-            return truncated
+        # --- 2. Drop sources below the minimum length ---
+        if min_content_length is None:
+            min_content_length = self.config.get('min_content_length', 0)
+        kept_sources = []
+        too_short = []
+        for source in unique_sources:
+            # Safely get content (handle None case)
+            source_content = source.get('content') or ''
+            if len(source_content) < min_content_length:
+                self.logger.debug(f"Source skipped: {source['url']} ({len(source_content):,} chars < min {min_content_length:,} chars)")
+                too_short.append({'url': source['url'], 'reason': 'min_content_length', 'tokens': self.tokenizer.count(source_content)})
+                continue
+            kept_sources.append(source)
+        
+        # --- 3. Drop sentences/paragraphs repeated across sources (contact blocks, disclaimers) ---
+        # The most relevant source keeps each shared passage, since the packer favors it too
+        deduplicated = {}
+        if self.config.get('cross_source_dedup', True) and len(kept_sources) > 1:
+            aggregator = ContentAggregator()
+            order = sorted(range(len(kept_sources)), key=lambda i: -self._relevance(kept_sources[i]))
+            deduped_sources = list(kept_sources)
+            for i in order:
+                source = kept_sources[i]
+                deduped_sources[i] = dict(source, content=aggregator.add(source['url'], source.get('content') or ''))
+            kept_sources = deduped_sources
+            deduplicated = aggregator.report()
+            if deduplicated['chars_in'] > deduplicated['chars_out']:
+                self._report(f"Removed {deduplicated['chars_in'] - deduplicated['chars_out']:,} chars repeated across sources",
+                             logging.DEBUG)
+        
+        # --- 4. Fill the per-model token budget, most relevant spans first ---
+        model = self.llm_provider.model
+        reserved = self.tokenizer.count(self._build_answer_prompt(query, '', '')) + self.llm_provider.max_tokens
+        budget = context_budget(model, reserved, self.config.get('context_token_budget'))
+        packer = ContextPacker(
+            self.tokenizer,
+            budget,
+            max_source_chars=self.config.get('max_content_length', 200000)
+        )
+        packed = packer.pack(query, kept_sources, header=self._source_header)
+        packed.dropped.extend(too_short)
+        packed.deduplicated = deduplicated
+        
+        for item in packed.dropped:
+            if item['reason'] == 'partial':
+                self._report(f"Source trimmed to budget: {item['url']} ({item['spans_dropped']})", logging.DEBUG)
+            elif item['reason'] != 'min_content_length':
+                self._report(f"Source dropped ({item['reason']}): {item['url']}", logging.DEBUG)
         
-        # --- 2. Create Source Map for LLM context ---
+        return packed
+    
+    @staticmethod
+    def _relevance(source: Dict) -> float:
+        try:
+            return float(source.get('relevance_score', 0) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+    
+    @staticmethod
+    def _source_header(idx: int, source: Dict) -> str:
+        return (
+            f"=== SOURCE {idx}: {source['title']} (Relevance: {source.get('relevance_score', 'N/A')}) ===\n"
+            f"URL: {source['url']}\n"
+            f"Content: "
+        )
+    
+    def generate_answer(self, content: Optional[str], query: str, sources: List[Dict],
+                        packed: Optional[PackResult] = None,
+                        metrics: Optional[ResearchMetrics] = None) -> str:
+        """Generate final answer using LLM
+        
+        The prompt is built from ``sources`` (each with its 'content');
+        ``content`` is unused and kept only for backward compatibility.
+        """
+        
+        if packed is None:
+            packed = self.pack_context(query, sources)
+        
+        # --- Create Source Map for LLM context ---
         sources_text_list = []
         source_url_map = []
-
-        # Get max_content_length from config (default to 200000 if not set)
-        max_content_length = self.config.get('max_content_length', 200000)
-        min_content_length = self.config.get('min_content_length', 0)
-
         
-        for i, source in enumerate(sources):
-            idx = i + 1
-            # Safely get content (handle None case)
-            source_content = source.get('content', '') if source.get('content') is not None else ''
-            original_length = len(source_content)
-            
-            # Apply smart truncation
-            processed_content = extract_main_content(source_content, max_chars=200000)
-            
-            if original_length < min_content_length:
-                self.logger.debug(f"Source {idx} skipped: {original_length:,} chars < min {min_content_length:,} chars")
-                continue
-            if original_length > max_content_length:
-                self.logger.info(f"Source {idx} truncated: {original_length:,} → {len(processed_content):,} chars")
-            
-            # Add to content text
+        for idx, source in enumerate(packed.sources, 1):
             sources_text_list.append(
-                f"=== SOURCE {idx}: {source['title']} (Relevance: {source.get('relevance_score', 'N/A')}) ===\n"
-                f"URL: {source['url']}\n"
-                f"Content: {processed_content}\n"
+                self._source_header(idx, {'title': source.title, 'url': source.url, 'relevance_score': source.relevance_score})
+                + f"{source.content}\n"
             )
             # Add to URL map for the prompt
-            source_url_map.append(f"[Source {idx}]: {source['url']}")
+            source_url_map.append(f"[Source {idx}]: {source.url}")
 
         sources_text = "\n".join(sources_text_list)
         source_map_str = "\n".join(source_url_map)
         
-        # --- Check total size and warn if too large ---
-        total_chars = len(sources_text)
-        estimated_tokens = total_chars // 4  # Rough estimate: 1 token ≈ 4 chars
-        
-        if estimated_tokens > 800000:  # Leave room for response
-            self.logger.warning(f"⚠️ Large prompt: ~{estimated_tokens:,} tokens (may hit limits)")
-        else:
-            self.logger.info(f"✅ Prompt size: ~{estimated_tokens:,} tokens (~{total_chars:,} chars)")
+        prompt = self._build_answer_prompt(query, source_map_str, sources_text)
+        self._report(
+            f"✅ Prompt size: {self.tokenizer.count(prompt):,} tokens ({self.tokenizer.name}), "
+            f"content {packed.used_tokens:,}/{packed.budget_tokens:,} budget tokens from {len(packed.sources)} sources",
+            logging.DEBUG
+        )
         
-        # --- 3. Enhanced Prompt with Specific Instructions ---
-        prompt = f"""You are an expert research assistant. Based on the NCSU website content provided below, answer the user's question comprehensively.
+        return self._call_llm(prompt, 'answer', metrics)
+    
+    def _build_answer_prompt(self, query: str, source_map_str: str, sources_text: str) -> str:
+        """Fill the answer prompt template"""
+        # --- Enhanced Prompt with Specific Instructions ---
+        return f"""You are an expert research assistant. Based on the NCSU website content provided below, answer the user's question comprehensively.
 
     USER QUESTION: {query}
 
@@ -367,21 +939,36 @@ You must be an active student to apply. Check your status on the [MyPack Portal]
 Submit the [Travel Request Form](https://forms.ncsu.edu/travel) at least 2 weeks prior [Source 2](https://ncsu.edu/travel).
 
 COMPREHENSIVE ANSWER WITH HYPERLINKS:"""
-        
-        return self.llm_provider.generate_response(prompt)
                             
     
-    def research(self, query: str) -> Dict[str, Any]:
-        """Conduct advanced research with all features"""
-        print(f"\n🔍 ADVANCED NCSU RESEARCH")
-        print("=" * 70)
-        print(f"📋 Query: '{query}'")
-        print(f"🤖 LLM Provider: {self.llm_provider.provider_name}")
-        print(f"🔍 Top-K Results: {self.config.get('top_k', 10)}")
-        print(f"📊 Relevance Threshold: {self.config.get('relevance_threshold', 0.6)}")
+    def research(self, query: str, progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """Conduct advanced research with all features
         
+        ``progress(stage, done, total, **info)`` is called as the run moves
+        through the search, scrape, grade, filter and answer stages (see
+        utils.jobs.JobProgress). It may raise ResearchCancelled to stop the
+        run at the next page or stage boundary.
+        
+        Log records made during the run carry a correlation ID (the caller's,
+        e.g. a job ID, or a new one), also returned as ``results['query_id']``.
+        """
+        with correlation_scope(correlation_id() or uuid.uuid4().hex[:12]):
+            return self._research(query, progress or _no_progress)
+    
+    def _research(self, query: str, progress: Callable[..., None]) -> Dict[str, Any]:
+        self._report(
+            f"\n🔍 ADVANCED NCSU RESEARCH\n{'=' * 70}\n"
+            f"📋 Query: '{query}'\n"
+            f"🤖 LLM Provider: {self.llm_provider.provider_name}\n"
+            f"🔍 Top-K Results: {self.config.get('top_k', 10)}\n"
+            f"📊 Relevance Threshold: {self.config.get('relevance_threshold', 0.6)}",
+            stage='start', query=query
+        )
+        
+        metrics = self.last_metrics = ResearchMetrics(query)
         results = {
             'query': query,
+            'query_id': correlation_id(),
             'timestamp': datetime.now().isoformat(),
             'config': self.config,
             'search_results': [],
@@ -389,24 +976,31 @@ COMPREHENSIVE ANSWER WITH HYPERLINKS:"""
             'graded_pages': [],
             'filtered_pages': [],
             'final_answer': '',
-            'sources': []
+            # 'snippets' when answered from search snippets alone, 'pages' when from fetched pages
+            'answer_path': None,
+            'sources': [],
+            # Page bodies, stored once and referenced by 'content_id' from the page lists above
+            'pages': {}
         }
+        store = PageStore(results['pages'])
+        if self.history:
+            results['history'] = {'pages_reused': []}
+            if self._reuse_answer(query, results, metrics, progress):
+                return self._finish_metrics(results, metrics)
         
         # Step 1: Search NCSU website
-        print(f"\n📋 STEP 1: Searching NCSU website for top-k results...")
-        print("-" * 50)
-        search_results = self.scraper.search(query, max_results=self.config.get('top_k', 10))
-        
-        # Handle None case (search might fail)
-        if search_results is None:
-            search_results = []
+        self._report(f"\n📋 STEP 1: Searching NCSU website for top-k results...\n{'-' * 50}", stage='search')
+        progress('search', 0, 1)
+        with metrics.span('search'):
+            search_results = self._search(query, metrics)
         
         initial_count = len(search_results)
-        print(f"📥 Initial search results: {initial_count}")
+        self._report(f"📥 Initial search results: {initial_count}", logging.DEBUG)
 
         # --- SMART DEDUPLICATION: Remove duplicate URLs ---
         from urllib.parse import urlparse, parse_qs, urlencode
         
+        dedup_started = time.perf_counter()
         unique_results = []
         seen_urls = set()
         duplicate_count = 0
@@ -446,142 +1040,632 @@ COMPREHENSIVE ANSWER WITH HYPERLINKS:"""
                 duplicate_count += 1
 
         search_results = unique_results  # Use deduplicated results
+        metrics.record_span('dedup', time.perf_counter() - dedup_started, removed=duplicate_count)
         # --- END DEDUPLICATION ---
 
         results['search_results'] = [
             {'title': r.title, 'url': str(r.url), 'snippet': r.snippet}
             for r in search_results
         ]
-        print(f"✅ Found {len(search_results)} unique search results")
-        print(f"🔄 Removed {duplicate_count} duplicate URLs")
+        progress('search', 1, 1, results=len(search_results))
+        self._report(f"✅ Found {len(search_results)} unique search results\n🔄 Removed {duplicate_count} duplicate URLs",
+                     stage='search', results=len(search_results), duplicates=duplicate_count)
 
-        # Print all search result URLs
-        print(f"\n🔗 SEARCH RESULT URLs:")
+        # Every search result URL (verbose only)
+        self._report(f"\n🔗 SEARCH RESULT URLs:", logging.DEBUG)
         for i, result in enumerate(search_results, 1):
-            print(f"  {i:2d}. {result.title}")
-            print(f"      🌐 {result.url}")
+            lines = [f"  {i:2d}. {result.title}", f"      🌐 {result.url}"]
             if result.snippet:
                 snippet_preview = result.snippet[:100] + "..." if len(result.snippet) > 100 else result.snippet
-                print(f"      📝 {snippet_preview}")
-            print()
+                lines.append(f"      📝 {snippet_preview}")
+            self._report("\n".join(lines) + "\n", logging.DEBUG, rank=i, url=str(result.url))
 
         if not search_results:
-            print("❌ No search results found")
-            print("⚠️  Trying alternative search approach...")
+            self._report("❌ No search results found", stage='search')
             # Try a simpler search query or direct URL search
             # For now, return empty results but log the issue
             self.logger.warning(f"No search results found for query: {query}")
             # Don't return empty - try to generate answer anyway with mock data
             results['final_answer'] = f"I apologize, but I couldn't find specific search results for '{query}' on the NCSU website. This might be due to:\n\n1. The search functionality may be temporarily unavailable\n2. The query might need to be rephrased\n3. Network connectivity issues\n\nPlease try:\n- Rephrasing your query\n- Using more specific keywords\n- Checking back later if the issue persists\n\nFor information about the Textiles College at NC State, you can visit: https://textiles.ncsu.edu/"
-            return results
+            return self._finish_metrics(results, metrics)
+        
+        # Simple factual queries are often answered by the snippets themselves
+        if self.config.get('snippet_first', False) and self._answer_from_snippets(
+                query, search_results, results, metrics, store, progress):
+            return self._finish_metrics(results, metrics)
         
         # Step 2: Extract content from top pages
         max_pages_config = self.config.get('max_pages', 5)
         pages_to_extract = search_results[:max_pages_config]  # Extract from ALL available results up to max_pages
         
-        print(f"\n📋 STEP 2: Extracting 100% content from top {max_pages_config} pages...")
-        print("-" * 50)
-        print(f"📄 Available search results: {len(search_results)}")
-        print(f"📄 Will extract content from {len(pages_to_extract)} pages:")
-        for i, result in enumerate(pages_to_extract, 1):
-            print(f"  {i:2d}. {result.title}")
-            print(f"      🌐 {result.url}")
-        print()
+        self._report(f"\n📋 STEP 2: Extracting 100% content from top {max_pages_config} pages...\n{'-' * 50}", stage='scrape')
+        self._report(f"📄 Available search results: {len(search_results)}\n"
+                     f"📄 Will extract content from {len(pages_to_extract)} pages", pages=len(pages_to_extract))
+        self._report("".join(f"  {i:2d}. {result.title}\n      🌐 {result.url}\n"
+                             for i, result in enumerate(pages_to_extract, 1)), logging.DEBUG)
         
-        scraped_pages = self.scraper.scrape_pages(pages_to_extract)
+        phase_started = time.perf_counter()
+        if self.config.get('pipeline_mode', 'sequential') == 'streaming':
+            return self._research_streaming(query, pages_to_extract, results, metrics, store, phase_started,
+                                            progress)
         
-        results['extracted_pages'] = [
-            {
-                'title': page.title,
-                'url': str(page.url),
-                'content': page.content,
-                'word_count': len(page.content.split()),
-                'extraction_success': page.extraction_success
-            }
-            for page in scraped_pages
-        ]
+        # Steps 2-3: with an early-stop rule each page is graded as it arrives, so fetching can stop
+        early_stop = self.config.get('early_stop_pages') or self.config.get('early_stop_tokens')
+        scrape_and_grade = self._scrape_until_sufficient if early_stop else self._scrape_then_grade
+        graded_pages = scrape_and_grade(query, pages_to_extract, results, metrics, store, progress)
+        if graded_pages is None:
+            self._report("❌ No content extracted", logging.WARNING, stage='scrape')
+            return self._finish_metrics(results, metrics)
         
-        successful_pages = [p for p in scraped_pages if p.extraction_success]
-        total_words = sum(len(p.content.split()) for p in successful_pages)
+        # Step 4: Filter by relevance threshold
+        filtered_pages = self._filter_pages(graded_pages, metrics)
+        results['filtered_pages'] = filtered_pages
+        progress('filter', 1, 1, pages=len(filtered_pages))
         
-        print(f"✅ Extracted 100% content from {len(successful_pages)} pages")
-        print(f"📊 Total content: {total_words:,} words")
+        # Step 5: Generate final answer
+        self._answer_step(query, filtered_pages, results, metrics, store, progress)
+        results['pipeline'] = self._pipeline_report('sequential', metrics, time.perf_counter() - phase_started)
+        
+        return self._finish_metrics(results, metrics)
+    
+    def _scrape_then_grade(self, query: str, pages_to_extract: List, results: Dict[str, Any],
+                           metrics: ResearchMetrics, store: PageStore,
+                           progress: Callable[..., None] = _no_progress) -> Optional[List[Dict[str, Any]]]:
+        """Steps 2-3 one after the other: fetch every page, then grade the ones with text
+        
+        Returns the graded pages, or None when no page yielded any content.
+        """
+        with metrics.span('scrape', pages=len(pages_to_extract)):
+            scraped_pages = self._scrape_pages(pages_to_extract, results, metrics, progress)
+        for page in scraped_pages:
+            self._record_scraped(page, metrics, store)
+        
+        results['extracted_pages'] = [self._extracted_page(page, store) for page in scraped_pages]
+        
+        # Collapse mirrored/print/paged copies so each text is graded and sent once
+        near_duplicates = self._near_duplicate_index()
+        successful_pages = []
+        for i, page in enumerate(scraped_pages):
+            if page.extraction_success and self._near_duplicate_of(near_duplicates, i, page, metrics) is None:
+                successful_pages.append((i, page))
+        successful_pages = [scraped_pages[near_duplicates.best(i) if near_duplicates else i] for i, _ in successful_pages]
+        if near_duplicates:
+            results['near_duplicates'] = near_duplicates.duplicates
+        total_words = sum(p.word_count for p in successful_pages)
+        
+        self._report(f"✅ Extracted 100% content from {len(successful_pages)} pages\n📊 Total content: {total_words:,} words",
+                     stage='scrape', pages=len(successful_pages), words=total_words)
         
         if not successful_pages:
-            print("❌ No content extracted")
-            return results
+            return None
         
         # Step 3: Grade content relevance
         if self.config.get('enable_grading', True):
-            print(f"\n📋 STEP 3: Grading content relevance using LLM...")
-            print("-" * 50)
+            self._report(f"\n📋 STEP 3: Grading content relevance using LLM...\n{'-' * 50}", stage='grade')
             
             graded_pages = []
+            grade_started = time.perf_counter()
             for i, page in enumerate(successful_pages):
-                print(f"🔍 Grading page {i+1}/{len(successful_pages)}: {page.title}")
-                relevance_score = self.grade_content_relevance(page.content, query)
-                print(f"   📊 Relevance Score: {relevance_score:.3f}")
-                
-                graded_page = {
-                    'title': page.title,
-                    'url': str(page.url),
-                    'content': page.content,
-                    'word_count': len(page.content.split()),
-                    'relevance_score': relevance_score
-                }
+                graded_page = self._grade_page(page, query, metrics, store)
+                self._report(f"🔍 Graded page {i+1}/{len(successful_pages)}: {page.title}\n"
+                             f"   📊 Relevance Score: {graded_page['relevance_score']:.3f}",
+                             logging.DEBUG, url=str(page.url), score=graded_page['relevance_score'])
                 graded_pages.append(graded_page)
+                progress('grade', len(graded_pages), len(successful_pages))
             
             results['graded_pages'] = graded_pages
-            print(f"✅ Graded {len(graded_pages)} pages using LLM")
+            metrics.record_span('grade', time.perf_counter() - grade_started, pages=len(graded_pages))
+            self._report(f"✅ Graded {len(graded_pages)} pages using LLM", stage='grade', pages=len(graded_pages))
         else:
-            graded_pages = [
-                {
-                    'title': page.title,
-                    'url': str(page.url),
-                    'content': page.content,
-                    'word_count': len(page.content.split()),
-                    'relevance_score': 1.0  # Default score when grading disabled
-                }
-                for page in successful_pages
+            # Default score when grading disabled
+            graded_pages = [self._graded_page(page, 1.0, store) for page in successful_pages]
+            results['graded_pages'] = graded_pages
+        
+        return graded_pages
+    
+    def _scrape_until_sufficient(self, query: str, pages_to_extract: List, results: Dict[str, Any],
+                                 metrics: ResearchMetrics, store: PageStore,
+                                 progress: Callable[..., None] = _no_progress) -> Optional[List[Dict[str, Any]]]:
+        """Steps 2-3 page by page, stopping once enough relevant content is in
+        
+        Each page is graded as soon as it is fetched (pages reused from the
+        history first) and the early-stop rule is checked before the next
+        fetch, so pages after that point are never requested (with adaptive
+        concurrency, fetches already in flight are abandoned). They are listed
+        in results['skipped_pages']. Returns the graded pages, or None when no
+        page yielded any content.
+        """
+        grading = self.config.get('enable_grading', True)
+        self._report(f"\n📋 STEPS 2-3: Fetching and grading up to {len(pages_to_extract)} pages until enough are relevant...\n{'-' * 50}",
+                     stage='scrape_grade')
+        
+        scraped: List[Optional[ScrapedPage]] = [None] * len(pages_to_extract)
+        graded: List[Optional[Dict[str, Any]]] = [None] * len(pages_to_extract)
+        near_duplicates = self._near_duplicate_index()
+        stop_rule = None
+        
+        def on_page(i: int, page: ScrapedPage):
+            nonlocal stop_rule
+            scraped[i] = page
+            self._record_scraped(page, metrics, store)
+            if page.extraction_success:
+                original = self._near_duplicate_of(near_duplicates, i, page, metrics)
+                if original is None:
+                    graded_page = self._grade_page(page, query, metrics, store) if grading else self._graded_page(page, 1.0, store)
+                    graded[i] = self._use_best_copy(near_duplicates, i, graded_page, scraped, store)
+                    self._report(f"🔍 Graded {graded[i]['title']}: {graded[i]['relevance_score']:.3f}",
+                                 logging.DEBUG, url=graded[i]['url'], score=graded[i]['relevance_score'])
+                    progress('grade', sum(1 for g in graded if g is not None), len(pages_to_extract))
+                elif graded[original] is not None:
+                    # The copy may have the better URL; the grade carries over to it
+                    graded[original] = self._use_best_copy(near_duplicates, original, graded[original], scraped, store)
+            stop_rule = self._sufficient_content(graded, scraped, near_duplicates)
+            if stop_rule:
+                raise _EnoughContent(stop_rule)
+        
+        with metrics.span('scrape_grade', pages=len(pages_to_extract)):
+            self._scrape_pages(pages_to_extract, results, metrics, progress, on_page)
+        
+        results['extracted_pages'] = [self._extracted_page(page, store) for page in scraped if page is not None]
+        graded_pages = [g for g in graded if g is not None]
+        results['graded_pages'] = graded_pages
+        if near_duplicates:
+            results['near_duplicates'] = near_duplicates.duplicates
+        if stop_rule:
+            results['skipped_pages'] = [
+                {'title': result.title, 'url': str(result.url), 'stage': 'fetch', 'state': 'not_fetched',
+                 'reason': 'early_stop'}
+                for result, page in zip(pages_to_extract, scraped) if page is None
             ]
+            metrics.incr('pages_skipped', len(results['skipped_pages']))
+            results['early_stop'] = {
+                'rule': stop_rule,
+                'pages_graded': len(graded_pages),
+                'pages_skipped': len(results['skipped_pages']),
+            }
+            self._report(f"🛑 Enough relevant content ({stop_rule} rule) - skipped {len(results['skipped_pages'])} pages",
+                         stage='early_stop', rule=stop_rule)
+        self._report(f"✅ Extracted {sum(1 for p in scraped if p is not None and p.extraction_success)} pages, "
+                     f"graded {len(graded_pages)}", stage='scrape_grade')
+        return graded_pages or None
+    
+    def _research_streaming(self, query: str, pages_to_extract: List, results: Dict[str, Any],
+                            metrics: ResearchMetrics, store: PageStore, phase_started: float,
+                            progress: Callable[..., None] = _no_progress) -> Dict[str, Any]:
+        """Steps 2-5 as a producer/consumer pipeline
+        
+        Pages are fetched concurrently (each host still gets the scraper's
+        politeness delay, or its adaptive concurrency limit, between requests)
+        and each one is graded as soon as its fetch completes. With 'pipeline_answer_after' = N, answer generation
+        starts once N pages have passed the relevance threshold, while the
+        remaining pages finish in the background; they are still recorded in
+        the results but are not used in the answer.
+        
+        With 'early_stop_pages' or 'early_stop_tokens' set, the pipeline stops
+        once enough relevant content is in: queued fetches and gradings are
+        cancelled, in-flight ones are abandoned, and every page that was not
+        used is listed in results['skipped_pages'].
+        """
+        grading = self.config.get('enable_grading', True)
+        threshold = self.config.get('relevance_threshold', 0.6)
+        answer_after = self.config.get('pipeline_answer_after')
+        
+        self._report(f"\n📋 STEPS 2-3: Fetching and grading {len(pages_to_extract)} pages concurrently...\n{'-' * 50}", stage='scrape_grade')
+        
+        scraped: List[Optional[ScrapedPage]] = [None] * len(pages_to_extract)
+        graded: List[Optional[Dict[str, Any]]] = [None] * len(pages_to_extract)
+        answered_with = None
+        answer_future = None
+        stop_rule = None
+        # Set when the run stops early or is cancelled, so abandoned gradings stop recording
+        stopped = threading.Event()
+        near_duplicates = self._near_duplicate_index()
+        fetched = to_grade = 0
+        
+        # With adaptive concurrency the host limiter decides how many fetches really run at once
+        scraper_config = self.scraper.config
+        fetch_workers = self.config.get('pipeline_fetch_workers',
+                                        scraper_config.host_max_concurrency if scraper_config.adaptive_concurrency else 4)
+        fetch_pool = ThreadPoolExecutor(fetch_workers, thread_name_prefix='fetch')
+        grade_pool = ThreadPoolExecutor(self.config.get('pipeline_grade_workers', 4), thread_name_prefix='grade')
+        answer_pool = ThreadPoolExecutor(1, thread_name_prefix='answer')
+        try:
+            pending = {
+                fetch_pool.submit(contextvars.copy_context().run, self._scrape_page, result, results, metrics): ('fetch', i)
+                for i, result in enumerate(pages_to_extract)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, i = pending.pop(future)
+                    if kind == 'fetch':
+                        page = future.result()
+                        scraped[i] = page
+                        self._record_scraped(page, metrics, store)
+                        fetched += 1
+                        progress('scrape', fetched, len(pages_to_extract))
+                        if not page.extraction_success:
+                            continue
+                        original = self._near_duplicate_of(near_duplicates, i, page, metrics)
+                        if original is not None:
+                            # The copy may have the better URL; the grade carries over to it
+                            if graded[original] is not None:
+                                graded[original] = self._use_best_copy(near_duplicates, original, graded[original],
+                                                                       scraped, store)
+                            continue
+                        if grading:
+                            pending[grade_pool.submit(contextvars.copy_context().run, self._grade_page,
+                                                      page, query, metrics, store, stopped)] = ('grade', i)
+                            to_grade += 1
+                        else:
+                            graded[i] = self._use_best_copy(near_duplicates, i, self._graded_page(page, 1.0, store),
+                                                            scraped, store)
+                    else:
+                        graded[i] = self._use_best_copy(near_duplicates, i, future.result(), scraped, store)
+                        self._report(f"🔍 Graded {graded[i]['title']}: {graded[i]['relevance_score']:.3f}",
+                                     logging.DEBUG, url=graded[i]['url'], score=graded[i]['relevance_score'])
+                        progress('grade', sum(1 for g in graded if g is not None), to_grade)
+                
+                stop_rule = self._sufficient_content(graded, scraped, near_duplicates)
+                if stop_rule:
+                    stopped.set()
+                    results['skipped_pages'] = self._cancel_pending(pending, pages_to_extract, metrics)
+                    results['early_stop'] = {
+                        'rule': stop_rule,
+                        'pages_graded': sum(1 for g in graded if g is not None),
+                        'pages_skipped': len(results['skipped_pages']),
+                    }
+                    self._report(f"🛑 Enough relevant content ({stop_rule} rule) - skipped {len(results['skipped_pages'])} pages",
+                                 stage='early_stop', rule=stop_rule)
+                    break
+                
+                # Start answering as soon as enough high-scoring content is in
+                if answer_after and answer_future is None:
+                    ready = [g for g in graded if g is not None and g['relevance_score'] >= threshold]
+                    if len(ready) >= answer_after:
+                        answered_with = ready
+                        self._report(f"⚡ {len(ready)} pages ≥ {threshold} - starting answer while {len(pending)} tasks finish")
+                        answer_future = answer_pool.submit(contextvars.copy_context().run, self._answer_step, query,
+                                                           answered_with, results, metrics, store, progress)
+            
+            # Stopped early: don't wait for abandoned in-flight work
+            fetch_pool.shutdown(wait=not stop_rule)
+            grade_pool.shutdown(wait=not stop_rule)
+            metrics.record_span('scrape_grade', time.perf_counter() - phase_started, pages=len(pages_to_extract))
+            
+            scraped_pages = [p for p in scraped if p is not None]
+            results['extracted_pages'] = [self._extracted_page(page, store) for page in scraped_pages]
+            graded_pages = [g for g in graded if g is not None]
             results['graded_pages'] = graded_pages
+            if near_duplicates:
+                results['near_duplicates'] = near_duplicates.duplicates
+            self._report(f"✅ Extracted {sum(1 for p in scraped_pages if p.extraction_success)} pages, graded {len(graded_pages)}",
+                         stage='scrape_grade')
+            
+            if answer_future is not None:
+                answer_future.result()
+                filtered_pages = answered_with
+                results['filtered_pages'] = filtered_pages
+            elif not graded_pages:
+                self._report("❌ No content extracted", logging.WARNING, stage='scrape')
+                return self._finish_metrics(results, metrics)
+            else:
+                filtered_pages = self._filter_pages(graded_pages, metrics)
+                results['filtered_pages'] = filtered_pages
+                progress('filter', 1, 1, pages=len(filtered_pages))
+                self._answer_step(query, filtered_pages, results, metrics, store, progress)
+        except ResearchCancelled:
+            # Drop queued fetches/gradings; the ones already running finish in the background
+            stopped.set()
+            for future in pending:
+                future.cancel()
+            raise
+        finally:
+            fetch_pool.shutdown(wait=False)
+            grade_pool.shutdown(wait=False)
+            answer_pool.shutdown(wait=True)
         
-        # Step 4: Filter by relevance threshold
-        print(f"\n📋 STEP 4: Filtering by relevance threshold ({self.config.get('relevance_threshold', 0.6)})...")
-        print("-" * 50)
+        report = self._pipeline_report('streaming', metrics, time.perf_counter() - phase_started)
+        used_urls = {p['url'] for p in filtered_pages}
+        report['answer_started_early'] = answer_future is not None
+        report['late_pages'] = [
+            p['url'] for p in graded_pages if p['relevance_score'] >= threshold and p['url'] not in used_urls
+        ]
+        results['pipeline'] = report
+        
+        return self._finish_metrics(results, metrics)
+    
+    def _sufficient_content(self, graded: List[Optional[Dict[str, Any]]], scraped: List[Optional[ScrapedPage]],
+                            near_duplicates: Optional[NearDuplicateIndex]) -> Optional[str]:
+        """Return the early-stop rule that is satisfied ('pages' or 'tokens'), if any"""
+        max_pages = self.config.get('early_stop_pages')
+        max_tokens = self.config.get('early_stop_tokens')
+        if not (max_pages or max_tokens):
+            return None
+        
+        min_score = self.config.get('early_stop_score', self.config.get('relevance_threshold', 0.6))
+        relevant = [i for i, g in enumerate(graded) if g is not None and g['relevance_score'] >= min_score]
+        if max_pages and len(relevant) >= max_pages:
+            return 'pages'
+        if max_tokens:
+            # A graded page carries the text of the best copy in its near-duplicate group;
+            # each page caches its own token count
+            pages = (scraped[near_duplicates.best(i) if near_duplicates else i] for i in relevant)
+            if sum(page.token_count(self.tokenizer) for page in pages) >= max_tokens:
+                return 'tokens'
+        return None
+    
+    @staticmethod
+    def _cancel_pending(pending: Dict, pages_to_extract: List, metrics: ResearchMetrics) -> List[Dict[str, Any]]:
+        """Cancel queued fetch/grade tasks and describe every page left unused"""
+        skipped = []
+        for future, (kind, i) in sorted(pending.items(), key=lambda item: item[1][1]):
+            # cancel() only succeeds for tasks that haven't started; running ones are abandoned
+            state = 'cancelled' if future.cancel() else 'abandoned'
+            result = pages_to_extract[i]
+            skipped.append({
+                'title': result.title,
+                'url': str(result.url),
+                'stage': kind,
+                'state': state,
+                'reason': 'early_stop',
+            })
+        pending.clear()
+        metrics.incr('pages_skipped', len(skipped))
+        return skipped
+    
+    def _near_duplicate_index(self) -> Optional[NearDuplicateIndex]:
+        if not self.config.get('near_duplicate_detection', True):
+            return None
+        return NearDuplicateIndex(max_distance=self.config.get('near_duplicate_distance', DEFAULT_MAX_DISTANCE))
+    
+    def _near_duplicate_of(self, index: Optional[NearDuplicateIndex], i: int, page: ScrapedPage,
+                           metrics: ResearchMetrics) -> Optional[int]:
+        """Position of the already-kept page that ``page`` nearly repeats, if any"""
+        if index is None:
+            return None
+        with metrics.span('dedup.page', url=str(page.url)):
+            original = index.add(i, page.content, page.url, rank=i)
+        if original is not None:
+            metrics.incr('near_duplicates')
+            self._report(f"♊ Skipping near-duplicate {page.url} (same text as {index.duplicates[-1]['duplicate_of']})",
+                         logging.DEBUG)
+        return original
+    
+    @staticmethod
+    def _use_best_copy(index: Optional[NearDuplicateIndex], i: int, graded_page: Dict[str, Any],
+                       scraped: List[Optional[ScrapedPage]], store: PageStore) -> Dict[str, Any]:
+        """Graded page with the title/URL/text of the best copy in its near-duplicate group
+        
+        Returns a new dict rather than updating ``graded_page``, which an answer
+        already under way may be reading.
+        """
+        best = index.best(i) if index else i
+        if best == i:
+            return graded_page
+        page = scraped[best]
+        return dict(graded_page, title=page.title, url=str(page.url), content_id=store.put(page.content),
+                    word_count=page.word_count)
+    
+    def _page_from_history(self, result, results: Dict[str, Any], metrics: ResearchMetrics) -> Optional[ScrapedPage]:
+        """Recently fetched copy of a search result's page from the research history, if any"""
+        if not self.history or not self.config.get('history_reuse_pages', True):
+            return None
+        max_age_hours = self.config.get('history_page_max_age_hours', 24)
+        stored = self.history.get_page(str(result.url), max_age_hours * 3600 if max_age_hours is not None else None,
+                                       self._extraction_key())
+        metrics.record_cache('history_pages', stored is not None)
+        if stored is None:
+            return None
+        results['history']['pages_reused'].append(str(result.url))
+        return ScrapedPage(
+            title=stored['title'] or result.title,
+            url=result.url,
+            content=stored['content'],
+            word_count=stored['word_count'] or 0,
+            cached=True
+        )
+    
+    def _extraction_key(self) -> str:
+        """Scraper settings that shape extracted page text; history pages are only reused under the same ones"""
+        return f"enhanced_extraction={self.scraper.config.enhanced_extraction}"
+    
+    def _scrape_page(self, result, results: Dict[str, Any], metrics: ResearchMetrics) -> ScrapedPage:
+        return self._page_from_history(result, results, metrics) or self.scraper.scrape_page(result)
+    
+    def _scrape_pages(self, pages_to_extract, results: Dict[str, Any], metrics: ResearchMetrics,
+                      progress: Callable[..., None] = _no_progress,
+                      on_page: Optional[Callable[[int, ScrapedPage], None]] = None) -> List[Optional[ScrapedPage]]:
+        """Scrape in order, taking what we can from history and fetching the rest
+        
+        ``on_page(i, page)`` sees each page as it comes in, history copies
+        first. If it raises _EnoughContent the remaining fetches are skipped
+        and their entries stay None.
+        """
+        scraped: List[Optional[ScrapedPage]] = [self._page_from_history(r, results, metrics) for r in pages_to_extract]
+        missing = [i for i, page in enumerate(scraped) if page is None]
+        done = len(pages_to_extract) - len(missing)
+        progress('scrape', done, len(pages_to_extract))
+        arrivals = iter(missing)
+        
+        def on_fetched(page: ScrapedPage):
+            nonlocal done
+            i = next(arrivals)
+            scraped[i] = page
+            done += 1
+            progress('scrape', done, len(pages_to_extract))
+            if on_page is not None:
+                on_page(i, page)
         
+        try:
+            if on_page is not None:
+                for i, page in enumerate(scraped):
+                    if page is not None:
+                        on_page(i, page)
+            self.scraper.scrape_pages([pages_to_extract[i] for i in missing], on_fetched)
+        except _EnoughContent:
+            pass
+        return scraped
+    
+    @staticmethod
+    def _record_scraped(page: ScrapedPage, metrics: ResearchMetrics, store: PageStore):
+        # Decode a compact page once: the store keeps the text from here on and the
+        # page shares that string for dedup, grading and the answer
+        page.expand(store.get(store.put(page.content)))
+        if page.cached:
+            metrics.incr('pages_reused')
+            return
+        metrics.record_span('scrape.page', page.fetch_seconds, url=str(page.url),
+                            bytes=page.bytes_fetched, success=page.extraction_success)
+        metrics.incr('bytes_fetched', page.bytes_fetched)
+        metrics.incr('pages_fetched' if page.extraction_success else 'pages_failed')
+    
+    @staticmethod
+    def _extracted_page(page: ScrapedPage, store: PageStore) -> Dict[str, Any]:
+        return {
+            'title': page.title,
+            'url': str(page.url),
+            'content_id': store.put(page.content),
+            'word_count': page.word_count,
+            'extraction_success': page.extraction_success
+        }
+    
+    @staticmethod
+    def _graded_page(page: ScrapedPage, relevance_score: float, store: PageStore) -> Dict[str, Any]:
+        return {
+            'title': page.title,
+            'url': str(page.url),
+            'content_id': store.put(page.content),
+            'word_count': page.word_count,
+            'relevance_score': relevance_score
+        }
+    
+    def _grade_page(self, page: ScrapedPage, query: str, metrics: ResearchMetrics,
+                    store: PageStore, stopped: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Grade one scraped page and return its graded_pages entry"""
+        start = metrics.elapsed()
+        relevance_score = self.grade_content_relevance(page.content, query, metrics, stopped)
+        if self._live_metrics(metrics, stopped) is not None:
+            metrics.record_span('grade.page', metrics.elapsed() - start, start=start, url=str(page.url))
+        return self._graded_page(page, relevance_score, store)
+    
+    def _filter_pages(self, graded_pages: List[Dict[str, Any]], metrics: ResearchMetrics) -> List[Dict[str, Any]]:
+        """Step 4: keep pages at or above the relevance threshold"""
         threshold = self.config.get('relevance_threshold', 0.6)
-        filtered_pages = [p for p in graded_pages if p['relevance_score'] >= threshold]
+        self._report(f"\n📋 STEP 4: Filtering by relevance threshold ({threshold})...\n{'-' * 50}", stage='filter')
         
-        if not filtered_pages:
-            print(f"⚠️ No pages meet threshold {threshold}, using top page")
-            filtered_pages = [max(graded_pages, key=lambda x: x['relevance_score'])]
+        with metrics.span('filter'):
+            filtered_pages = [p for p in graded_pages if p['relevance_score'] >= threshold]
+            
+            if not filtered_pages:
+                self._report(f"⚠️ No pages meet threshold {threshold}, using top page")
+                filtered_pages = [max(graded_pages, key=lambda x: x['relevance_score'])]
         
-        results['filtered_pages'] = filtered_pages
         filtered_words = sum(p['word_count'] for p in filtered_pages)
         
-        print(f"✅ {len(filtered_pages)} pages meet relevance threshold")
-        print(f"📊 Filtered content: {filtered_words:,} words")
+        self._report(f"✅ {len(filtered_pages)} pages meet relevance threshold\n📊 Filtered content: {filtered_words:,} words",
+                     stage='filter', pages=len(filtered_pages), words=filtered_words)
         
-        print(f"\n📊 Filtered Pages (relevance ≥ {threshold}):")
-        for i, page in enumerate(filtered_pages, 1):
-            print(f"  {i}. {page['title']} (score: {page['relevance_score']:.3f})")
+        self._report(f"\n📊 Filtered Pages (relevance ≥ {threshold}):\n" + "\n".join(
+            f"  {i}. {page['title']} (score: {page['relevance_score']:.3f})" for i, page in enumerate(filtered_pages, 1)
+        ), logging.DEBUG)
         
-        # Step 5: Generate final answer
-        print(f"\n📋 STEP 5: Generating LLM answer from filtered content...")
-        print("-" * 50)
+        return filtered_pages
+    
+    def _answer_from_snippets(self, query: str, search_results: List, results: Dict[str, Any],
+                              metrics: ResearchMetrics, store: PageStore,
+                              progress: Callable[..., None] = _no_progress) -> bool:
+        """Snippet-first fast path: grade the search snippets and answer from them if good enough
         
-        # Prepare content for LLM
-        combined_content = "\n\n".join([
-            f"Title: {page['title']}\nURL: {page['url']}\nContent: {page['content']}"
-            for page in filtered_pages
-        ])
+        Each snippet is graded like a page. When the best grade reaches
+        'snippet_confidence' the answer is written from the snippets that pass
+        the relevance threshold and no page is fetched; otherwise the caller
+        goes on to fetch full pages. Needs grading enabled. Returns whether it
+        answered.
+        """
+        snippets = [ScrapedPage(r.title, str(r.url), r.snippet) for r in search_results if (r.snippet or '').strip()]
+        if not snippets or not self.config.get('enable_grading', True):
+            return False
         
-        print(f"📝 Generating answer from {len(combined_content):,} characters of filtered content...")
-        final_answer = self.generate_answer(combined_content, query, filtered_pages)
+        self._report(f"\n⚡ Grading {len(snippets)} search snippets before fetching pages...\n{'-' * 50}",
+                     stage='snippets')
+        started = time.perf_counter()
+        with metrics.span('snippets', snippets=len(snippets)), \
+                ThreadPoolExecutor(self.config.get('pipeline_grade_workers', 4), thread_name_prefix='snippet') as pool:
+            scores = list(pool.map(
+                lambda page, context: context.run(self.grade_content_relevance, page.content, query, metrics),
+                snippets, [contextvars.copy_context() for _ in snippets]
+            ))
+        metrics.incr('snippets_graded', len(snippets))
+        confidence = max(scores)
+        required = self.config.get('snippet_confidence', 0.8)
+        results['snippet_confidence'] = confidence
+        if confidence < required:
+            self._report(f"📉 Best snippet grade {confidence:.3f} < {required} - fetching full pages",
+                         stage='snippets', confidence=confidence)
+            return False
+        
+        self._report(f"✅ Best snippet grade {confidence:.3f} ≥ {required} - answering from snippets",
+                     stage='snippets', confidence=confidence)
+        graded_pages = [self._graded_page(page, score, store) for page, score in zip(snippets, scores)]
+        results['graded_pages'] = graded_pages
+        filtered_pages = self._filter_pages(graded_pages, metrics)
+        results['filtered_pages'] = filtered_pages
+        progress('filter', 1, 1, pages=len(filtered_pages))
+        self._answer_step(query, filtered_pages, results, metrics, store, progress, path='snippets')
+        results['pipeline'] = self._pipeline_report('snippets', metrics, time.perf_counter() - started)
+        return True
+    
+    def _reuse_answer(self, query: str, results: Dict[str, Any], metrics: ResearchMetrics,
+                      progress: Callable[..., None]) -> bool:
+        """Fill ``results`` from a stored answer when 'history_answer_max_age_hours' allows it"""
+        max_age_hours = self.config.get('history_answer_max_age_hours')
+        if max_age_hours is None:
+            return False
+        stored = self.stored_answer(query, max_age_hours)
+        metrics.record_cache('history_answers', stored is not None)
+        if stored is None:
+            return False
+        results.update((key, stored[key]) for key in STORED_ANSWER_FIELDS if key in stored)
+        results['answer_reused'] = datetime.fromtimestamp(stored['answered_at']).isoformat()
+        progress('answer', 1, 1, chars=len(results['final_answer']))
+        self._report(f"♻️  Reusing the answer stored at {results['answer_reused']}", stage='answer',
+                     answered_at=results['answer_reused'])
+        return True
+    
+    def _answer_step(self, query: str, filtered_pages: List[Dict[str, Any]], results: Dict[str, Any],
+                     metrics: ResearchMetrics, store: PageStore, progress: Callable[..., None] = _no_progress,
+                     path: str = 'pages'):
+        """Step 5: pack the filtered pages, generate the answer and list sources"""
+        results['answer_path'] = path
+        progress('answer', 0, 1, pages=len(filtered_pages))
+        self._report(f"\n📋 STEP 5: Generating LLM answer from filtered content...\n{'-' * 50}", stage='answer')
+        
+        # Resolve page bodies for the LLM (these share the stored strings, no copies)
+        answer_sources = [dict(page, content=store.get(page['content_id'])) for page in filtered_pages]
+        
+        with metrics.span('pack'):
+            packed = self.pack_context(query, answer_sources, 0 if path == 'snippets' else None)
+        results['context'] = packed.to_dict()
+        self._report(f"📝 Packed {packed.used_tokens:,}/{packed.budget_tokens:,} tokens from {len(packed.sources)} sources "
+              f"({len(packed.dropped)} dropped or trimmed)", logging.DEBUG)
+        try:
+            with metrics.span('answer'):
+                final_answer = self.generate_answer(None, query, answer_sources, packed=packed, metrics=metrics)
+            self._report(f"✅ Generated LLM answer ({len(final_answer):,} characters)", stage='answer',
+                         chars=len(final_answer))
+        except LLMProviderError as e:
+            # Don't pass the API error off as the answer; flag it so callers can retry
+            self._report(f"❌ Answer generation failed: {e}", logging.ERROR, stage='answer')
+            results['answer_error'] = str(e)
+            final_answer = (
+                "I'm sorry, the language model could not generate an answer right now. "
+                "The sources below are the most relevant NCSU pages found for your question; "
+                "please try again in a moment."
+            )
         results['final_answer'] = final_answer
         
-        print(f"✅ Generated LLM answer ({len(final_answer):,} characters)")
+        progress('answer', 1, 1, chars=len(final_answer))
         
         # Prepare sources
         results['sources'] = [
@@ -593,11 +1677,115 @@ COMPREHENSIVE ANSWER WITH HYPERLINKS:"""
             }
             for page in filtered_pages
         ]
+    
+    @staticmethod
+    def _pipeline_report(mode: str, metrics: ResearchMetrics, wall_seconds: float) -> Dict[str, Any]:
+        """Compare busy time across fetch/grade/answer work to the wall time it took
+        
+        overlap = work / wall; 1.0 means fully sequential, higher means stages ran concurrently.
+        """
+        work = sum(
+            span['seconds'] for span in metrics.to_dict()['spans']
+            if span['name'] in ('scrape.page', 'grade.page', 'pack', 'answer')
+        )
+        return {
+            'mode': mode,
+            'wall_seconds': round(wall_seconds, 6),
+            'work_seconds': round(work, 6),
+            'overlap': round(work / wall_seconds, 3) if wall_seconds else 0.0,
+        }
+    
+    def _finish_metrics(self, results: Dict[str, Any], metrics: ResearchMetrics) -> Dict[str, Any]:
+        """Attach the metrics snapshot to results, export it and index the run in history if configured"""
+        results['metrics'] = metrics.to_dict()
+        if self.scraper.host_limiter is not None:
+            # Process-wide limits and latencies, as left by this and concurrent runs
+            results['host_limits'] = self.scraper.host_limiter.snapshot()
+        
+        if self.history:
+            try:
+                results['history']['run_id'] = self.history.record(
+                    results, provider=self.llm_provider.provider_name,
+                    skip_urls=set(results['history']['pages_reused']),
+                    index_run=self.config.get('history_record_runs', True),
+                    extraction=self._extraction_key()
+                )
+                # Only answers the LLM actually wrote are worth serving again
+                if results['answer_path'] and not results.get('answer_error') and not results.get('answer_reused'):
+                    self.history.put_answer(self._answer_key(results['query']), results['query'],
+                                            {key: results[key] for key in STORED_ANSWER_FIELDS if key in results})
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not record research history: {e}")
+        
+        # 'metrics_path' appends JSON lines per query, or rewrites a Prometheus
+        # textfile (node_exporter textfile collector) when metrics_format='prometheus'
+        metrics_path = self.config.get('metrics_path')
+        if metrics_path:
+            try:
+                if self.config.get('metrics_format', 'jsonl') == 'prometheus':
+                    tmp_path = f"{metrics_path}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        f.write(to_prometheus(results['metrics']))
+                    os.replace(tmp_path, metrics_path)
+                else:
+                    with open(metrics_path, 'a', encoding='utf-8') as f:
+                        f.write(to_json_lines(results['metrics']))
+            except OSError as e:
+                self.logger.warning(f"Could not export metrics to {metrics_path}: {e}")
         
         return results
     
+    def format_answer(self, results: Dict[str, Any]) -> str:
+        """Human-readable answer with sources (the answer .txt / download format)"""
+        lines = [
+            f"Query: {results['query']}",
+            f"Timestamp: {results['timestamp']}",
+            f"LLM Provider: {self.llm_provider.provider_name}",
+            "",
+            "ANSWER:",
+            "=" * 50,
+            results['final_answer'],
+            "",
+            "=" * 50,
+            "SOURCES:",
+        ]
+        for i, source in enumerate(results['sources'], 1):
+            lines.append(f"[{i}] {source['title']} (Relevance: {source['relevance_score']:.3f})")
+            lines.append(f"    {source['url']}")
+            lines.append(f"    ({source['word_count']:,} words)")
+            lines.append("")
+        return "\n".join(lines) + "\n"
+    
     def save_results(self, results: Dict[str, Any]) -> Dict[str, str]:
-        """Save research results to files"""
+        """Save research results to files
+        
+        By default the results are queued as one compressed JSON line for a
+        background writer and this returns immediately with the segment path.
+        results_format='legacy' writes the answer .txt, pretty JSON and YAML
+        config synchronously as before.
+        """
+        retention_files = self.config.get('results_retention_files', 30)
+        retention_days = self.config.get('results_retention_days')
+        
+        if self.config.get('results_format', 'jsonl') == 'legacy':
+            files = self._save_results_legacy(results)
+            for pattern in ('answer_*.txt', 'data_*.json', 'config_*.yaml'):
+                prune_files(self.output_dir, pattern, retention_files, retention_days)
+            return files
+        
+        writer = get_writer(
+            self.output_dir,
+            compression=self.config.get('results_compression', 'gzip'),
+            max_segment_bytes=self.config.get('results_segment_bytes', 64 * 1024 * 1024),
+            retention_files=retention_files,
+            retention_days=retention_days
+        )
+        path = writer.submit(dict(results, llm_provider=self.llm_provider.provider_name))
+        if not self.config.get('results_background', True):
+            writer.flush()
+        return {'results': path}
+    
+    def _save_results_legacy(self, results: Dict[str, Any]) -> Dict[str, str]:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         query_safe = "".join(c for c in results['query'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
         query_short = query_safe[:50].replace(' ', '_')
@@ -607,18 +1795,7 @@ COMPREHENSIVE ANSWER WITH HYPERLINKS:"""
         # Save answer
         answer_file = self.output_dir / f"answer_{query_short}_{timestamp}.txt"
         with open(answer_file, 'w', encoding='utf-8') as f:
-            f.write(f"Query: {results['query']}\n")
-            f.write(f"Timestamp: {results['timestamp']}\n")
-            f.write(f"LLM Provider: {self.llm_provider.provider_name}\n\n")
-            f.write("ANSWER:\n")
-            f.write("=" * 50 + "\n")
-            f.write(results['final_answer'])
-            f.write("\n\n" + "=" * 50 + "\n")
-            f.write("SOURCES:\n")
-            for i, source in enumerate(results['sources'], 1):
-                f.write(f"[{i}] {source['title']} (Relevance: {source['relevance_score']:.3f})\n")
-                f.write(f"    {source['url']}\n")
-                f.write(f"    ({source['word_count']:,} words)\n\n")
+            f.write(self.format_answer(results))
         files['answer'] = str(answer_file)
         
         # Save data
@@ -627,7 +1804,8 @@ COMPREHENSIVE ANSWER WITH HYPERLINKS:"""
             json.dump(results, f, indent=2, ensure_ascii=False)
         files['data'] = str(data_file)
         
-        # Save config
+        # Save config (yaml is only needed for this legacy format)
+        import yaml
         config_file = self.output_dir / f"config_{query_short}_{timestamp}.yaml"
         with open(config_file, 'w', encoding='utf-8') as f:
             yaml.dump(results['config'], f, default_flow_style=False)
@@ -636,16 +1814,21 @@ COMPREHENSIVE ANSWER WITH HYPERLINKS:"""
         return files
     
     def display_results(self, results: Dict[str, Any]):
-        """Display research results"""
-        print(f"\n📋 STEP 6: Results")
-        print("-" * 50)
-        print(f"\n🔍 QUERY: {results['query']}")
-        print(f"\n🤖 LLM ANSWER:")
-        print(results['final_answer'])
-        
-        print(f"\n📚 SOURCES (Filtered by Relevance ≥ {self.config.get('relevance_threshold', 0.6)}):")
+        """Display research results (as one record, whatever the verbosity)"""
+        lines = [
+            f"\n📋 STEP 6: Results",
+            "-" * 50,
+            f"\n🔍 QUERY: {results['query']}",
+            f"\n🤖 LLM ANSWER:",
+            results['final_answer'],
+            f"\n📚 SOURCES (Filtered by Relevance ≥ {self.config.get('relevance_threshold', 0.6)}):",
+        ]
         for i, source in enumerate(results['sources'], 1):
-            print(f"[{i}] {source['title']} (Relevance: {source['relevance_score']:.3f})")
-            print(f"    {source['url']}")
-            print(f"    ({source['word_count']:,} words)")
-            print()
+            lines += [
+                f"[{i}] {source['title']} (Relevance: {source['relevance_score']:.3f})",
+                f"    {source['url']}",
+                f"    ({source['word_count']:,} words)",
+                "",
+            ]
+        self.console.info("\n".join(lines), extra={'console': True, 'stage': 'results',
+                                                    'query_id': results.get('query_id')})
@@ -0,0 +1,145 @@
+"""Record/replay of scraper traffic for reproducible runs"""
+import base64
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+MODES = ('record', 'replay', 'auto')
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode when a request was never recorded"""
+
+
+@dataclass
+class CassetteEntry:
+    """One recorded response"""
+    kind: str
+    url: str
+    status: int
+    body: bytes
+    elapsed: float = 0.0
+
+    def to_json(self) -> str:
+        try:
+            body = {'x': self.body.decode('utf-8')}
+        except UnicodeDecodeError:
+            body = {'b64': base64.b64encode(self.body).decode('ascii')}
+        return json.dumps(
+            dict(k=self.kind, u=self.url, s=self.status, e=round(self.elapsed, 4), **body),
+            ensure_ascii=False, separators=(',', ':')
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> 'CassetteEntry':
+        data = json.loads(line)
+        body = data['x'].encode('utf-8') if 'x' in data else base64.b64decode(data['b64'])
+        return cls(kind=data['k'], url=data['u'], status=data['s'], body=body, elapsed=data.get('e', 0.0))
+
+
+class Cassette:
+    """Gzip-compressed JSON Lines file of recorded search and page responses
+
+    Modes:
+        record  - fetch live and append every response to the cassette
+        replay  - serve only from the cassette; unrecorded URLs raise CassetteMiss
+        auto    - replay what is recorded, fetch and record the rest
+
+    ``latency`` is "realistic" (sleep for the recorded fetch time) or "none".
+    Entries are keyed by kind ("http" or "selenium") and URL; the last
+    recording of a URL wins. Each record is appended as its own gzip member,
+    so a crashed recording run keeps everything captured so far.
+    """
+
+    def __init__(self, path: str, mode: str = 'replay', latency: str = 'realistic'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}' (expected one of {', '.join(MODES)})")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CassetteEntry] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @classmethod
+    def from_config(cls, config) -> Optional['Cassette']:
+        """Build a cassette from ScrapingConfig, with NCSU_CASSETTE* env vars taking precedence"""
+        path = os.getenv('NCSU_CASSETTE') or getattr(config, 'cassette_path', None)
+        if not path:
+            return None
+        mode = os.getenv('NCSU_CASSETTE_MODE') or getattr(config, 'cassette_mode', 'replay')
+        latency = os.getenv('NCSU_CASSETTE_LATENCY') or getattr(config, 'cassette_latency', 'realistic')
+        return cls(path, mode=mode, latency=latency)
+
+    @staticmethod
+    def _key(kind: str, url: str) -> str:
+        return f"{kind} {url}"
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            if self.mode == 'replay':
+                self.logger.warning(f"Cassette {self.path} does not exist; every request will miss")
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = CassetteEntry.from_json(line)
+                    self._entries[self._key(entry.kind, entry.url)] = entry
+        self.logger.info(f"Loaded {len(self._entries)} recorded responses from {self.path}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode in ('record', 'auto')
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode in ('replay', 'auto')
+
+    def has(self, kind: str, url: str) -> bool:
+        return self.replaying and self._key(kind, url) in self._entries
+
+    def replay(self, kind: str, url: str) -> Optional[CassetteEntry]:
+        """Return the recorded response (after the configured latency), or None on a miss
+
+        In strict replay mode a miss raises CassetteMiss instead.
+        """
+        if not self.replaying:
+            return None
+        entry = self._entries.get(self._key(kind, url))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            if self.mode == 'replay':
+                raise CassetteMiss(f"No recorded {kind} response for {url}")
+            return None
+        if self.latency == 'realistic' and entry.elapsed > 0:
+            time.sleep(entry.elapsed)
+        return entry
+
+    def record(self, kind: str, url: str, status: int, body: bytes, elapsed: float):
+        """Store a live response and append it to disk"""
+        if not self.recording:
+            return
+        entry = CassetteEntry(kind=kind, url=url, status=status, body=body, elapsed=elapsed)
+        line = (entry.to_json() + "\n").encode('utf-8')
+        with self._lock:
+            self._entries[self._key(kind, url)] = entry
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(gzip.compress(line))
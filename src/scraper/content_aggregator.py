@@ -1,13 +1,97 @@
 """Content aggregation utilities"""
+import hashlib
+import re
+from typing import Any, Dict, Hashable, List, Optional
+
+_PARAGRAPH_SPLIT = re.compile(r'\n\s*\n')
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
 
 class ContentAggregator:
-    """Aggregates and processes scraped content"""
+    """Aggregates and processes scraped content
+    
+    Sources are added one at a time. Each is split into paragraphs and
+    sentences, and any unit already seen in an earlier source (compared
+    ignoring case, punctuation and spacing) is dropped, so shared contact
+    blocks and disclaimers reach the LLM once. Every removal is attributed
+    to the source that kept the text. Sentences shorter than
+    ``min_sentence_chars`` (headings, "Apply now.") are always kept.
+    """
+    
+    def __init__(self, min_sentence_chars: int = 40):
+        self.min_sentence_chars = min_sentence_chars
+        self.reset()
+    
+    def reset(self):
+        self._owners: Dict[bytes, Hashable] = {}
+        self.sources: List[Dict[str, Any]] = []
+        self.chars_in = 0
+        self.chars_out = 0
     
-    def __init__(self):
-        pass
+    @staticmethod
+    def _key(text: str) -> bytes:
+        normalized = _NON_WORD.sub(' ', text.lower()).strip()
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+    
+    def _owner(self, key: bytes, source_id: Hashable) -> Optional[Hashable]:
+        """Earlier source that already holds this unit (None if new or from this source)"""
+        owner = self._owners.get(key)
+        return owner if owner is not None and owner != source_id else None
+    
+    def add(self, source_id: Hashable, text: str) -> str:
+        """Add one source; returns its text minus units seen in earlier sources"""
+        report = {'source': source_id, 'paragraphs_removed': 0, 'sentences_removed': 0,
+                  'chars_removed': 0, 'duplicate_of': {}}
+        
+        def removed(unit: str, owner: Hashable, kind: str):
+            report[kind] += 1
+            report['chars_removed'] += len(unit)
+            report['duplicate_of'][owner] = report['duplicate_of'].get(owner, 0) + 1
+        
+        kept_paragraphs = []
+        for paragraph in _PARAGRAPH_SPLIT.split(text or ''):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            paragraph_key = self._key(paragraph)
+            owner = self._owner(paragraph_key, source_id)
+            if owner is not None and len(paragraph) >= self.min_sentence_chars:
+                removed(paragraph, owner, 'paragraphs_removed')
+                continue
+            
+            sentences = []
+            for sentence in _SENTENCE_SPLIT.split(paragraph):
+                if len(sentence) < self.min_sentence_chars:
+                    sentences.append(sentence)
+                    continue
+                key = self._key(sentence)
+                owner = self._owner(key, source_id)
+                if owner is not None:
+                    removed(sentence, owner, 'sentences_removed')
+                    continue
+                self._owners.setdefault(key, source_id)
+                sentences.append(sentence)
+            if sentences:
+                self._owners.setdefault(paragraph_key, source_id)
+                kept_paragraphs.append(' '.join(sentences))
+        
+        kept = '\n\n'.join(kept_paragraphs)
+        self.chars_in += len(text or '')
+        self.chars_out += len(kept)
+        self.sources.append(report)
+        return kept
+    
+    def report(self) -> Dict[str, Any]:
+        """What was removed from each source, and which source kept it"""
+        return {
+            'chars_in': self.chars_in,
+            'chars_out': self.chars_out,
+            'sources': [r for r in self.sources if r['chars_removed']],
+        }
     
     def aggregate(self, pages):
         """Aggregate content from multiple pages"""
-        return "\n\n".join([p.content for p in pages if p.extraction_success])
-
-
+        self.reset()
+        texts = [self.add(str(p.url), p.content) for p in pages if p.extraction_success]
+        return "\n\n".join(text for text in texts if text)
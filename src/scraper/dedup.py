@@ -0,0 +1,133 @@
+"""Near-duplicate page detection with SimHash and LSH banding"""
+import hashlib
+import re
+from collections import Counter
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+FINGERPRINT_BITS = 64
+# Default for NearDuplicateIndex and the researcher's 'near_duplicate_distance'. On the
+# fixture pages (benchmarks/bench_extraction.py) the same text in another template is
+# 0 bits apart after main-content extraction, while distinct pages sharing the site
+# template come as close as 12 bits when only a paragraph of body is left in the plain
+# page text (22 after extraction). 6 bits keeps a 2x margin below that; lightly edited
+# mirrors (9 bits) are left to the sentence-level cross-source dedup.
+DEFAULT_MAX_DISTANCE = 6
+_WORD = re.compile(r'\w+', re.UNICODE)
+_VARIANT = re.compile(r'(^|[/_.-])(print|printable|amp|mobile)([/_.-]|$)|(^|&)(page|print|format|view)=', re.I)
+
+# Contribution of each bit of a byte value: _BIT_SIGNS[value][j] is +1 if bit j is set, else -1
+_BIT_SIGNS = [tuple(1 if value >> j & 1 else -1 for j in range(8)) for value in range(256)]
+
+
+def simhash(text: str, shingle_words: int = 3) -> int:
+    """64-bit SimHash of ``text`` over overlapping word shingles (0 for texts too short to shingle)
+
+    Texts that share most of their shingles get fingerprints a few bits apart.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_words:
+        return 0
+    blob = b''.join(
+        hashlib.blake2b(' '.join(words[i:i + shingle_words]).encode('utf-8'), digest_size=8).digest()
+        for i in range(len(words) - shingle_words + 1)
+    )
+    # Tally each byte position across all shingle hashes at C speed, then expand
+    # the (at most 256) distinct byte values into per-bit votes
+    votes = [0] * FINGERPRINT_BITS
+    for pos in range(8):
+        for value, count in Counter(blob[pos::8]).items():
+            signs = _BIT_SIGNS[value]
+            base = pos * 8
+            for j in range(8):
+                votes[base + j] += signs[j] * count
+    fingerprint = 0
+    for bit, vote in enumerate(votes):
+        if vote > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def url_rank(url: str) -> Tuple[int, int]:
+    """Sort key preferring canonical-looking URLs (https, no print/page variants, no query, short)"""
+    parsed = urlparse(str(url))
+    penalty = 0
+    if parsed.scheme != 'https':
+        penalty += 1
+    if parsed.query:
+        penalty += 2
+    if _VARIANT.search(parsed.path) or _VARIANT.search(parsed.query):
+        penalty += 4
+    return penalty, len(parsed.path)
+
+
+class NearDuplicateIndex:
+    """Groups near-identical texts and remembers the best URL of each group
+
+    Fingerprints are split into ``max_distance + 1`` bands; two fingerprints
+    within ``max_distance`` bits must agree exactly on at least one band, so
+    only pages sharing a band bucket are compared.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self._buckets: Dict[Tuple[int, int], List[Hashable]] = {}
+        self._fingerprints: Dict[Hashable, int] = {}
+        self._urls: Dict[Hashable, str] = {}
+        self._best: Dict[Hashable, Tuple[Tuple[int, int], int, str, Hashable]] = {}
+        self.duplicates: List[Dict[str, Any]] = []
+
+    def _band_keys(self, fingerprint: int):
+        mask = (1 << self.band_bits) - 1
+        for band in range(self.bands):
+            yield band, (fingerprint >> (band * self.band_bits)) & mask
+
+    def find(self, fingerprint: int) -> Optional[Tuple[Hashable, int]]:
+        """Closest indexed key within ``max_distance`` of ``fingerprint`` and its distance"""
+        best = None
+        for band_key in self._band_keys(fingerprint):
+            for key in self._buckets.get(band_key, ()):
+                distance = hamming(fingerprint, self._fingerprints[key])
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (key, distance)
+        return best
+
+    def add(self, key: Hashable, text: str, url: str, rank: int = 0) -> Optional[Hashable]:
+        """Index a page; returns the key it duplicates, or None if it is new
+
+        Duplicates are not indexed themselves, but one can become the group's
+        best copy (by ``url_rank`` of its URL, then by ``rank``, e.g. search position).
+        """
+        url = str(url)
+        fingerprint = simhash(text)
+        if not fingerprint:
+            return None
+        match = self.find(fingerprint)
+        if match is not None:
+            original, distance = match
+            self.duplicates.append({'url': url, 'duplicate_of': self._urls[original], 'distance': distance})
+            candidate = (url_rank(url), rank, url, key)
+            if candidate < self._best[original]:
+                self._best[original] = candidate
+            return original
+        self._fingerprints[key] = fingerprint
+        self._urls[key] = url
+        self._best[key] = (url_rank(url), rank, url, key)
+        for band_key in self._band_keys(fingerprint):
+            self._buckets.setdefault(band_key, []).append(key)
+        return None
+
+    def best(self, key: Hashable) -> Hashable:
+        """Key of the preferred copy in the group ``key`` heads (``key`` itself if not indexed)"""
+        best = self._best.get(key)
+        return best[3] if best else key
+
+    def best_url(self, key: Hashable) -> Optional[str]:
+        best = self._best.get(key)
+        return best[2] if best else None
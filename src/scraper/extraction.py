@@ -0,0 +1,179 @@
+"""Main-content extraction for scraped pages
+
+Readability-style block scoring: paragraphs and list items vote for their
+parent and grandparent by how much prose they contain, class/id names nudge
+the score up (content, article, main) or down (sidebar, menu, cookie), and
+link-heavy candidates are penalized. The best candidate, plus any sibling
+that scores close to it, becomes the page text. Pages where nothing scores
+well fall back to the plain full-page text.
+"""
+import re
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+# Never content, whatever the page
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'iframe', 'form', 'button',
+                    'nav', 'header', 'footer', 'aside']
+# Elements whose text votes for their ancestors
+SCORED_TAGS = ['p', 'li', 'td', 'pre', 'blockquote', 'dd', 'dt', 'h2', 'h3', 'h4']
+
+UNLIKELY = re.compile(
+    r'cookie|consent|banner|breadcrumb|sidebar|menu|nav|related|quick-?links|social|share|'
+    r'footer|header|masthead|promo|advert|skip|pagination|widget|popup|modal|alert',
+    re.I
+)
+LIKELY = re.compile(r'article|body|content|entry|main|post|story|text|page', re.I)
+NEGATIVE = re.compile(r'sidebar|menu|nav|related|links|footer|contact|comment|meta|widget', re.I)
+POSITIVE = re.compile(r'article|content|entry|main|post|story|text', re.I)
+
+# Elements that start a new paragraph in the extracted text
+BLOCK_TAGS = frozenset(['p', 'li', 'td', 'th', 'pre', 'blockquote', 'dd', 'dt', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                        'div', 'section', 'article', 'main', 'ul', 'ol', 'dl', 'table', 'tr', 'address',
+                        'figcaption', 'body'])
+
+MIN_BLOCK_CHARS = 25
+MIN_MAIN_CHARS = 200
+
+
+def clean_whitespace(text: str) -> str:
+    """Collapse the whitespace left behind by get_text()"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def block_text(root: Tag) -> str:
+    """Text of ``root`` with each block element's text as one paragraph, separated by blank lines
+
+    Keeping the block boundaries lets later steps (cross-source dedup, context
+    packing) work per paragraph, and stops unpunctuated blocks such as contact
+    lines from running into the next sentence.
+    """
+    strings: List[Tuple[Tag, str]] = []
+    _block_strings(root, root, strings)
+    paragraphs, current, owner = [], [], None
+    for block, text in strings:
+        if block is not owner and current:
+            paragraphs.append(clean_whitespace(' '.join(current)))
+            current = []
+        owner = block
+        current.append(text)
+    if current:
+        paragraphs.append(clean_whitespace(' '.join(current)))
+    return '\n\n'.join(p for p in paragraphs if p)
+
+
+def _block_strings(tag: Tag, block: Tag, out: List[Tuple[Tag, str]]):
+    """Append (innermost block element, text) for every non-blank string under ``tag``"""
+    for child in tag.children:
+        if isinstance(child, Tag):
+            _block_strings(child, child if child.name in BLOCK_TAGS else block, out)
+        elif type(child) in (NavigableString, CData):
+            text = child.strip()
+            if text:
+                out.append((block, text))
+
+
+def page_text(soup: BeautifulSoup) -> str:
+    """Whole-page text with scripts, styles and page chrome removed"""
+    for tag in soup(['script', 'style', 'nav', 'footer', 'header']):
+        tag.decompose()
+    return block_text(soup)
+
+
+def _names(tag: Tag) -> str:
+    return ' '.join([tag.get('id') or ''] + list(tag.get('class') or []))
+
+
+def _class_weight(tag: Tag) -> int:
+    names = _names(tag)
+    if not names.strip():
+        return 0
+    weight = 0
+    if NEGATIVE.search(names):
+        weight -= 25
+    if POSITIVE.search(names):
+        weight += 25
+    return weight
+
+
+def _link_density(tag: Tag, text_len: int) -> float:
+    if not text_len:
+        return 1.0
+    link_len = sum(len(a.get_text(' ', strip=True)) for a in tag.find_all('a'))
+    return min(1.0, link_len / text_len)
+
+
+def _strip_unlikely(root: Tag):
+    for tag in root.find_all(BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in root.find_all(True):
+        if tag.decomposed or tag.name in ('html', 'body', 'main', 'article'):
+            continue
+        names = _names(tag)
+        if names.strip() and UNLIKELY.search(names) and not LIKELY.search(names):
+            tag.decompose()
+
+
+def _score_candidates(root: Tag) -> Dict[int, Tuple[Tag, float]]:
+    candidates: Dict[int, List] = {}
+    for block in root.find_all(SCORED_TAGS):
+        text = block.get_text(' ', strip=True)
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+        # One point per block, one per comma, and up to three for length
+        score = 1 + text.count(',') + min(len(text) // 100, 3)
+        for level, ancestor in enumerate((block.parent, block.parent.parent if block.parent else None)):
+            if ancestor is None or not isinstance(ancestor, Tag):
+                continue
+            entry = candidates.get(id(ancestor))
+            if entry is None:
+                base = 5 if ancestor.name in ('article', 'main', 'div', 'section') else 0
+                entry = candidates[id(ancestor)] = [ancestor, base + _class_weight(ancestor)]
+            entry[1] += score if level == 0 else score / 2
+    scored = {}
+    for key, (tag, score) in candidates.items():
+        text_len = len(tag.get_text(' ', strip=True))
+        scored[key] = (tag, score * (1 - _link_density(tag, text_len)))
+    return scored
+
+
+def _clean_candidate(tag: Tag):
+    """Drop link lists and other navigation-like blocks left inside the chosen content"""
+    for child in tag.find_all(['ul', 'ol', 'div', 'table', 'section']):
+        if child.decomposed:
+            continue
+        text_len = len(child.get_text(' ', strip=True))
+        if text_len < 300 and _link_density(child, text_len) > 0.5:
+            child.decompose()
+
+
+def extract_main_text(soup: BeautifulSoup, min_chars: int = MIN_MAIN_CHARS) -> str:
+    """Text of the page's main content block (the full page text if none stands out)
+
+    ``soup`` is modified in place.
+    """
+    # The plain page text is the fallback; take it before any block is removed
+    full_text = page_text(soup)
+    root = soup.body or soup
+    _strip_unlikely(root)
+
+    scored = _score_candidates(root)
+    if not scored:
+        return full_text
+    top, top_score = max(scored.values(), key=lambda item: item[1])
+
+    # Siblings that score close to the winner are usually split content (e.g. two columns)
+    parts = []
+    threshold = max(10, top_score * 0.2)
+    siblings = [top] if top.parent is None else [c for c in top.parent.children if isinstance(c, Tag)]
+    for sibling in siblings:
+        if sibling is top or scored.get(id(sibling), (None, 0))[1] >= threshold:
+            _clean_candidate(sibling)
+            parts.append(block_text(sibling))
+
+    text = '\n\n'.join(part for part in parts if part)
+    if len(text) < min_chars:
+        return full_text
+    return text
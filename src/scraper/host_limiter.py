@@ -0,0 +1,190 @@
+"""Per-host request pacing: a fixed politeness delay, or adaptive concurrency (AIMD)"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+# Responses that mean the host is overloaded (or asking us to back off)
+THROTTLE_STATUSES = {429, 503}
+
+
+def _percentile(values, pct: float) -> float:
+    """Nearest-rank percentile (0.0 for no values), as utils.metrics.percentile
+
+    Kept here so the scraper package doesn't import from ``utils``.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100.0 * len(ordered))) - 1]
+
+
+class _Host:
+    """Limit, in-flight count and recent latencies for one host"""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.latencies: deque = deque(maxlen=100)
+        self.counts = {'requests': 0, 'ok': 0, 'slow': 0, 'errors': 0, 'throttled': 0, 'decreases': 0}
+
+
+class Slot:
+    """One granted request; report how it went with ``record()``"""
+
+    def __init__(self, limiter: 'HostLimiter', host: str):
+        self.limiter = limiter
+        self.host = host
+        self.started = time.perf_counter()
+        self.outcome: Optional[tuple] = None
+
+    def record(self, status: Optional[int] = None, error: bool = False, retry_after: Optional[float] = None):
+        """Record the response status, or ``error=True`` for a timeout/connection failure"""
+        self.outcome = (time.perf_counter() - self.started, status, error, retry_after)
+
+
+class HostLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit per host
+
+    Each host starts at ``initial`` concurrent requests. A response faster
+    than ``latency_target`` grows the limit by about one per round trip
+    (``+increase / limit`` per success); a slow response, a timeout, a
+    connection error, a 429 or any 5xx multiplies it by ``decrease``, at most
+    once per ``cooldown`` seconds so one burst of failures only counts once.
+    A Retry-After on a 429/503 also pauses the host until it expires.
+    """
+
+    def __init__(self, initial: int = 2, min_limit: int = 1, max_limit: int = 8,
+                 latency_target: float = 2.0, increase: float = 1.0, decrease: float = 0.5,
+                 cooldown: float = 1.0):
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._hosts: Dict[str, _Host] = {}
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(str(url)).netloc.lower()
+
+    def _host(self, host: str) -> _Host:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _Host(float(self.initial))
+        return state
+
+    @contextmanager
+    def slot(self, url: str):
+        """Wait for a free slot on ``url``'s host, then hold it for one request
+
+        An exception escaping the block counts as an error unless the caller
+        already recorded an outcome.
+        """
+        host = self.host_of(url)
+        with self._cond:
+            state = self._host(host)
+            while True:
+                wait = state.blocked_until - time.monotonic()
+                if wait <= 0 and state.in_flight < int(state.limit):
+                    break
+                self._cond.wait(timeout=wait if wait > 0 else None)
+            state.in_flight += 1
+        slot = Slot(self, host)
+        try:
+            yield slot
+        except Exception:
+            if slot.outcome is None:
+                slot.record(error=True)
+            raise
+        finally:
+            self._release(slot)
+
+    def _release(self, slot: Slot):
+        seconds, status, error, retry_after = slot.outcome or (time.perf_counter() - slot.started, None, False, None)
+        now = time.monotonic()
+        with self._cond:
+            state = self._host(slot.host)
+            state.in_flight -= 1
+            state.counts['requests'] += 1
+            state.latencies.append(seconds)
+            throttled = status is not None and (status in THROTTLE_STATUSES or status >= 500)
+            slow = not (error or throttled) and seconds > self.latency_target
+            if error:
+                state.counts['errors'] += 1
+            elif throttled:
+                state.counts['throttled'] += 1
+            elif slow:
+                state.counts['slow'] += 1
+            else:
+                state.counts['ok'] += 1
+
+            if error or throttled or slow:
+                if now - state.last_decrease >= self.cooldown:
+                    state.limit = max(float(self.min_limit), state.limit * self.decrease)
+                    state.last_decrease = now
+                    state.counts['decreases'] += 1
+                if throttled and retry_after:
+                    state.blocked_until = max(state.blocked_until, now + retry_after)
+            else:
+                state.limit = min(float(self.max_limit), state.limit + self.increase / state.limit)
+            self._cond.notify_all()
+
+    def limit(self, url: str) -> int:
+        with self._cond:
+            return int(self._host(self.host_of(url)).limit)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current limit, in-flight requests, latency percentiles and outcome counts per host"""
+        now = time.monotonic()
+        with self._cond:
+            return {
+                host: dict(
+                    state.counts,
+                    limit=round(state.limit, 2),
+                    in_flight=state.in_flight,
+                    p50_seconds=round(_percentile(state.latencies, 50), 4),
+                    p95_seconds=round(_percentile(state.latencies, 95), 4),
+                    paused_seconds=round(max(0.0, state.blocked_until - now), 2),
+                )
+                for host, state in self._hosts.items()
+            }
+
+
+class HostPacer:
+    """Fixed politeness delay per host, shared by every fetching thread
+
+    Requests to one host start at least ``delay`` seconds apart, and a
+    request that starts after a response from that host arrived waits until
+    ``delay`` after it, however many threads are fetching.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._ready: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str):
+        """Wait until ``url``'s host is due, then hold it for one request"""
+        host = HostLimiter.host_of(url)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._ready.get(host, now))
+            # Callers arriving while this one waits or runs queue up behind it
+            self._ready[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._ready[host] = max(self._ready[host], time.monotonic() + self.delay)
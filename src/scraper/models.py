@@ -1,8 +1,33 @@
 """Data models for scraper"""
+import re
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional, Union
 from urllib.parse import urlparse
 
+# Word counts are taken over slices of this many characters so counting a
+# huge page never materializes a list of every word at once
+_WORD_COUNT_CHUNK = 65536
+# Same characters str.split() splits on
+_WHITESPACE = re.compile(r'\s')
+
+
+def count_words(text: str) -> int:
+    """Number of whitespace-separated words (same result as ``len(text.split())``)"""
+    if len(text) <= _WORD_COUNT_CHUNK:
+        return len(text.split())
+    count = 0
+    start = 0
+    while start < len(text):
+        end = start + _WORD_COUNT_CHUNK
+        if end < len(text):
+            # Run on to the next whitespace (of any kind) so no word is split across slices
+            match = _WHITESPACE.search(text, end)
+            end = match.end() if match else len(text)
+        count += len(text[start:end].split())
+        start = end
+    return count
+
+
 @dataclass
 class ScrapingConfig:
     """Configuration for web scraping"""
@@ -12,24 +37,114 @@ class ScrapingConfig:
     user_agent: str = "NCSU Research Assistant Bot 1.0"
     delay: float = 1.0
     max_retries: int = 3
+    base_url: str = "https://www.ncsu.edu"
+    search_url: str = "https://www.ncsu.edu/search/"
+    allowed_domain: str = "ncsu.edu"
+    cassette_path: Optional[str] = None
+    cassette_mode: str = "replay"
+    cassette_latency: str = "realistic"
+    compact_content: bool = False
+    http_pool_size: int = 16
+    parse_workers: int = 0
+    parse_min_bytes: int = 16384
+    adaptive_concurrency: bool = False
+    host_max_concurrency: int = 8
+    host_latency_target: float = 2.0
 
-@dataclass
 class SearchResult:
     """Search result data"""
-    title: str
-    url: str
-    snippet: str = ""
+    __slots__ = ('title', 'url', 'snippet')
     
-@dataclass
-class ScrapedPage:
-    """Scraped page data"""
-    title: str
-    url: str
-    content: str
-    extraction_success: bool = True
-    word_count: int = 0
-    
-    def __post_init__(self):
-        if not self.word_count:
-            self.word_count = len(self.content.split())
+    def __init__(self, title: str, url: str, snippet: str = ""):
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+    
+    def __repr__(self):
+        return f"SearchResult(title={self.title!r}, url={self.url!r}, snippet={self.snippet!r})"
+    
+    def __eq__(self, other):
+        if not isinstance(other, SearchResult):
+            return NotImplemented
+        return (self.title, self.url, self.snippet) == (other.title, other.url, other.snippet)
 
+class ScrapedPage:
+    """Scraped page data
+    
+    Word and token counts are computed on first use and cached. With
+    ``compact=True`` the text is held as UTF-8 bytes (about half the memory
+    of a str for non-ASCII pages, and a single allocation) and decoded when
+    ``content`` is read, so a page that is read often should be ``expand()``-ed
+    first.
+    """
+    __slots__ = ('title', 'url', '_content', 'extraction_success', '_word_count', '_token_counts',
+                 'fetch_seconds', 'bytes_fetched', 'cached')
+    
+    def __init__(self, title: str, url: str, content: str, extraction_success: bool = True,
+                 word_count: int = 0, fetch_seconds: float = 0.0, bytes_fetched: int = 0,
+                 cached: bool = False, compact: bool = False):
+        self.title = title
+        self.url = url
+        self._content: Union[str, bytes] = content.encode('utf-8') if compact else content
+        self.extraction_success = extraction_success
+        self._word_count: Optional[int] = word_count or None
+        self._token_counts: Optional[Dict[str, int]] = None
+        self.fetch_seconds = fetch_seconds
+        self.bytes_fetched = bytes_fetched
+        self.cached = cached  # served from research history rather than fetched
+    
+    @property
+    def content(self) -> str:
+        if isinstance(self._content, bytes):
+            return self._content.decode('utf-8')
+        return self._content
+    
+    @content.setter
+    def content(self, value: str):
+        self._content = value.encode('utf-8') if self.compact else value
+        self._word_count = None
+        self._token_counts = None
+    
+    @property
+    def compact(self) -> bool:
+        return isinstance(self._content, bytes)
+    
+    def expand(self, text: Optional[str] = None):
+        """Hold the text as a str from now on, keeping the cached counts
+        
+        ``text`` must equal ``content``; pass a copy kept elsewhere (e.g. by a
+        PageStore) so the page shares it instead of decoding its own.
+        """
+        self._content = self.content if text is None else text
+    
+    @property
+    def content_bytes(self) -> int:
+        """Size of the stored text (UTF-8 bytes when compact, characters otherwise)"""
+        return len(self._content)
+    
+    @property
+    def word_count(self) -> int:
+        if self._word_count is None:
+            # Count on the decoded text: bytes.split() would miss Unicode spaces such as &nbsp;
+            self._word_count = count_words(self.content)
+        return self._word_count
+    
+    @word_count.setter
+    def word_count(self, value: int):
+        self._word_count = value
+    
+    def token_count(self, tokenizer=None) -> int:
+        """Token count of the content under ``tokenizer`` (heuristic 4 chars/token by default)"""
+        name = getattr(tokenizer, 'name', 'heuristic') if tokenizer is not None else 'heuristic'
+        if self._token_counts is None:
+            self._token_counts = {}
+        if name not in self._token_counts:
+            if tokenizer is None:
+                self._token_counts[name] = (len(self.content) + 3) // 4 if self._content else 0
+            else:
+                self._token_counts[name] = tokenizer.count(self.content)
+        return self._token_counts[name]
+    
+    def __repr__(self):
+        return (f"ScrapedPage(title={self.title!r}, url={self.url!r}, content_bytes={self.content_bytes}, "
+                f"extraction_success={self.extraction_success}, cached={self.cached})")
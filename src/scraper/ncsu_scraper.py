@@ -1,21 +1,48 @@
-"""NCSU Website Scraper"""
+"""NCSU Website Scraper
+
+requests, BeautifulSoup and Selenium are imported on first use rather than
+at module load, so importing the scraper (and the UI that imports it) stays
+cheap until a search actually runs.
+"""
+import contextlib
+import contextvars
+import importlib.util
 import os
-import requests
 import time
-from typing import List
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 from urllib.parse import quote_plus, urljoin
 import logging
 
-# Conditional Selenium import (may not be available in all environments)
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
-
+from .cassette import Cassette
 from .models import ScrapingConfig, SearchResult, ScrapedPage
+from .host_limiter import HostLimiter, HostPacer
+from .parse_pool import ParsePool, extract_page_text, parse_search_results
+
+_selenium_available: Optional[bool] = None
+
+
+def selenium_available() -> bool:
+    """Whether Selenium is installed (checked without importing it)"""
+    global _selenium_available
+    if _selenium_available is None:
+        _selenium_available = importlib.util.find_spec('selenium') is not None
+    return _selenium_available
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (HTTP-date values are ignored)"""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_html(markup):
+    """BeautifulSoup tree for ``markup``, importing bs4 on first use"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, 'html.parser')
+
 
 class NCSUScraper:
     """Scraper for NCSU website"""
@@ -23,8 +50,34 @@ class NCSUScraper:
     def __init__(self, config: ScrapingConfig = None):
         self.config = config or ScrapingConfig()
         self.logger = logging.getLogger(__name__)
-        self.base_url = "https://www.ncsu.edu"
-        self.search_url = "https://www.ncsu.edu/search/"
+        self.base_url = self.config.base_url
+        self.search_url = self.config.search_url
+        
+        # Optional record/replay of all search and page traffic
+        self.cassette = Cassette.from_config(self.config)
+        
+        # Pooled keep-alive connections, shared by every thread fetching through this scraper
+        import requests
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.config.http_pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Optional worker processes for BeautifulSoup parsing (0 = parse in the fetching thread)
+        self.parse_pool = None
+        if self.config.parse_workers:
+            self.parse_pool = ParsePool(self.config.parse_workers, min_bytes=self.config.parse_min_bytes)
+            self.parse_pool.warm_up()
+        
+        # Optional AIMD concurrency limit per host, replacing the fixed delay between pages
+        self.host_limiter = None
+        self.host_pacer = None
+        if self.config.adaptive_concurrency:
+            self.host_limiter = HostLimiter(max_limit=self.config.host_max_concurrency,
+                                            latency_target=self.config.host_latency_target)
+        elif self.config.delay > 0:
+            # Page fetches wait out the delay per host, whichever thread (or pipeline) makes them
+            self.host_pacer = HostPacer(self.config.delay)
         
     def search(self, query: str, max_results: int = 10) -> List[SearchResult]:
         """Search NCSU website"""
@@ -35,8 +88,12 @@ class NCSUScraper:
         is_hf_space = os.getenv('SPACE_ID') is not None or os.getenv('HF_SPACE') is not None
         is_restricted = os.getenv('DISABLE_SELENIUM', '').lower() == 'true'
         
+        search_query_url = f"{self.search_url}?q={quote_plus(query)}"
+        replayable = self.cassette is not None and self.cassette.has('selenium', search_query_url)
+        
         # Skip Selenium if in restricted environment, disabled, or not available
-        if (is_hf_space or is_restricted or not SELENIUM_AVAILABLE) and self.config.selenium_enabled:
+        # (a recorded Selenium page can still be replayed without a browser)
+        if (is_hf_space or is_restricted or not selenium_available()) and self.config.selenium_enabled and not replayable:
             self.logger.warning("Selenium not available in this environment, using fallback search method")
             return self._search_without_selenium(query, max_results)
         
@@ -45,100 +102,59 @@ class NCSUScraper:
             return self._search_without_selenium(query, max_results)
         
         try:
-            # Use Selenium for JavaScript-rendered search
-            chrome_options = Options()
-            
-            # 🔧 Anti-detection options to bypass reCAPTCHA
-            # chrome_options.add_argument('--headless')  # 旧版headless容易被检测
-            chrome_options.add_argument('--headless=new')  # 使用新版headless模式，更难检测
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument(f'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            # 🛡️ 反自动化检测
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            driver = webdriver.Chrome(options=chrome_options)
+            # Use Selenium for JavaScript-rendered search (or its recorded page source)
+            page_source = self._render_search_page(search_query_url)
             
-            # 🎭 隐藏webdriver特征
-            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                    Object.defineProperty(navigator, 'plugins', {
-                        get: () => [1, 2, 3, 4, 5]
-                    });
-                    Object.defineProperty(navigator, 'languages', {
-                        get: () => ['en-US', 'en']
-                    });
-                '''
-            })
-            
-            try:
-                search_query_url = f"{self.search_url}?q={quote_plus(query)}"
-                driver.get(search_query_url)
-                
-                # Wait for results to load (增加等待时间，让页面完全加载)
-                time.sleep(5)  # 从3秒增加到5秒
-                
-                # Get page source and parse
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                
-                # Find search results
-                search_results = soup.find_all(['div', 'article', 'li'], class_=lambda x: x and ('result' in x.lower() or 'search' in x.lower()))
-                
-                if not search_results:
-                    # Try alternative selectors
-                    search_results = soup.find_all('a', href=True)
-                
-                for result in search_results[:max_results * 3]:  # Get more than needed
-                    try:
-                        # Try to find title and link
-                        if result.name == 'a':
-                            link = result
-                            title = result.get_text(strip=True)
-                        else:
-                            link = result.find('a', href=True)
-                            title_elem = result.find(['h2', 'h3', 'h4', 'a'])
-                            title = title_elem.get_text(strip=True) if title_elem else ""
-                        
-                        if not link or not title:
-                            continue
-                            
-                        url = link.get('href', '')
-                        
-                        # Filter for NCSU URLs
-                        if not url.startswith('http'):
-                            url = urljoin(self.base_url, url)
-                        
-                        if 'ncsu.edu' not in url:
-                            continue
-                        
-                        # Get snippet
-                        snippet_elem = result.find(['p', 'div', 'span'], class_=lambda x: x and 'snippet' in x.lower() if x else False)
-                        snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
-                        
-                        if len(title) > 5:  # Basic validation
-                            results.append(SearchResult(
-                                title=title[:200],
-                                url=url,
-                                snippet=snippet[:500]
-                            ))
-                        
-                        if len(results) >= max_results:
-                            break
-                            
-                    except Exception as e:
-                        self.logger.debug(f"Error parsing result: {e}")
+            # Get page source and parse
+            soup = parse_html(page_source)
+
+            # Find search results
+            search_results = soup.find_all(['div', 'article', 'li'], class_=lambda x: x and ('result' in x.lower() or 'search' in x.lower()))
+
+            if not search_results:
+                # Try alternative selectors
+                search_results = soup.find_all('a', href=True)
+
+            for result in search_results[:max_results * 3]:  # Get more than needed
+                try:
+                    # Try to find title and link
+                    if result.name == 'a':
+                        link = result
+                        title = result.get_text(strip=True)
+                    else:
+                        link = result.find('a', href=True)
+                        title_elem = result.find(['h2', 'h3', 'h4', 'a'])
+                        title = title_elem.get_text(strip=True) if title_elem else ""
+
+                    if not link or not title:
+                        continue
+
+                    url = link.get('href', '')
+
+                    # Filter for NCSU URLs
+                    if not url.startswith('http'):
+                        url = urljoin(self.base_url, url)
+
+                    if self.config.allowed_domain not in url:
                         continue
-                        
-            finally:
-                driver.quit()
+
+                    # Get snippet
+                    snippet_elem = result.find(['p', 'div', 'span'], class_=lambda x: x and 'snippet' in x.lower() if x else False)
+                    snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
+
+                    if len(title) > 5:  # Basic validation
+                        results.append(SearchResult(
+                            title=title[:200],
+                            url=url,
+                            snippet=snippet[:500]
+                        ))
+
+                    if len(results) >= max_results:
+                        break
+
+                except Exception as e:
+                    self.logger.debug(f"Error parsing result: {e}")
+                    continue
                 
         except Exception as e:
             self.logger.error(f"Selenium search error: {e}")
@@ -150,58 +166,187 @@ class NCSUScraper:
             
         return results[:max_results]
     
-    def scrape_pages(self, search_results: List[SearchResult]) -> List[ScrapedPage]:
-        """Scrape content from search results"""
+    def _render_search_page(self, search_query_url: str) -> str:
+        """Load the search page in headless Chrome and return the rendered HTML"""
+        if self.cassette is not None:
+            entry = self.cassette.replay('selenium', search_query_url)
+            if entry is not None:
+                return entry.body.decode('utf-8')
+        
+        started = time.perf_counter()
+        # Use Selenium for JavaScript-rendered search
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        chrome_options = Options()
+
+        # 🔧 Anti-detection options to bypass reCAPTCHA
+        # chrome_options.add_argument('--headless')  # 旧版headless容易被检测
+        chrome_options.add_argument('--headless=new')  # 使用新版headless模式，更难检测
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--window-size=1920,1080')
+        chrome_options.add_argument(f'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+        # 🛡️ 反自动化检测
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+
+        driver = webdriver.Chrome(options=chrome_options)
+
+        # 🎭 隐藏webdriver特征
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': '''
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                });
+                Object.defineProperty(navigator, 'plugins', {
+                    get: () => [1, 2, 3, 4, 5]
+                });
+                Object.defineProperty(navigator, 'languages', {
+                    get: () => ['en-US', 'en']
+                });
+            '''
+        })
+
+        try:
+            driver.get(search_query_url)
+            
+            # Wait for results to load (增加等待时间，让页面完全加载)
+            time.sleep(5)  # 从3秒增加到5秒
+            
+            page_source = driver.page_source
+        finally:
+            driver.quit()
+        
+        if self.cassette is not None:
+            self.cassette.record('selenium', search_query_url, 200, page_source.encode('utf-8'),
+                                 time.perf_counter() - started)
+        return page_source
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-host concurrency limits and parse pool usage, when enabled"""
+        stats: Dict[str, Any] = {}
+        if self.host_limiter is not None:
+            stats['hosts'] = self.host_limiter.snapshot()
+        if self.parse_pool is not None:
+            stats['parse_pool'] = self.parse_pool.stats()
+        return stats
+    
+    def _parse(self, func, body: bytes, *args):
+        """Run a parse_pool function on ``body``, in the parse pool if there is one"""
+        if self.parse_pool is not None:
+            return self.parse_pool.run(func, body, *args)
+        return func(body, *args)
+    
+    def _http_get(self, url: str, headers: dict, paced: bool = False) -> bytes:
+        """GET ``url`` (or replay it from the cassette) and return the body
+        
+        ``paced`` requests wait for the host's politeness delay first; replayed
+        ones never do.
+        """
+        if self.cassette is not None:
+            entry = self.cassette.replay('http', url)
+            if entry is not None:
+                if entry.status >= 400:
+                    import requests
+                    raise requests.HTTPError(f"{entry.status} Error (recorded) for url: {url}")
+                return entry.body
+        
+        pacing = self.host_pacer.slot(url) if paced and self.host_pacer is not None else contextlib.nullcontext()
+        with pacing:
+            started = time.perf_counter()
+            if self.host_limiter is not None:
+                with self.host_limiter.slot(url) as slot:
+                    response = self.session.get(url, headers=headers, timeout=self.config.timeout)
+                    slot.record(response.status_code, retry_after=_retry_after(response.headers.get('Retry-After')))
+            else:
+                response = self.session.get(url, headers=headers, timeout=self.config.timeout)
+        if self.cassette is not None:
+            self.cassette.record('http', url, response.status_code, response.content,
+                                 time.perf_counter() - started)
+        response.raise_for_status()
+        return response.content
+    
+    def scrape_pages(self, search_results: List[SearchResult],
+                     on_page: Optional[Callable[[ScrapedPage], None]] = None) -> List[ScrapedPage]:
+        """Scrape content from search results
+        
+        ``on_page`` is called with each page as soon as it is scraped; an
+        exception it raises stops the remaining fetches.
+        """
         scraped_pages = []
         
+        if self.host_limiter is not None:
+            return self._scrape_pages_adaptive(search_results, on_page)
+        
         for i, result in enumerate(search_results):
             self.logger.info(f"Scraping {i+1}/{len(search_results)}: {result.url}")
             
-            try:
-                # Add delay between requests
-                if i > 0:
-                    time.sleep(self.config.delay)
-                
-                # Use requests to get content
-                headers = {'User-Agent': self.config.user_agent}
-                response = requests.get(result.url, headers=headers, timeout=self.config.timeout)
-                response.raise_for_status()
-                
-                # Parse with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(['script', 'style', 'nav', 'footer', 'header']):
-                    script.decompose()
-                
-                # Get text content
-                text = soup.get_text(separator=' ', strip=True)
-                
-                # Clean up whitespace
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                text = ' '.join(chunk for chunk in chunks if chunk)
-                
-                scraped_pages.append(ScrapedPage(
-                    title=result.title,
-                    url=result.url,
-                    content=text,
-                    extraction_success=True
-                ))
-                
-                self.logger.info(f"  ✓ Extracted {len(text)} characters")
-                
-            except Exception as e:
-                self.logger.error(f"  ✗ Error scraping {result.url}: {e}")
-                scraped_pages.append(ScrapedPage(
-                    title=result.title,
-                    url=result.url,
-                    content="",
-                    extraction_success=False
-                ))
+            # scrape_page waits out the delay between requests to the same host
+            scraped_pages.append(self.scrape_page(result))
+            if on_page is not None:
+                on_page(scraped_pages[-1])
         
         return scraped_pages
     
+    def _scrape_pages_adaptive(self, search_results: List[SearchResult],
+                               on_page: Optional[Callable[[ScrapedPage], None]]) -> List[ScrapedPage]:
+        """Fetch concurrently, in order, letting the host limiter pace each host"""
+        scraped_pages = []
+        pool = ThreadPoolExecutor(self.config.host_max_concurrency, thread_name_prefix='scrape')
+        # Each fetch runs in a copy of the caller's context so its log records keep the query's correlation ID
+        futures = [pool.submit(contextvars.copy_context().run, self.scrape_page, result) for result in search_results]
+        try:
+            for future in futures:
+                scraped_pages.append(future.result())
+                if on_page is not None:
+                    on_page(scraped_pages[-1])
+        finally:
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+        return scraped_pages
+    
+    def scrape_page(self, result: SearchResult) -> ScrapedPage:
+        """Fetch and extract a single search result
+        
+        Waits for the per-host delay (or an adaptive concurrency slot) first,
+        so concurrent callers such as the streaming pipeline stay polite.
+        """
+        started = time.perf_counter()
+        try:
+            # Use requests to get content
+            headers = {'User-Agent': self.config.user_agent}
+            body = self._http_get(result.url, headers, paced=True)
+            
+            # Parse with BeautifulSoup and keep the main content block (or the whole page
+            # minus scripts/styles/chrome)
+            text = self._parse(extract_page_text, body, self.config.enhanced_extraction)
+            
+            self.logger.info(f"  ✓ Extracted {len(text)} characters from {result.url}")
+            
+            return ScrapedPage(
+                title=result.title,
+                url=result.url,
+                content=text,
+                extraction_success=True,
+                fetch_seconds=time.perf_counter() - started,
+                bytes_fetched=len(body),
+                compact=self.config.compact_content
+            )
+            
+        except Exception as e:
+            self.logger.error(f"  ✗ Error scraping {result.url}: {e}")
+            return ScrapedPage(
+                title=result.title,
+                url=result.url,
+                content="",
+                extraction_success=False,
+                fetch_seconds=time.perf_counter() - started
+            )
+    
     def _search_without_selenium(self, query: str, max_results: int = 10) -> List[SearchResult]:
         """
         Fallback search method that doesn't require Selenium.
@@ -223,110 +368,12 @@ class NCSUScraper:
                 'Connection': 'keep-alive',
             }
             
-            response = requests.get(search_query_url, headers=headers, timeout=self.config.timeout)
-            response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            body = self._http_get(search_query_url, headers)
             
-            # Try multiple selectors for Google Custom Search results
-            # Google Custom Search uses various class names
-            search_result_elements = []
-            
-            # Method 1: Try Google Custom Search specific classes
-            search_result_elements = soup.find_all('div', class_=lambda x: x and (
-                'gsc-webResult' in str(x) or 
-                'gs-webResult' in str(x) or
-                'gsc-result' in str(x) or
-                'gs-result' in str(x)
-            ))
-            
-            # Method 2: Try generic result classes
-            if not search_result_elements:
-                search_result_elements = soup.find_all(['div', 'article', 'li'], class_=lambda x: x and (
-                    'result' in str(x).lower() or 
-                    'search-result' in str(x).lower() or
-                    'search_result' in str(x).lower()
-                ))
-            
-            # Method 3: Try finding result containers by structure
-            if not search_result_elements:
-                # Look for divs containing links to ncsu.edu
-                all_links = soup.find_all('a', href=lambda x: x and 'ncsu.edu' in str(x))
-                for link in all_links[:max_results * 2]:
-                    parent = link.find_parent(['div', 'article', 'li'])
-                    if parent:
-                        search_result_elements.append(parent)
-            
-            # Method 4: Last resort - find all ncsu.edu links
-            if not search_result_elements:
-                all_links = soup.find_all('a', href=lambda x: x and 'ncsu.edu' in str(x))
-                for link in all_links[:max_results]:
-                    search_result_elements.append(link)
-            
-            for result_elem in search_result_elements[:max_results * 2]:
-                try:
-                    # Extract title and URL
-                    if result_elem.name == 'a':
-                        link = result_elem
-                        title = link.get_text(strip=True)
-                        url = link.get('href', '')
-                    else:
-                        link = result_elem.find('a', href=True)
-                        if not link:
-                            continue
-                        title_elem = result_elem.find(['h3', 'h2', 'h4', 'a', 'span', 'div'], class_=lambda x: x and (
-                            'title' in str(x).lower() if x else False
-                        ))
-                        if not title_elem:
-                            title_elem = result_elem.find(['h3', 'h2', 'h4', 'a'])
-                        title = title_elem.get_text(strip=True) if title_elem else link.get_text(strip=True)
-                        url = link.get('href', '')
-                    
-                    if not url or not title or len(title) < 5:
-                        continue
-                    
-                    # Normalize URL
-                    if not url.startswith('http'):
-                        url = urljoin(self.base_url, url)
-                    
-                    # Filter for NCSU URLs only
-                    if 'ncsu.edu' not in url:
-                        continue
-                    
-                    # Skip common non-content URLs
-                    skip_patterns = ['/search', '/login', '/logout', '/admin', '/api', '.pdf', '.jpg', '.png']
-                    if any(pattern in url.lower() for pattern in skip_patterns):
-                        continue
-                    
-                    # Get snippet
-                    snippet = ""
-                    snippet_elem = result_elem.find(['p', 'div', 'span'], class_=lambda x: x and (
-                        'snippet' in str(x).lower() or 
-                        'description' in str(x).lower() or
-                        'gs-snippet' in str(x).lower()
-                    ) if x else False)
-                    if not snippet_elem:
-                        snippet_elem = result_elem.find('p')
-                    if snippet_elem:
-                        snippet = snippet_elem.get_text(strip=True)
-                    
-                    # Avoid duplicates
-                    if any(r.url == url for r in results):
-                        continue
-                    
-                    results.append(SearchResult(
-                        title=title[:200],
-                        url=url,
-                        snippet=snippet[:500]
-                    ))
-                    
-                    if len(results) >= max_results:
-                        break
-                        
-                except Exception as e:
-                    self.logger.debug(f"Error parsing result: {e}")
-                    continue
+            # Parse HTML (in a worker process for large pages when a parse pool is configured)
+            for title, url, snippet in self._parse(parse_search_results, body, max_results, self.base_url,
+                                                   self.config.allowed_domain):
+                results.append(SearchResult(title=title, url=url, snippet=snippet))
             
             self.logger.info(f"Found {len(results)} results using fallback method")
             
@@ -0,0 +1,217 @@
+"""Process-pool HTML parsing
+
+BeautifulSoup parsing and text extraction are pure-Python CPU work, so
+concurrent fetch threads end up taking turns on the GIL. ParsePool sends
+the raw HTML bytes to worker processes and gets back only the extracted
+text (or search-result tuples), which are cheap to pickle. Pages below
+``min_bytes`` are parsed in the calling thread, where the IPC round trip
+would cost more than it saves.
+
+The parse functions here are module-level so they can be pickled by name.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+logger = logging.getLogger(__name__)
+
+# Below this, parsing in-thread beats pickling the page to another process
+DEFAULT_MIN_BYTES = 16 * 1024
+
+
+def extract_page_text(body: bytes, enhanced: bool = True) -> str:
+    """Parse a page and return its main-content (or whole-page) text"""
+    from bs4 import BeautifulSoup
+    from .extraction import extract_main_text, page_text
+
+    soup = BeautifulSoup(body, 'html.parser')
+    # Keep only the main content block, or the whole page minus scripts/styles/chrome
+    return extract_main_text(soup) if enhanced else page_text(soup)
+
+
+def parse_search_results(body: bytes, max_results: int, base_url: str,
+                         allowed_domain: str) -> List[Tuple[str, str, str]]:
+    """(title, url, snippet) of each result on a search page (non-Selenium search)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(body, 'html.parser')
+    results: List[Tuple[str, str, str]] = []
+
+    # Try multiple selectors for Google Custom Search results
+    # Google Custom Search uses various class names
+    search_result_elements = []
+
+    # Method 1: Try Google Custom Search specific classes
+    search_result_elements = soup.find_all('div', class_=lambda x: x and (
+        'gsc-webResult' in str(x) or 
+        'gs-webResult' in str(x) or
+        'gsc-result' in str(x) or
+        'gs-result' in str(x)
+    ))
+
+    # Method 2: Try generic result classes
+    if not search_result_elements:
+        search_result_elements = soup.find_all(['div', 'article', 'li'], class_=lambda x: x and (
+            'result' in str(x).lower() or 
+            'search-result' in str(x).lower() or
+            'search_result' in str(x).lower()
+        ))
+
+    # Method 3: Try finding result containers by structure
+    if not search_result_elements:
+        # Look for divs containing links to ncsu.edu
+        all_links = soup.find_all('a', href=lambda x: x and allowed_domain in str(x))
+        for link in all_links[:max_results * 2]:
+            parent = link.find_parent(['div', 'article', 'li'])
+            if parent:
+                search_result_elements.append(parent)
+
+    # Method 4: Last resort - find all ncsu.edu links
+    if not search_result_elements:
+        all_links = soup.find_all('a', href=lambda x: x and allowed_domain in str(x))
+        for link in all_links[:max_results]:
+            search_result_elements.append(link)
+
+    for result_elem in search_result_elements[:max_results * 2]:
+        try:
+            # Extract title and URL
+            if result_elem.name == 'a':
+                link = result_elem
+                title = link.get_text(strip=True)
+                url = link.get('href', '')
+            else:
+                link = result_elem.find('a', href=True)
+                if not link:
+                    continue
+                title_elem = result_elem.find(['h3', 'h2', 'h4', 'a', 'span', 'div'], class_=lambda x: x and (
+                    'title' in str(x).lower() if x else False
+                ))
+                if not title_elem:
+                    title_elem = result_elem.find(['h3', 'h2', 'h4', 'a'])
+                title = title_elem.get_text(strip=True) if title_elem else link.get_text(strip=True)
+                url = link.get('href', '')
+
+            if not url or not title or len(title) < 5:
+                continue
+
+            # Normalize URL
+            if not url.startswith('http'):
+                url = urljoin(base_url, url)
+
+            # Filter for NCSU URLs only
+            if allowed_domain not in url:
+                continue
+
+            # Skip common non-content URLs
+            skip_patterns = ['/search', '/login', '/logout', '/admin', '/api', '.pdf', '.jpg', '.png']
+            if any(pattern in url.lower() for pattern in skip_patterns):
+                continue
+
+            # Get snippet
+            snippet = ""
+            snippet_elem = result_elem.find(['p', 'div', 'span'], class_=lambda x: x and (
+                'snippet' in str(x).lower() or 
+                'description' in str(x).lower() or
+                'gs-snippet' in str(x).lower()
+            ) if x else False)
+            if not snippet_elem:
+                snippet_elem = result_elem.find('p')
+            if snippet_elem:
+                snippet = snippet_elem.get_text(strip=True)
+
+            # Avoid duplicates
+            if any(r[1] == url for r in results):
+                continue
+
+            results.append((title[:200], url, snippet[:500]))
+
+            if len(results) >= max_results:
+                break
+
+        except Exception as e:
+            logger.debug(f"Error parsing result: {e}")
+            continue
+
+    return results
+
+
+def _warm_up():
+    """Process initializer: import and exercise the parser once so the first real page isn't slow"""
+    extract_page_text(b"<html><body><main><p>warm up</p></main></body></html>")
+
+
+def _ping() -> bool:
+    return True
+
+
+class ParsePool:
+    """Runs parse functions in worker processes, falling back to the calling thread
+
+    The pool starts on first use (or ``warm_up()``) with the 'forkserver'
+    start method where available, so workers are not forked from a process
+    full of threads. If the pool breaks, parsing continues in-thread.
+    """
+
+    def __init__(self, workers: int, min_bytes: int = DEFAULT_MIN_BYTES, start_method: Optional[str] = None):
+        self.workers = workers
+        self.min_bytes = min_bytes
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._broken = False
+        self._lock = threading.Lock()
+        self.counts = {'inline': 0, 'offloaded': 0, 'fallback': 0}
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None and not self._broken:
+                method = self.start_method
+                if method is None:
+                    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method),
+                                                     initializer=_warm_up)
+            return self._executor
+
+    def warm_up(self):
+        """Start every worker now (without waiting) instead of on the first large page"""
+        pool = self._pool()
+        if pool is not None:
+            for _ in range(self.workers):
+                pool.submit(_ping)
+
+    def run(self, func: Callable[..., Any], body: bytes, *args) -> Any:
+        """``func(body, *args)``, in a worker process when ``body`` is large enough"""
+        pool = self._pool() if len(body) >= self.min_bytes else None
+        if pool is None:
+            self._count('inline')
+            return func(body, *args)
+        try:
+            result = pool.submit(func, body, *args).result()
+            self._count('offloaded')
+            return result
+        except BrokenProcessPool:
+            logger.warning("Parse pool broke; parsing in-thread from now on")
+            self._close(broken=True)
+            self._count('fallback')
+            return func(body, *args)
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.counts, workers=self.workers, min_bytes=self.min_bytes, broken=self._broken)
+
+    def _close(self, broken: bool = False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._broken = self._broken or broken
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def close(self):
+        self._close()
@@ -0,0 +1,45 @@
+"""Researcher config for the command-line and API entry points"""
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+# Same defaults the web interface starts with
+DEFAULT_CONFIG = {
+    'llm_provider': 'openai',
+    'llm_model': 'gpt-4.1-mini',
+    'llm_temperature': 0.3,
+    'llm_max_tokens': 4000,
+    'top_k': 20,
+    'max_pages': 20,
+    'relevance_threshold': 0.1,
+    'enable_grading': True,
+    'selenium_enabled': False,
+    'enhanced_extraction': True,
+    'output_dir': 'results',
+    'history_path': os.path.join('results', 'history.db'),
+    'grade_cache_size': 512,
+    'timeout': 30,
+}
+
+
+def parse_overrides(pairs: Iterable[str]) -> Dict[str, Any]:
+    """Parse ``key=value`` pairs, decoding values as JSON when possible"""
+    overrides = {}
+    for pair in pairs:
+        key, _, value = pair.partition('=')
+        try:
+            overrides[key] = json.loads(value)
+        except json.JSONDecodeError:
+            overrides[key] = value
+    return overrides
+
+
+def load_config(path: Optional[str] = None, overrides: Iterable[str] = ()) -> Dict[str, Any]:
+    """DEFAULT_CONFIG, then a YAML/JSON config file, then ``key=value`` overrides"""
+    config = dict(DEFAULT_CONFIG)
+    if path:
+        import yaml
+        with open(path, 'r', encoding='utf-8') as f:
+            config.update(yaml.safe_load(f) or {})
+    config.update(parse_overrides(overrides))
+    return config
@@ -0,0 +1,370 @@
+"""Token-aware context packing for answer prompts"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Context windows (in tokens) of the models we run against. Names are matched
+# by prefix, longest first, so "gpt-4o-mini-2024-07-18" resolves to "gpt-4o-mini".
+MODEL_CONTEXT_WINDOWS = {
+    'gpt-3.5-turbo': 16385,
+    'gpt-4': 8192,
+    'gpt-4-turbo': 128000,
+    'gpt-4o': 128000,
+    'gpt-4o-mini': 128000,
+    'gpt-4.1': 1047576,
+    'gpt-4.1-mini': 1047576,
+    'gpt-4.1-nano': 1047576,
+    'o1': 200000,
+    'o3': 200000,
+    'o4-mini': 200000,
+    'claude-2': 100000,
+    'claude-3': 200000,
+    'claude-3-5': 200000,
+    'claude-3-7': 200000,
+    'claude-haiku-4': 200000,
+    'claude-sonnet-4': 200000,
+    'claude-opus-4': 200000,
+    'mock-model': 16000,
+}
+DEFAULT_CONTEXT_WINDOW = 16000
+
+# Even models with huge windows get slow and expensive long before they fill up,
+# so the packer never plans for more than this unless told otherwise.
+DEFAULT_MAX_CONTEXT_TOKENS = 100000
+
+# Also used to group phrasings of one question (warm_cache.py), hence the short words
+STOPWORDS = {
+    'a', 'an', 'at', 'be', 'do', 'i', 'in', 'is', 'it', 'me', 'my', 'nc', 'of', 'on', 'or', 'to',
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'your', 'all', 'any', 'can',
+    'how', 'what', 'when', 'where', 'which', 'who', 'why', 'with', 'from', 'that',
+    'this', 'there', 'their', 'they', 'them', 'have', 'has', 'had', 'was', 'were',
+    'will', 'would', 'should', 'could', 'about', 'into', 'does', 'did', 'get',
+    'ncsu', 'state', 'university',
+}
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n{2,}')
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+class Tokenizer:
+    """Approximate tokenizer (about 4 characters per token)"""
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return (len(text) + 3) // 4
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Token counts from OpenAI's tiktoken encodings
+
+    Exact for OpenAI models; other models (e.g. Claude) are counted with
+    cl100k_base, which is only an approximation of their own tokenizer.
+    """
+
+    def __init__(self, model: str = None):
+        import tiktoken
+
+        try:
+            self.encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("o200k_base" if model and model.startswith(('gpt-4o', 'gpt-4.1', 'o')) else "cl100k_base")
+        self.name = f"tiktoken:{self.encoding.name}"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+class CallableTokenizer(Tokenizer):
+    """Wraps any ``text -> token count`` function (e.g. a Hugging Face tokenizer)"""
+
+    def __init__(self, func: Callable[[str], int], name: str = "custom"):
+        self.func = func
+        self.name = name
+
+    def count(self, text: str) -> int:
+        return int(self.func(text)) if text else 0
+
+
+_tokenizer_cache: Dict[str, Tokenizer] = {}
+
+
+def get_tokenizer(model: str = None, spec: Any = None) -> Tokenizer:
+    """Return a tokenizer for ``model``
+
+    ``spec`` may be a Tokenizer, a callable, or one of "tiktoken"/"heuristic".
+    Without a spec, tiktoken is used when installed and able to load its
+    encoding, and the heuristic otherwise.
+    """
+    if isinstance(spec, Tokenizer):
+        return spec
+    if callable(spec):
+        return CallableTokenizer(spec)
+    if spec == 'heuristic':
+        return Tokenizer()
+
+    key = model or ''
+    if key not in _tokenizer_cache:
+        try:
+            _tokenizer_cache[key] = TiktokenTokenizer(model)
+        except ImportError:
+            if spec == 'tiktoken':
+                raise ImportError("tiktoken package not installed. Run: pip install tiktoken")
+            _tokenizer_cache[key] = Tokenizer()
+        except Exception as e:
+            # Installed but unusable, e.g. the encoding can't be downloaded offline
+            if spec == 'tiktoken':
+                raise
+            logging.getLogger(__name__).warning(f"tiktoken unavailable ({e}); using the approximate tokenizer")
+            _tokenizer_cache[key] = Tokenizer()
+    return _tokenizer_cache[key]
+
+
+def context_window(model: str = None) -> int:
+    """Look up the context window of ``model`` (tokens)"""
+    if not model:
+        return DEFAULT_CONTEXT_WINDOW
+    name = model.lower()
+    for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if name.startswith(prefix):
+            return MODEL_CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def context_budget(model: str = None, reserved_tokens: int = 0,
+                   max_tokens: Optional[int] = None) -> int:
+    """Tokens available for source content once the prompt and reply are reserved"""
+    cap = DEFAULT_MAX_CONTEXT_TOKENS if max_tokens is None else max_tokens
+    return max(0, min(context_window(model) - reserved_tokens, cap))
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct, meaningful lowercase terms of a query"""
+    terms = []
+    for word in _WORD.findall(query.lower()):
+        if len(word) > 2 and word not in STOPWORDS and word not in terms:
+            terms.append(word)
+    return terms
+
+
+def split_spans(text: str, span_chars: int = 1200) -> List[str]:
+    """Split text into sentence-aligned spans of roughly ``span_chars``"""
+    spans = []
+    current = []
+    length = 0
+    for sentence in _SENTENCE_SPLIT.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        # Hard-wrap runaway "sentences" (tables, link lists) so one span can't eat the budget
+        while len(sentence) > span_chars * 2:
+            cut = sentence.rfind(' ', 0, span_chars)
+            cut = cut if cut > 0 else span_chars
+            if current:
+                spans.append(' '.join(current))
+                current, length = [], 0
+            spans.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if length and length + len(sentence) > span_chars:
+            spans.append(' '.join(current))
+            current, length = [], 0
+        current.append(sentence)
+        length += len(sentence) + 1
+    if current:
+        spans.append(' '.join(current))
+    return spans
+
+
+def trim_span(span: str, max_chars: int) -> str:
+    """Longest start of ``span`` within ``max_chars``, cut after a sentence or, failing that, a word"""
+    if len(span) <= max_chars:
+        return span
+    head = span[:max_chars + 1]
+    sentence_end = max(head.rfind('. '), head.rfind('! '), head.rfind('? '))
+    # Don't give up most of the allowance just to end on a full stop
+    if sentence_end + 1 >= max_chars // 2:
+        return span[:sentence_end + 1]
+    word_end = head.rfind(' ')
+    return span[:word_end].rstrip() if word_end > 0 else ''
+
+
+def score_span(span: str, terms: List[str]) -> float:
+    """Fraction of query terms present in ``span`` (0-1)"""
+    if not terms:
+        return 0.0
+    words = set(_WORD.findall(span.lower()))
+    return sum(1 for t in terms if t in words) / len(terms)
+
+
+@dataclass
+class PackedSource:
+    """A source as it will appear in the prompt"""
+    index: int
+    title: str
+    url: str
+    relevance_score: Any
+    content: str
+    tokens: int
+    original_tokens: int
+    original_chars: int
+    spans_included: int
+    spans_total: int
+    chars_trimmed: int = 0
+
+
+@dataclass
+class PackResult:
+    """Outcome of packing sources into a token budget"""
+    tokenizer: str
+    budget_tokens: int
+    used_tokens: int = 0
+    sources: List[PackedSource] = field(default_factory=list)
+    dropped: List[Dict[str, Any]] = field(default_factory=list)
+    deduplicated: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report of what was included or dropped (without page text)"""
+        return {
+            'tokenizer': self.tokenizer,
+            'budget_tokens': self.budget_tokens,
+            'used_tokens': self.used_tokens,
+            'included': [
+                {
+                    'url': s.url,
+                    'tokens': s.tokens,
+                    'original_tokens': s.original_tokens,
+                    'spans_included': s.spans_included,
+                    'spans_total': s.spans_total,
+                    'truncated': s.spans_included < s.spans_total or s.chars_trimmed > 0,
+                }
+                for s in self.sources
+            ],
+            'dropped': self.dropped,
+            'deduplicated': self.deduplicated,
+        }
+
+
+class ContextPacker:
+    """Fills a token budget with the most relevant spans of each source
+
+    Spans are ranked by page relevance plus query-term coverage, packed
+    greedily best-first, then stitched back together in page order so the
+    LLM still reads each source top to bottom. With ``max_source_chars``, a
+    source whose best span alone is over the limit gets that span trimmed at
+    a sentence or word boundary instead of being dropped.
+    """
+
+    def __init__(self, tokenizer: Tokenizer, budget_tokens: int, span_chars: int = 1200,
+                 max_source_chars: Optional[int] = None):
+        self.tokenizer = tokenizer
+        self.budget_tokens = budget_tokens
+        self.span_chars = span_chars
+        self.max_source_chars = max_source_chars
+
+    def pack(self, query: str, sources: List[Dict[str, Any]],
+             header: Callable[[int, Dict[str, Any]], str] = None) -> PackResult:
+        """Pack ``sources`` (dicts with title/url/content/relevance_score)"""
+        result = PackResult(tokenizer=self.tokenizer.name, budget_tokens=self.budget_tokens)
+        terms = query_terms(query)
+
+        candidates = []
+        per_source = []
+        for s_idx, source in enumerate(sources):
+            content = source.get('content') or ''
+            spans = split_spans(content, self.span_chars)
+            head = header(s_idx + 1, source) if header else ''
+            per_source.append({
+                'spans': spans,
+                'header_tokens': self.tokenizer.count(head),
+                'chosen': [],
+                'trimmed': {},
+                'chars': 0,
+                'tokens': 0,
+            })
+            try:
+                relevance = float(source.get('relevance_score', 0) or 0)
+            except (TypeError, ValueError):
+                relevance = 0.0
+            for sp_idx, span in enumerate(spans):
+                # Page-level relevance dominates; term coverage orders spans within it.
+                # The opening span gets a small nudge since it usually says what the page is.
+                priority = relevance + score_span(span, terms) + (0.05 if sp_idx == 0 else 0.0)
+                candidates.append((-priority, s_idx, sp_idx))
+
+        candidates.sort()
+        used = 0
+        dropped_spans = {}
+        for _, s_idx, sp_idx in candidates:
+            state = per_source[s_idx]
+            span = state['spans'][sp_idx]
+            over_chars = self.max_source_chars is not None and state['chars'] + len(span) > self.max_source_chars
+            if over_chars and not state['chosen']:
+                # A source's best span alone is over the limit: trim it rather than lose the source
+                trimmed = trim_span(span, self.max_source_chars)
+                if trimmed:
+                    state['trimmed'][sp_idx] = len(span) - len(trimmed)
+                    span, over_chars = trimmed, False
+            cost = self.tokenizer.count(span) + 1
+            if not state['chosen']:
+                cost += state['header_tokens']
+            if over_chars or used + cost > self.budget_tokens:
+                state['trimmed'].pop(sp_idx, None)
+                reason = 'max_content_length' if over_chars else 'token_budget'
+                dropped_spans.setdefault(s_idx, {}).setdefault(reason, 0)
+                dropped_spans[s_idx][reason] += 1
+                continue
+            state['chosen'].append(sp_idx)
+            if sp_idx in state['trimmed']:
+                state['spans'][sp_idx] = span
+            state['chars'] += len(span) + 1
+            state['tokens'] += cost
+            used += cost
+
+        for s_idx, source in enumerate(sources):
+            state = per_source[s_idx]
+            content = source.get('content') or ''
+            if not state['chosen']:
+                if state['spans']:
+                    result.dropped.append({
+                        'url': source.get('url'),
+                        # Why its best span didn't fit
+                        'reason': next(iter(dropped_spans[s_idx])),
+                        'tokens': self.tokenizer.count(content),
+                    })
+                else:
+                    result.dropped.append({'url': source.get('url'), 'reason': 'empty', 'tokens': 0})
+                continue
+
+            pieces = []
+            last = -1
+            for sp_idx in sorted(state['chosen']):
+                if pieces and sp_idx != last + 1:
+                    pieces.append('[...]')
+                pieces.append(state['spans'][sp_idx])
+                last = sp_idx
+            result.sources.append(PackedSource(
+                index=s_idx + 1,
+                title=source.get('title', ''),
+                url=source.get('url', ''),
+                relevance_score=source.get('relevance_score', 'N/A'),
+                content=' '.join(pieces),
+                tokens=state['tokens'],
+                original_tokens=self.tokenizer.count(content),
+                original_chars=len(content),
+                spans_included=len(state['chosen']),
+                spans_total=len(state['spans']),
+                chars_trimmed=sum(state['trimmed'].values()),
+            ))
+            if s_idx in dropped_spans or state['trimmed']:
+                entry = {'url': source.get('url'), 'reason': 'partial', 'spans_dropped': dropped_spans.get(s_idx, {})}
+                if state['trimmed']:
+                    entry['chars_trimmed'] = sum(state['trimmed'].values())
+                result.dropped.append(entry)
+
+        result.used_tokens = used
+        return result
@@ -0,0 +1,294 @@
+"""SQLite research history with full-text search over answers and pages
+
+Also holds the persistent search, grade and answer caches the pipeline reads
+(and that warm_cache.py fills ahead of busy periods).
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .page_store import page_content
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query TEXT NOT NULL,
+    answer TEXT,
+    timestamp TEXT,
+    provider TEXT,
+    sources TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT,
+    content_id TEXT,
+    content TEXT,
+    word_count INTEGER,
+    fetched_at REAL NOT NULL,
+    extraction TEXT
+);
+CREATE TABLE IF NOT EXISTS searches (
+    search_key TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    searched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS grades (
+    grade_key TEXT PRIMARY KEY,
+    score REAL NOT NULL,
+    graded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS answers (
+    answer_key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    results TEXT NOT NULL,
+    answered_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs(created_at);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(query, answer, content='runs', content_rowid='id');
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(title, content, content='pages', content_rowid='id');
+"""
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching any of its words"""
+    terms = [t for t in _TERM.findall(text.lower()) if len(t) > 1]
+    return ' OR '.join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase words of ``text``, so case, spacing and punctuation don't split cache entries"""
+    return ' '.join(_TERM.findall(text.lower()))
+
+
+class ResearchHistory:
+    """Past queries, answers, sources and page text in one SQLite file
+
+    Queries/answers and page titles/text are indexed with FTS5 (when the
+    SQLite build has it; otherwise searches fall back to LIKE). Pages are
+    keyed by URL and stored with the extraction settings that produced their
+    text, so the pipeline can reuse recently fetched content; search
+    results, grades and answers are kept under keys the researcher builds
+    from the query and the settings that affect them.
+    """
+
+    def __init__(self, path='results/history.db'):
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(pages)")}
+            if 'extraction' not in columns:
+                # Databases from before extraction settings were stored; their pages never match
+                self._conn.execute("ALTER TABLE pages ADD COLUMN extraction TEXT")
+            try:
+                self._conn.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.logger.warning("SQLite was built without FTS5; history search falls back to LIKE")
+                self.fts = False
+
+    def record(self, results: Dict[str, Any], provider: Optional[str] = None,
+               skip_urls: Optional[set] = None, index_run: bool = True,
+               extraction: Optional[str] = None) -> Optional[int]:
+        """Index one research() result; returns the run id
+
+        Pages are stored with ``extraction``, the settings their text was
+        extracted under. Pages listed in ``skip_urls`` (e.g. ones that were
+        served from history) are not re-stored, so their fetch time stays accurate. With
+        ``index_run=False`` only the pages are stored (cache warming runs
+        shouldn't count as someone asking) and None is returned.
+        """
+        skip_urls = skip_urls or set()
+        sources = [
+            {k: s.get(k) for k in ('title', 'url', 'relevance_score', 'word_count')}
+            for s in results.get('sources', [])
+        ]
+        now = time.time()
+        run_id = None
+        with self._lock, self._conn:
+            if index_run:
+                run_id = self._conn.execute(
+                    "INSERT INTO runs (query, answer, timestamp, provider, sources, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (results.get('query', ''), results.get('final_answer', ''), results.get('timestamp'),
+                     provider, json.dumps(sources, ensure_ascii=False), now)
+                ).lastrowid
+            if run_id is not None and self.fts:
+                self._conn.execute("INSERT INTO runs_fts (rowid, query, answer) VALUES (?, ?, ?)",
+                                   (run_id, results.get('query', ''), results.get('final_answer', '')))
+            for page in results.get('extracted_pages', []):
+                if not page.get('extraction_success') or page['url'] in skip_urls:
+                    continue
+                content = page_content(results, page)
+                if content:
+                    self._put_page(page['url'], page.get('title', ''), page.get('content_id'),
+                                   content, page.get('word_count', 0), now, extraction)
+        return run_id
+
+    def _put_page(self, url: str, title: str, content_id: Optional[str], content: str, word_count: int,
+                  fetched_at: float, extraction: Optional[str] = None):
+        old = self._conn.execute("SELECT id, title, content FROM pages WHERE url = ?", (url,)).fetchone()
+        if old is not None:
+            if self.fts:
+                self._conn.execute(
+                    "INSERT INTO pages_fts (pages_fts, rowid, title, content) VALUES ('delete', ?, ?, ?)",
+                    (old['id'], old['title'], old['content'])
+                )
+            self._conn.execute(
+                "UPDATE pages SET title = ?, content_id = ?, content = ?, word_count = ?, fetched_at = ?, extraction = ? "
+                "WHERE id = ?",
+                (title, content_id, content, word_count, fetched_at, extraction, old['id'])
+            )
+            page_id = old['id']
+        else:
+            page_id = self._conn.execute(
+                "INSERT INTO pages (url, title, content_id, content, word_count, fetched_at, extraction) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, title, content_id, content, word_count, fetched_at, extraction)
+            ).lastrowid
+        if self.fts:
+            self._conn.execute("INSERT INTO pages_fts (rowid, title, content) VALUES (?, ?, ?)",
+                               (page_id, title, content))
+
+    def get_page(self, url: str, max_age_seconds: Optional[float] = None,
+                 extraction: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Stored page for ``url`` if it was fetched within ``max_age_seconds``
+        and extracted under the same ``extraction`` settings"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, title, content_id, content, word_count, fetched_at, extraction FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None or row['extraction'] != extraction:
+            return None
+        if max_age_seconds is not None and time.time() - row['fetched_at'] > max_age_seconds:
+            return None
+        return dict(row)
+
+    def recent_queries(self, since: Optional[float] = None) -> List[Tuple[str, float]]:
+        """(query, created_at) of every run since the ``since`` timestamp, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, created_at FROM runs WHERE created_at >= ? ORDER BY created_at",
+                (since or 0.0,)
+            ).fetchall()
+        return [(row['query'], row['created_at']) for row in rows]
+
+    def get_search(self, key: str, max_age_seconds: Optional[float] = None) -> Optional[List[Dict[str, str]]]:
+        """Stored search results for ``key`` if the search ran within ``max_age_seconds``"""
+        with self._lock:
+            row = self._conn.execute("SELECT results, searched_at FROM searches WHERE search_key = ?",
+                                     (key,)).fetchone()
+        if row is None or (max_age_seconds is not None and time.time() - row['searched_at'] > max_age_seconds):
+            return None
+        return json.loads(row['results'])
+
+    def put_search(self, key: str, results: List[Dict[str, str]]):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO searches (search_key, results, searched_at) VALUES (?, ?, ?)",
+                               (key, json.dumps(results, ensure_ascii=False), time.time()))
+
+    def get_grade(self, key: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT score FROM grades WHERE grade_key = ?", (key,)).fetchone()
+        return None if row is None else row['score']
+
+    def put_grade(self, key: str, score: float):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO grades (grade_key, score, graded_at) VALUES (?, ?, ?)",
+                               (key, score, time.time()))
+
+    def get_answer(self, key: str, max_age_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Stored answer fields for ``key`` (plus 'answered_at') if answered within ``max_age_seconds``"""
+        with self._lock:
+            row = self._conn.execute("SELECT results, answered_at FROM answers WHERE answer_key = ?",
+                                     (key,)).fetchone()
+        if row is None or (max_age_seconds is not None and time.time() - row['answered_at'] > max_age_seconds):
+            return None
+        return dict(json.loads(row['results']), answered_at=row['answered_at'])
+
+    def put_answer(self, key: str, query: str, results: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (answer_key, query, results, answered_at) VALUES (?, ?, ?, ?)",
+                (key, query, json.dumps(results, ensure_ascii=False, default=str), time.time())
+            )
+
+    def search_runs(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Past runs whose query or answer matches ``text``, best match first"""
+        match = fts_query(text)
+        if not match:
+            return []
+        if self.fts:
+            sql = ("SELECT r.id, r.query, r.answer, r.timestamp, r.provider, r.sources, "
+                   "snippet(runs_fts, 1, '**', '**', '…', 16) AS snippet "
+                   "FROM runs_fts JOIN runs r ON r.id = runs_fts.rowid "
+                   "WHERE runs_fts MATCH ? ORDER BY bm25(runs_fts, 4.0, 1.0) LIMIT ?")
+            args = (match, limit)
+        else:
+            sql = ("SELECT id, query, answer, timestamp, provider, sources, substr(answer, 1, 200) AS snippet "
+                   "FROM runs WHERE query LIKE ? OR answer LIKE ? ORDER BY created_at DESC LIMIT ?")
+            args = (f'%{text}%', f'%{text}%', limit)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [dict(row, sources=json.loads(row['sources'] or '[]')) for row in rows]
+
+    def search_pages(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Stored pages whose title or text matches ``text``, best match first"""
+        match = fts_query(text)
+        if not match:
+            return []
+        if self.fts:
+            sql = ("SELECT p.url, p.title, p.word_count, p.fetched_at, "
+                   "snippet(pages_fts, 1, '**', '**', '…', 16) AS snippet "
+                   "FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid "
+                   "WHERE pages_fts MATCH ? ORDER BY bm25(pages_fts, 4.0, 1.0) LIMIT ?")
+            args = (match, limit)
+        else:
+            sql = ("SELECT url, title, word_count, fetched_at, substr(content, 1, 200) AS snippet "
+                   "FROM pages WHERE title LIKE ? OR content LIKE ? ORDER BY fetched_at DESC LIMIT ?")
+            args = (f'%{text}%', f'%{text}%', limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, args).fetchall()]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('runs', 'pages', 'searches', 'grades', 'answers')
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_histories: Dict[str, ResearchHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_history(path) -> ResearchHistory:
+    """Shared history connection per database file"""
+    key = str(Path(path).resolve()) if str(path) != ':memory:' else ':memory:'
+    with _histories_lock:
+        if key not in _histories:
+            _histories[key] = ResearchHistory(path)
+        return _histories[key]
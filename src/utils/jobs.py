@@ -0,0 +1,231 @@
+"""Background research jobs with progress events and cancellation"""
+import itertools
+import logging
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .logger import correlation_scope
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Share of the progress bar each stage covers, in pipeline order
+STAGE_WEIGHTS = (('search', 0.15), ('scrape', 0.40), ('grade', 0.30), ('answer', 0.15))
+
+
+class ResearchCancelled(Exception):
+    """Raised inside a running research() when its job is cancelled"""
+
+
+class JobProgress:
+    """Progress callback handed to ``research(progress=...)``
+
+    Each call records a stage event and, if the job was cancelled, raises
+    ResearchCancelled so the pipeline stops at the next checkpoint.
+    """
+
+    def __init__(self, on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        self.on_event = on_event
+        self.cancel_event = cancel_event or threading.Event()
+
+    def __call__(self, stage: str, done: int = 0, total: int = 0, **info):
+        if self.on_event is not None:
+            self.on_event(dict(stage=stage, done=done, total=total, time=time.time(), **info))
+        self.check()
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise ResearchCancelled("Research cancelled")
+
+
+class ResearchJob:
+    """One queued research request and everything it has reported so far"""
+
+    def __init__(self, job_id: str, query: str, config: Dict[str, Any], owner: Optional[str] = None):
+        self.id = job_id
+        self.query = query
+        self.config = config
+        self.owner = owner
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.exception: Optional[Exception] = None
+        self.traceback: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.events: deque = deque(maxlen=200)
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.cancel_event = threading.Event()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    def record(self, event: Dict[str, Any]):
+        with self._lock:
+            self.events.append(event)
+            self.stages[event['stage']] = event
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event)
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]) -> List[Dict[str, Any]]:
+        """Call ``listener(event)`` from the worker thread for every later event
+
+        Returns the events recorded so far, so nothing falls between the two.
+        The last event of every job has stage 'finished' and carries its status.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            return list(self.events)
+
+    def unsubscribe(self, listener: Callable[[Dict[str, Any]], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _finish(self, status: str):
+        self.status = status
+        self.finished = time.time()
+        self.record(dict(stage='finished', done=1, total=1, time=self.finished, status=status))
+
+    def cancel(self) -> bool:
+        """Ask the job to stop; a queued job never starts, a running one stops at its next checkpoint"""
+        if self.status in FINISHED:
+            return False
+        self.cancel_event.set()
+        return True
+
+    @property
+    def fraction(self) -> float:
+        """Rough overall completion (0-1) from the latest event of each stage"""
+        if self.status == DONE:
+            return 1.0
+        with self._lock:
+            stages = dict(self.stages)
+        completed = 0.0
+        for stage, weight in STAGE_WEIGHTS:
+            event = stages.get(stage)
+            if event is None:
+                continue
+            if event['total']:
+                completed += weight * min(1.0, event['done'] / event['total'])
+            else:
+                completed += weight * (1.0 if event['done'] else 0.0)
+        return round(min(completed, 0.99), 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            last = self.events[-1] if self.events else None
+            stages = {name: dict(event) for name, event in self.stages.items()}
+        return {
+            'id': self.id,
+            'query': self.query,
+            'status': self.status,
+            'fraction': self.fraction,
+            'last_event': last,
+            'stages': stages,
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+
+class JobQueue:
+    """Runs research jobs on a shared worker pool
+
+    ``runner(job, progress)`` does the work and returns the job result; it
+    should pass ``progress`` through to ``research()``. Jobs run in FIFO
+    order on ``workers`` threads, so one user's long run only occupies one
+    worker. Finished jobs are kept for polling until ``keep_finished`` newer
+    ones have completed.
+    """
+
+    def __init__(self, runner: Callable[[ResearchJob, JobProgress], Any], workers: int = 2,
+                 keep_finished: int = 100):
+        self.runner = runner
+        self.workers = workers
+        self.keep_finished = keep_finished
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='research-job')
+        self._jobs: Dict[str, ResearchJob] = {}
+        self._finished: deque = deque()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, query: str, config: Dict[str, Any], owner: Optional[str] = None) -> ResearchJob:
+        with self._lock:
+            job = ResearchJob(f"job-{next(self._ids)}-{int(time.time())}", query, config, owner)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: ResearchJob):
+        progress = JobProgress(job.record, job.cancel_event)
+        # Everything logged while running the job carries its ID
+        with correlation_scope(job.id):
+            try:
+                progress.check()
+                job.status = RUNNING
+                job.started = time.time()
+                job.result = self.runner(job, progress)
+                status = DONE
+            except ResearchCancelled:
+                status = CANCELLED
+            except Exception as e:
+                self.logger.exception(f"Research job {job.id} failed")
+                job.error = str(e)
+                job.exception = e
+                job.traceback = traceback.format_exc()
+                status = FAILED
+        job._finish(status)
+        self._retire(job)
+
+    def _retire(self, job: ResearchJob):
+        with self._lock:
+            self._finished.append(job.id)
+            while len(self._finished) > self.keep_finished:
+                self._jobs.pop(self._finished.popleft(), None)
+
+    def get(self, job_id: str) -> Optional[ResearchJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        return job.cancel() if job else False
+
+    def position(self, job_id: str) -> int:
+        """How many queued jobs are ahead of this one (0 once it is running)"""
+        with self._lock:
+            queued = sorted((j for j in self._jobs.values() if j.status == QUEUED), key=lambda j: j.created)
+        ids = [j.id for j in queued]
+        return ids.index(job_id) if job_id in ids else 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+        for job in jobs:
+            counts[job.status] += 1
+        return dict(counts, workers=self.workers)
+
+    def jobs(self, owner: Optional[str] = None) -> List[ResearchJob]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j for j in jobs if owner is None or j.owner == owner]
+
+    def shutdown(self, cancel: bool = True):
+        if cancel:
+            for job in self.jobs():
+                job.cancel()
+        self._executor.shutdown(wait=False)
@@ -1,19 +1,171 @@
-"""Logger utility"""
+"""Logger utility
+
+Every record goes through a QueueHandler on the root logger and is written
+by a QueueListener thread, so research threads never wait on console I/O.
+Records carry the correlation ID of the query or job that logged them (see
+``correlation_scope``) and are written as text or, with
+``configure_logging(fmt='json')`` / ``NCSU_LOG_FORMAT=json``, one JSON
+object per line.
+"""
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import os
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Researcher console verbosity ('verbosity' config) -> lowest level shown
+VERBOSITY = {'quiet': logging.WARNING, 'normal': logging.INFO, 'verbose': logging.DEBUG}
+
+_correlation_id: contextvars.ContextVar = contextvars.ContextVar('correlation_id', default=None)
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'correlation_id', 'console'
+}
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def correlation_id() -> Optional[str]:
+    """Correlation ID of the current context, if any"""
+    return _correlation_id.get()
+
+
+@contextmanager
+def correlation_scope(value: Optional[str]):
+    """Tag records logged in this context (and in contexts copied from it) with ``value``"""
+    token = _correlation_id.set(value)
+    try:
+        yield value
+    finally:
+        _correlation_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Stamps the current correlation ID on records before they leave the logging thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'correlation_id'):
+            record.correlation_id = _correlation_id.get()
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    """Queues records with the message merged but the traceback kept apart in ``exc_text``
+
+    The stock handler formats the traceback into the message, which would put
+    it in the JSON 'message' instead of 'exception'.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    """The usual one-line format; console output (``extra={'console': True}``) is written as is"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, 'console', False):
+            return record.getMessage()
+        return super().format(record)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever ``sys.stdout`` is when the record is written"""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the correlation ID and any ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage().strip(),
+            'correlation_id': getattr(record, 'correlation_id', None),
+            'thread': record.threadName,
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(fmt: str = 'text', stream=None):
+    """Send all logging through a background writer thread
+
+    ``fmt`` is 'text' or 'json'. Calling it again replaces the previous
+    setup (after writing out what the old one had queued).
+    """
+    global _listener, _queue_handler
+    with _lock:
+        root = logging.getLogger()
+        if _listener is not None:
+            root.removeHandler(_queue_handler)
+            _listener.stop()
+        else:
+            atexit.register(stop_logging)
+
+        handler = logging.StreamHandler(stream) if stream is not None else _StdoutHandler()
+        handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = _QueueHandler(records)
+        _queue_handler.addFilter(CorrelationFilter())
+        root.addHandler(_queue_handler)
+        _listener = QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_logging():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            logging.getLogger().removeHandler(_queue_handler)
+            _listener = None
+
 
 def setup_logger(name: str, level: str = "INFO") -> logging.Logger:
-    """Setup logger with specified name and level"""
+    """Setup logger with specified name and level
+
+    Sets up the queued root handler on first use, unless the application
+    has already configured logging itself.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
-    
-    # Create console handler if not already exists
-    if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-    
-    return logger
 
+    if _listener is None and not logging.getLogger().handlers:
+        configure_logging(os.getenv('NCSU_LOG_FORMAT', 'text'))
+
+    return logger
@@ -0,0 +1,174 @@
+"""Per-query timing spans, token counts and cache statistics"""
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+METRIC_PREFIX = "ncsu_research"
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile (0.0 for no values)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100.0 * len(ordered))) - 1]
+
+
+class ResearchMetrics:
+    """Collects stage timings and counters for one research() call
+
+    Thread-safe, so stages that fan out (per-URL scraping, per-page grading)
+    can record into the same instance.
+    """
+
+    def __init__(self, query: str = ""):
+        self.query = query
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        self.llm: Dict[str, Dict[str, float]] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a block of work as a named span"""
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.record_span(name, time.perf_counter() - start, start=start - self._t0, **attrs)
+
+    def record_span(self, name: str, seconds: float, start: Optional[float] = None, **attrs):
+        """Record a span measured elsewhere (e.g. by the scraper)"""
+        span = {'name': name, 'seconds': round(seconds, 6)}
+        if start is not None:
+            span['start'] = round(start, 6)
+        span.update(attrs)
+        with self._lock:
+            self.spans.append(span)
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_llm(self, stage: str, prompt_tokens: int, completion_tokens: int, seconds: float,
+                   estimated: bool = False):
+        """Record one LLM call made during ``stage``"""
+        with self._lock:
+            entry = self.llm.setdefault(stage, {
+                'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'seconds': 0.0, 'estimated_calls': 0,
+            })
+            entry['calls'] += 1
+            entry['prompt_tokens'] += prompt_tokens
+            entry['completion_tokens'] += completion_tokens
+            entry['seconds'] = round(entry['seconds'] + seconds, 6)
+            if estimated:
+                entry['estimated_calls'] += 1
+
+    def record_cache(self, name: str, hit: bool):
+        with self._lock:
+            entry = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+            entry['hits' if hit else 'misses'] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot suitable for the results dict"""
+        with self._lock:
+            stages: Dict[str, Dict[str, float]] = {}
+            for span in self.spans:
+                stage = stages.setdefault(span['name'], {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+                stage['count'] += 1
+                stage['seconds'] = round(stage['seconds'] + span['seconds'], 6)
+                stage['max_seconds'] = max(stage['max_seconds'], span['seconds'])
+            caches = {
+                name: dict(c, hit_rate=round(c['hits'] / (c['hits'] + c['misses']), 4) if (c['hits'] + c['misses']) else 0.0)
+                for name, c in self.caches.items()
+            }
+            return {
+                'query': self.query,
+                'started': self.started,
+                'total_seconds': round(self.elapsed(), 6),
+                'stages': stages,
+                'spans': list(self.spans),
+                'counters': dict(self.counters),
+                'llm': {stage: dict(v) for stage, v in self.llm.items()},
+                'caches': caches,
+            }
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def to_prometheus(metrics: Dict[str, Any], labels: Optional[Dict[str, Any]] = None) -> str:
+    """Render a ``ResearchMetrics.to_dict()`` snapshot in Prometheus text format
+
+    Every value describes the one query in the snapshot, and the textfile export
+    overwrites it with the next query's, so all of them are gauges (a counter
+    that went down would read as a reset to ``rate()``).
+    """
+    labels = labels or {}
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        full = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {kind}")
+        for extra, value in samples:
+            lines.append(f"{full}{_labels(dict(labels, **extra))} {value}")
+
+    metric('duration_seconds', 'gauge', 'End-to-end research time.',
+           [({}, metrics.get('total_seconds', 0))])
+    stages = metrics.get('stages', {})
+    metric('stage_seconds', 'gauge', 'Time spent per pipeline stage in the last query.',
+           [({'stage': s}, v['seconds']) for s, v in stages.items()])
+    metric('stage_max_seconds', 'gauge', 'Slowest single span per pipeline stage.',
+           [({'stage': s}, v['max_seconds']) for s, v in stages.items()])
+    metric('stage_spans', 'gauge', 'Number of spans per pipeline stage in the last query.',
+           [({'stage': s}, v['count']) for s, v in stages.items()])
+
+    llm = metrics.get('llm', {})
+    metric('llm_calls', 'gauge', 'LLM calls per stage in the last query.',
+           [({'stage': s}, v['calls']) for s, v in llm.items()])
+    metric('llm_tokens', 'gauge', 'LLM tokens per stage and direction in the last query.',
+           [({'stage': s, 'kind': kind}, v[f'{kind}_tokens']) for s, v in llm.items()
+            for kind in ('prompt', 'completion')])
+    metric('llm_seconds', 'gauge', 'Time spent waiting on the LLM per stage in the last query.',
+           [({'stage': s}, v['seconds']) for s, v in llm.items()])
+
+    counters = metrics.get('counters', {})
+    if counters:
+        metric('events', 'gauge', 'Pipeline counters (bytes fetched, pages, ...) for the last query.',
+               [({'name': name}, value) for name, value in counters.items()])
+
+    caches = metrics.get('caches', {})
+    if caches:
+        metric('cache_requests', 'gauge', 'Cache lookups by result in the last query.',
+               [({'cache': name, 'result': result}, c[key])
+                for name, c in caches.items() for result, key in (('hit', 'hits'), ('miss', 'misses'))])
+        metric('cache_hit_ratio', 'gauge', 'Cache hit rate in the last query.',
+               [({'cache': name}, c['hit_rate']) for name, c in caches.items()])
+
+    return "\n".join(lines) + "\n"
+
+
+def to_json_lines(metrics: Dict[str, Any]) -> str:
+    """Render a snapshot as one JSON record per span plus a summary record"""
+    base = {'query': metrics.get('query', ''), 'started': metrics.get('started')}
+    lines = [json.dumps(dict(base, type='span', **span), ensure_ascii=False) for span in metrics.get('spans', [])]
+    summary = {k: v for k, v in metrics.items() if k not in ('spans', 'query', 'started')}
+    lines.append(json.dumps(dict(base, type='summary', **summary), ensure_ascii=False))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,50 @@
+"""Content-addressed storage for scraped page text"""
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+
+class PageStore:
+    """Keeps each distinct page body once, keyed by a hash of its text
+
+    Result stages (extracted/graded/filtered pages) refer to bodies by
+    ``content_id``; identical bodies (mirrored pages, print views) collapse
+    to a single entry. ``pages`` is a plain dict so it can be stored in the
+    results and serialized as-is.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, str]] = None):
+        self.pages: Dict[str, str] = pages if pages is not None else {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_id(content: str) -> str:
+        """Stable ID of a page body (first 16 hex chars of its SHA-256)"""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+    def put(self, content: str) -> str:
+        content = content or ''
+        cid = self.content_id(content)
+        with self._lock:
+            # Keep the first copy so every stage shares the same string object
+            self.pages.setdefault(cid, content)
+        return cid
+
+    def get(self, cid: str) -> str:
+        return self.pages.get(cid, '')
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self.pages
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def total_chars(self) -> int:
+        return sum(len(c) for c in self.pages.values())
+
+
+def page_content(results: Dict[str, Any], page: Dict[str, Any]) -> str:
+    """Text of a page entry from a results dict (content-addressed or inline)"""
+    if 'content' in page:
+        return page['content'] or ''
+    return results.get('pages', {}).get(page.get('content_id'), '')
@@ -0,0 +1,209 @@
+"""Background, compressed persistence of research results"""
+import atexit
+import gzip
+import io
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+
+_STOP = object()
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return data
+
+
+class ResultWriter:
+    """Appends research results as JSON Lines on a background thread
+
+    Records go to ``results-YYYYMMDD-NNN.jsonl[.gz|.zst]`` segments. Each
+    record is compressed as its own frame/member and appended, so the file
+    stays readable even if the process dies mid-run. A segment is rotated
+    when it passes ``max_segment_bytes`` or the date changes; after each
+    rotation only the newest ``retention_files`` segments (and none older
+    than ``retention_days``) are kept. Rotation and pruning happen on the
+    writer thread, between records, so they never touch a segment that is
+    being written.
+    """
+
+    def __init__(self, directory, compression: str = 'gzip', max_segment_bytes: int = 64 * 1024 * 1024,
+                 retention_files: Optional[int] = 30, retention_days: Optional[float] = None):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression '{compression}' (expected one of {', '.join(COMPRESSION_SUFFIXES)})")
+        self.logger = logging.getLogger(__name__)
+        if compression == 'zstd' and zstandard is None:
+            self.logger.warning("zstandard package not installed, falling back to gzip. Run: pip install zstandard")
+            compression = 'gzip'
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.max_segment_bytes = max_segment_bytes
+        self.retention_files = retention_files
+        self.retention_days = retention_days
+        self.written = 0
+        self.errors = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._segment: Optional[Path] = None
+        self._segment_day = None
+        self._lock = threading.Lock()
+        self._open_segment()
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def suffix(self) -> str:
+        return '.jsonl' + COMPRESSION_SUFFIXES[self.compression]
+
+    def _open_segment(self):
+        """Pick the segment new records go to (the latest one for today, if it has room)"""
+        today = datetime.now().strftime('%Y%m%d')
+        todays = sorted(self.directory.glob(f'results-{today}-*.jsonl*'))
+        if todays and todays[-1].name.endswith(self.suffix) and todays[-1].stat().st_size < self.max_segment_bytes:
+            segment = todays[-1]
+        else:
+            number = int(todays[-1].name.split('-')[2].split('.')[0]) + 1 if todays else 1
+            segment = self.directory / f'results-{today}-{number:03d}{self.suffix}'
+        with self._lock:
+            self._segment = segment
+            self._segment_day = today
+
+    @property
+    def segment(self) -> Path:
+        """Segment the next record will be appended to"""
+        with self._lock:
+            return self._segment
+
+    def submit(self, record: Dict[str, Any]) -> str:
+        """Queue ``record`` for writing and return the current segment path
+
+        The writer thread picks the segment when it writes the record, so a
+        rotation in between (size limit or a new day) moves it to the next one.
+        """
+        self._queue.put(record)
+        return str(self.segment)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(item)
+            except Exception as e:
+                self.errors += 1
+                self.logger.error(f"Failed to persist research result: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, record: Dict[str, Any]):
+        """Append one record (writer thread only)"""
+        if datetime.now().strftime('%Y%m%d') != self._segment_day:
+            self._rotate()
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + "\n"
+        with open(self._segment, 'ab') as f:
+            f.write(_compress(line.encode('utf-8'), self.compression))
+            size = f.tell()
+        self.written += 1
+        if size >= self.max_segment_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Move on to a new segment and prune old ones (writer thread only)"""
+        self._open_segment()
+        removed = prune_files(self.directory, 'results-*.jsonl*', self.retention_files, self.retention_days,
+                              keep=self._segment)
+        if removed:
+            self.logger.info(f"Removed {removed} old result segments from {self.directory}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued record is on disk (True if the queue drained in time)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+
+def prune_files(directory, pattern: str, max_files: Optional[int] = None, max_age_days: Optional[float] = None,
+                keep: Optional[Path] = None) -> int:
+    """Delete the oldest files matching ``pattern`` beyond ``max_files`` or older than ``max_age_days``"""
+    files = sorted(Path(directory).glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
+    doomed = []
+    if max_age_days is not None:
+        cutoff = time.time() - max_age_days * 86400
+        doomed.extend(p for p in files if p.stat().st_mtime < cutoff)
+    if max_files is not None:
+        doomed.extend(files[max_files:])
+    removed = 0
+    for path in set(doomed):
+        if keep is not None and path == keep:
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def read_results(path) -> Iterator[Dict[str, Any]]:
+    """Iterate over the records of a results segment"""
+    path = str(path)
+    if path.endswith('.gz'):
+        f = gzip.open(path, 'rt', encoding='utf-8')
+    elif path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("zstandard package not installed. Run: pip install zstandard")
+        f = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True),
+                             encoding='utf-8')
+    else:
+        f = open(path, 'r', encoding='utf-8')
+    with f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+_writers: Dict[str, Tuple[ResultWriter, Dict[str, Any]]] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(directory, **options) -> ResultWriter:
+    """Shared writer for ``directory`` so every researcher instance feeds one thread
+
+    There is one writer per directory, so segments are only ever appended to,
+    rotated and pruned by one thread. The first caller's ``options`` apply;
+    later callers asking for different ones get the same writer and a warning.
+    """
+    key = str(Path(directory).resolve())
+    with _writers_lock:
+        writer, writer_options = _writers.get(key, (None, None))
+        if writer is None or not writer._thread.is_alive():
+            writer = ResultWriter(directory, **options)
+            _writers[key] = (writer, options)
+        elif options != writer_options:
+            writer.logger.warning(f"Result writer for {key} already runs with {writer_options}; ignoring {options}")
+        return writer
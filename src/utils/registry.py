@@ -0,0 +1,134 @@
+"""Process-wide registry of shared, expensive-to-build resources"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0}
+
+
+class _Entry:
+    __slots__ = ('value', 'lock', 'ready', 'init_seconds', 'created', 'hits')
+
+    def __init__(self):
+        self.value = None
+        self.lock = threading.Lock()
+        self.ready = False
+        self.init_seconds = 0.0
+        self.created = 0.0
+        self.hits = 0
+
+
+class ResourceRegistry:
+    """Builds each resource once per process and hands the same object to every request
+
+    Resources are keyed by a kind (e.g. "scraper") plus whatever settings
+    make two instances differ, so researchers with the same config share one
+    LLM client, scraper/HTTP pool and cache. Builds of different keys run in
+    parallel; concurrent requests for the same key wait for a single build.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Tuple], _Entry] = {}
+
+    def get(self, kind: str, factory: Callable[[], Any], *key: Hashable) -> Any:
+        """Shared resource ``kind`` for ``key``, built with ``factory`` on first use"""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                entry = self._entries[(kind, key)] = _Entry()
+            elif entry.ready:
+                entry.hits += 1
+                return entry.value
+        with entry.lock:
+            if entry.ready:
+                with self._lock:
+                    entry.hits += 1
+                return entry.value
+            started = time.perf_counter()
+            value = factory()
+            entry.init_seconds = time.perf_counter() - started
+            entry.created = time.time()
+            entry.value = value
+            entry.ready = True
+            return value
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """One row per resource: builds are misses, every later hand-out is a hit"""
+        with self._lock:
+            items = list(self._entries.items())
+        rows = []
+        for (kind, key), entry in items:
+            if not entry.ready:
+                continue
+            row = {
+                'resource': kind,
+                'key': ', '.join(str(k) for k in key)[:80],
+                'hits': entry.hits,
+                'init_seconds': round(entry.init_seconds, 4),
+                'created': entry.created,
+            }
+            if hasattr(entry.value, 'stats') and callable(entry.value.stats):
+                try:
+                    row['stats'] = entry.value.stats()
+                except Exception:
+                    pass
+            rows.append(row)
+        return rows
+
+    def clear(self, kind: Optional[str] = None):
+        """Forget resources (of one kind, or all); objects already handed out stay usable"""
+        with self._lock:
+            for entry_key in list(self._entries):
+                if kind is None or entry_key[0] == kind:
+                    del self._entries[entry_key]
+
+
+_registry = ResourceRegistry()
+
+
+def get_registry() -> ResourceRegistry:
+    """The process-wide registry"""
+    return _registry
@@ -0,0 +1,149 @@
+"""HTTP API: request validation, coalescing of identical queries, SSE and error statuses"""
+import asyncio
+import json
+import sys
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+import api_server  # noqa: E402
+from api_server import APIServer, HTTPError, ResearchService, parse_request_body  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import LLMProviderError  # noqa: E402
+from utils.jobs import DONE, FAILED  # noqa: E402
+
+QUERY = 'student travel reimbursement'
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+@pytest.fixture
+def service(server, tmp_path):
+    config = dict(server.researcher_config(), llm_provider='mock', mock_latency=0.2, top_k=3, max_pages=3,
+                  verbosity='quiet', output_dir=str(tmp_path))
+    research_service = ResearchService(config, workers=2, save_results=False)
+    yield research_service
+    research_service.jobs.shutdown()
+
+
+def run_to_end(service, job):
+    asyncio.run(asyncio.wait_for(service.wait(job), timeout=30))
+
+
+def test_identical_in_flight_queries_share_one_run(service):
+    job, coalesced = service.start(QUERY, {})
+    same, same_coalesced = service.start('  Student TRAVEL reimbursement? ', {})
+    other, other_coalesced = service.start(QUERY, {'max_pages': 2})
+
+    assert (coalesced, same_coalesced, other_coalesced) == (False, True, False)
+    assert same is job and other is not job
+    assert service.stats()['coalesced_requests'] == 1
+
+    run_to_end(service, job)
+    run_to_end(service, other)
+    assert job.status == DONE and job.result['results']['final_answer']
+    # Once finished, the same query starts a fresh run
+    again, again_coalesced = service.start(QUERY, {})
+    assert again is not job and not again_coalesced
+    run_to_end(service, again)
+
+
+def test_cancelled_runs_are_not_joined(service):
+    job, _ = service.start(QUERY, {})
+    job.cancel()
+    fresh, coalesced = service.start(QUERY, {})
+    assert fresh is not job and not coalesced
+    run_to_end(service, fresh)
+
+
+@pytest.mark.parametrize('body, message', [
+    (b'not json', 'Body must be JSON'),
+    (b'[]', 'Body must be a JSON object'),
+    (b'{"query": " "}', "'query' is required"),
+    (b'{"query": "q", "config": {"llm_provider": "openai"}}', 'not allowed per request: llm_provider'),
+])
+def test_bad_requests_are_rejected(body, message):
+    with pytest.raises(HTTPError) as error:
+        parse_request_body(body)
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+    assert message in str(error.value)
+
+
+async def request(port, path, body):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    payload = json.dumps(body).encode('utf-8')
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(payload)}\r\n\r\n".encode('latin-1')
+                 + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return head.decode('latin-1'), body.decode('utf-8')
+
+
+def post(service, *requests):
+    """Serve ``service`` on a free port and send (path, body) requests concurrently"""
+    async def scenario():
+        api = APIServer(service)
+        http_server = await asyncio.start_server(api._handle, '127.0.0.1', 0)
+        port = http_server.sockets[0].getsockname()[1]
+        async with http_server:
+            return await asyncio.gather(*(request(port, path, body) for path, body in requests))
+
+    return asyncio.run(asyncio.wait_for(scenario(), timeout=30))
+
+
+def test_research_over_http_and_server_sent_events(service):
+    (json_head, json_body), (sse_head, sse_body) = post(
+        service, ('/research', {'query': QUERY}), ('/research/stream', {'query': QUERY}))
+    payload = json.loads(json_body)
+    assert json_head.startswith('HTTP/1.1 200')
+    assert payload['status'] == DONE and payload['results']['final_answer']
+    assert 'pages' not in payload['results']
+
+    assert 'text/event-stream' in sse_head
+    events = [block.split('\n')[0][len('event: '):] for block in sse_body.strip().split('\n\n')]
+    assert events[0] == 'job' and events[-2:] == ['answer', 'done'] and 'progress' in events
+    job_event = json.loads(sse_body.split('\n\n')[0].split('data: ', 1)[1])
+    assert job_event['id'] == payload['id'] and job_event['coalesced'] is not payload['coalesced']
+
+
+@pytest.mark.parametrize('error, status', [
+    (RuntimeError('disk full'), '500'),
+    (LLMProviderError('All LLM providers failed'), '502'),
+])
+def test_waiting_for_a_failed_run_returns_an_error_status(service, monkeypatch, error, status):
+    def research(self, query, progress=None):
+        raise error
+    monkeypatch.setattr(api_server.NCSUAdvancedResearcher, 'research', research)
+
+    ((head, body),) = post(service, ('/research', {'query': QUERY}))
+    payload = json.loads(body)
+    assert head.startswith(f'HTTP/1.1 {status}')
+    assert payload['status'] == FAILED and payload['error'] == str(error)
+    assert 'results' not in payload
+
+
+def test_answer_generation_failure_returns_bad_gateway(server, tmp_path):
+    config = dict(server.researcher_config(), llm_provider='mock', mock_failure_rate=1.0, top_k=3, max_pages=3,
+                  verbosity='quiet', output_dir=str(tmp_path))
+    failing = ResearchService(config, workers=1, save_results=False)
+    try:
+        ((head, body),) = post(failing, ('/research', {'query': QUERY}))
+    finally:
+        failing.jobs.shutdown()
+    payload = json.loads(body)
+    assert head.startswith('HTTP/1.1 502')
+    # The run itself finished: sources are still returned alongside the error
+    assert payload['status'] == DONE and payload['results']['answer_error']
+    assert payload['results']['sources']
@@ -0,0 +1,73 @@
+"""Batch research: input parsing and resuming an interrupted output file"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from batch_research import BatchRunner, completed_ids, read_queries  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+def write_lines(path, lines):
+    path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+
+
+def records(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_read_queries_accepts_strings_and_objects(tmp_path):
+    path = tmp_path / 'queries.jsonl'
+    write_lines(path, ['"How do I register for classes?"', '',
+                       '{"id": "aid", "query": " Financial aid? ", "config": {"max_pages": 2}}'])
+    assert read_queries(str(path)) == [
+        {'id': 'how do i register for classes?', 'query': 'How do I register for classes?', 'config': {}},
+        {'id': 'aid', 'query': 'Financial aid?', 'config': {'max_pages': 2}},
+    ]
+
+    write_lines(path, ['{"id": "empty"}'])
+    with pytest.raises(ValueError, match='missing'):
+        read_queries(str(path))
+
+
+def test_completed_ids_cut_off_a_half_written_line(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    path.write_text('{"id": "a", "status": "done"}\n{"id": "b", "status": "failed"}\n{"id": "c", "sta',
+                    encoding='utf-8')
+    assert completed_ids(str(path)) == {'a'}
+    assert path.read_text(encoding='utf-8').endswith('"failed"}\n')
+    assert completed_ids(str(tmp_path / 'missing.jsonl')) == set()
+
+
+def test_rerun_skips_answered_queries_and_retries_failed_ones(server, tmp_path):
+    config = dict(server.researcher_config(), llm_provider='mock', top_k=3, max_pages=3, verbosity='quiet',
+                  output_dir=str(tmp_path))
+    queries = tmp_path / 'queries.jsonl'
+    write_lines(queries, [json.dumps({'id': i, 'query': q}) for i, q in (
+        ('travel', 'student travel reimbursement'), ('grad', 'apply to graduate'), ('aid', 'financial aid'),
+    )] + ['{"id": "travel", "query": "student travel reimbursement"}'])
+    output = tmp_path / 'out.jsonl'
+    # An earlier run answered 'travel', failed 'aid' and died while writing 'grad'
+    output.write_text('{"id": "travel", "status": "done"}\n{"id": "aid", "status": "failed"}\n{"id": "gr',
+                      encoding='utf-8')
+
+    summary = BatchRunner(config, str(output), parallel=2).run(read_queries(str(queries)))
+
+    assert summary['queries'] == {'done': 2, 'failed': 0, 'skipped': 2}
+    new = records(output)[2:]
+    assert sorted(r['id'] for r in new) == ['aid', 'grad']
+    assert all(r['status'] == 'done' and r['answer'] for r in new)
+    assert summary['totals']['llm_calls.answer'] == 2
+    assert summary['throughput_qps'] > 0
+    assert completed_ids(str(output)) == {'travel', 'grad', 'aid'}
@@ -0,0 +1,96 @@
+"""Record/replay cassettes for scraper traffic"""
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from scraper.cassette import Cassette, CassetteMiss  # noqa: E402
+from scraper.models import ScrapingConfig, SearchResult  # noqa: E402
+from scraper.ncsu_scraper import NCSUScraper  # noqa: E402
+
+QUERY = 'student travel reimbursement'
+
+
+def scraper(server_config, cassette_path, mode):
+    return NCSUScraper(ScrapingConfig(
+        base_url=server_config['base_url'], search_url=server_config['search_url'],
+        allowed_domain=server_config['allowed_domain'], selenium_enabled=False, delay=0,
+        cassette_path=str(cassette_path), cassette_mode=mode, cassette_latency='none',
+    ))
+
+
+def test_recorded_run_replays_without_the_server(tmp_path, monkeypatch):
+    for name in ('NCSU_CASSETTE', 'NCSU_CASSETTE_MODE', 'NCSU_CASSETTE_LATENCY'):
+        monkeypatch.delenv(name, raising=False)
+    cassette_path = tmp_path / 'run.jsonl.gz'
+    with FixtureServer() as server:
+        recorder = scraper(server.researcher_config(), cassette_path, 'record')
+        recorded_results = recorder.search(QUERY, max_results=3)
+        recorded_pages = recorder.scrape_pages(recorded_results)
+        config = server.researcher_config()
+        served = server.requests_served
+    assert served == 1 + len(recorded_results) and len(recorded_results) == 3
+
+    # The server is gone; everything comes from the cassette
+    player = scraper(config, cassette_path, 'replay')
+    assert len(player.cassette) == served
+    results = player.search(QUERY, max_results=3)
+    pages = player.scrape_pages(results)
+    assert results == recorded_results
+    assert [p.content for p in pages] == [p.content for p in recorded_pages]
+    assert all(p.extraction_success for p in pages)
+    assert player.cassette.hits == served and player.cassette.misses == 0
+
+    # A page that was never recorded fails in strict replay
+    missing = player.scrape_page(SearchResult(title='Missing', url=f"{config['base_url']}/missing", snippet=''))
+    assert not missing.extraction_success and player.cassette.misses == 1
+
+
+def test_entries_round_trip_and_last_recording_wins(tmp_path):
+    path = tmp_path / 'nested' / 'tape.jsonl.gz'
+    cassette = Cassette(str(path), mode='record')
+    cassette.record('http', 'https://www.ncsu.edu/a', 200, b'first', 0.1)
+    cassette.record('http', 'https://www.ncsu.edu/a', 200, 'café'.encode('utf-8'), 0.2)
+    cassette.record('http', 'https://www.ncsu.edu/logo.png', 200, b'\x89PNG\xff\x00', 0.0)
+    cassette.record('http', 'https://www.ncsu.edu/gone', 404, b'', 0.0)
+    # Each record is its own gzip member
+    assert gzip.decompress(path.read_bytes()).count(b'\n') == 4
+
+    replay = Cassette(str(path), mode='replay', latency='none')
+    assert len(replay) == 3
+    assert replay.replay('http', 'https://www.ncsu.edu/a').body == 'café'.encode('utf-8')
+    assert replay.replay('http', 'https://www.ncsu.edu/logo.png').body == b'\x89PNG\xff\x00'
+    assert replay.replay('http', 'https://www.ncsu.edu/gone').status == 404
+    with pytest.raises(CassetteMiss):
+        replay.replay('selenium', 'https://www.ncsu.edu/a')
+
+
+def test_auto_mode_records_misses_and_replays_hits(tmp_path):
+    path = tmp_path / 'auto.jsonl.gz'
+    cassette = Cassette(str(path), mode='auto')
+    assert cassette.replay('http', 'https://www.ncsu.edu/a') is None
+    cassette.record('http', 'https://www.ncsu.edu/a', 200, b'page', 0.0)
+    assert cassette.replay('http', 'https://www.ncsu.edu/a').body == b'page'
+    assert (cassette.hits, cassette.misses) == (1, 1)
+
+    # Record-only cassettes never replay
+    assert Cassette(str(path), mode='record').replay('http', 'https://www.ncsu.edu/a') is None
+    with pytest.raises(ValueError):
+        Cassette(str(path), mode='rewind')
+
+
+def test_environment_overrides_the_config(tmp_path, monkeypatch):
+    monkeypatch.delenv('NCSU_CASSETTE', raising=False)
+    assert Cassette.from_config(ScrapingConfig()) is None
+
+    config = ScrapingConfig(cassette_path=str(tmp_path / 'config.jsonl.gz'), cassette_mode='replay')
+    monkeypatch.setenv('NCSU_CASSETTE', str(tmp_path / 'env.jsonl.gz'))
+    monkeypatch.setenv('NCSU_CASSETTE_MODE', 'auto')
+    cassette = Cassette.from_config(config)
+    assert cassette.path == str(tmp_path / 'env.jsonl.gz') and cassette.mode == 'auto'
@@ -0,0 +1,65 @@
+"""Cross-source dedup on text as NCSUScraper actually extracts it"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from scraper.content_aggregator import ContentAggregator  # noqa: E402
+from scraper.models import ScrapingConfig, SearchResult  # noqa: E402
+from scraper.ncsu_scraper import NCSUScraper  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+def scrape(server, paths, enhanced_extraction=True):
+    config = server.researcher_config()
+    scraper = NCSUScraper(config=ScrapingConfig(
+        base_url=config['base_url'], search_url=config['search_url'], allowed_domain=config['allowed_domain'],
+        selenium_enabled=False, delay=0, enhanced_extraction=enhanced_extraction
+    ))
+    pages = [scraper.scrape_page(SearchResult('', server.base_url + path)) for path in paths]
+    assert all(page.extraction_success for page in pages)
+    return pages
+
+
+def test_extracted_text_keeps_block_boundaries(server):
+    page, = scrape(server, ['/travel/student-reimbursement'])
+    paragraphs = page.content.split('\n\n')
+    assert paragraphs[0] == 'Student Travel Reimbursement'
+    assert 'Before You Travel' in paragraphs
+
+
+def test_print_copy_is_removed_paragraph_by_paragraph(server):
+    pages = scrape(server, ['/travel/student-reimbursement', '/travel/student-reimbursement/print'])
+    aggregator = ContentAggregator()
+    original, copy = (aggregator.add(str(page.url), page.content) for page in pages)
+
+    assert original == pages[0].content
+    report, = aggregator.report()['sources']
+    assert report['source'] == str(pages[1].url)
+    assert report['paragraphs_removed'] == len(pages[1].content.split('\n\n')) - len(copy.split('\n\n'))
+    assert report['paragraphs_removed'] >= 5
+    assert report['sentences_removed'] == 0
+
+
+def test_shared_page_chrome_is_removed_from_unrelated_pages(server):
+    # Full-page text keeps the cookie banner and office hours block every page carries
+    pages = scrape(server, ['/travel/student-reimbursement', '/registrar/graduation'], enhanced_extraction=False)
+    aggregator = ContentAggregator()
+    travel, graduation = (aggregator.add(str(page.url), page.content) for page in pages)
+
+    report, = aggregator.report()['sources']
+    assert report['source'] == str(pages[1].url)
+    assert report['paragraphs_removed'] >= 2
+    assert 'uses cookies' in travel and 'Office hours are Monday' in travel
+    assert 'uses cookies' not in graduation and 'Office hours are Monday' not in graduation
+    assert 'graduation' in graduation.lower()
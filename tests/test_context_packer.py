@@ -0,0 +1,113 @@
+"""Token-budgeted packing of answer sources"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from utils import context_packer  # noqa: E402
+from utils.context_packer import (  # noqa: E402
+    ContextPacker, Tokenizer, context_budget, context_window, get_tokenizer, split_spans
+)
+
+QUERY = 'How do students get travel reimbursement?'
+
+
+def sentences(topic, count):
+    return ' '.join(f'{topic} detail number {i} is described in this sentence.' for i in range(count))
+
+
+def source(url, content, score):
+    return {'title': url, 'url': url, 'content': content, 'relevance_score': score}
+
+
+def test_most_relevant_sources_fill_the_budget_first():
+    sources = [
+        source('https://www.ncsu.edu/parking', sentences('Parking', 40), 0.2),
+        source('https://www.ncsu.edu/travel', sentences('Travel reimbursement', 40), 0.9),
+    ]
+    packed = ContextPacker(Tokenizer(), budget_tokens=800, span_chars=400).pack(QUERY, sources)
+
+    assert packed.used_tokens <= 800
+    travel, parking = sorted(packed.sources, key=lambda s: -s.relevance_score)
+    assert travel.spans_included == travel.spans_total
+    assert 0 < parking.spans_included < parking.spans_total
+    # Sources keep their original order in the prompt
+    assert [s.index for s in packed.sources] == [1, 2]
+    assert packed.dropped == [{'url': 'https://www.ncsu.edu/parking', 'reason': 'partial',
+                               'spans_dropped': {'token_budget': parking.spans_total - parking.spans_included}}]
+
+
+def test_sources_that_do_not_fit_are_dropped():
+    sources = [
+        source('https://www.ncsu.edu/travel', sentences('Travel reimbursement', 5), 0.9),
+        source('https://www.ncsu.edu/parking', sentences('Parking', 5), 0.2),
+    ]
+    budget = Tokenizer().count(sources[0]['content']) + 1
+    packed = ContextPacker(Tokenizer(), budget_tokens=budget, span_chars=1200).pack(QUERY, sources)
+
+    assert [s.url for s in packed.sources] == ['https://www.ncsu.edu/travel']
+    assert packed.dropped == [{'url': 'https://www.ncsu.edu/parking', 'reason': 'token_budget',
+                               'tokens': Tokenizer().count(sources[1]['content'])}]
+
+
+def test_chosen_spans_keep_page_order_and_mark_gaps():
+    content = ' '.join([sentences('Parking', 8), sentences('Travel reimbursement students', 8),
+                        sentences('Parking', 8), sentences('Travel reimbursement students', 8)])
+    spans = split_spans(content, 400)
+    packer = ContextPacker(Tokenizer(), budget_tokens=sum(Tokenizer().count(s) + 1 for s in spans) // 2,
+                           span_chars=400)
+    packed = packer.pack(QUERY, [source('https://www.ncsu.edu/travel', content, 0.8)])
+
+    included, = packed.sources
+    assert 0 < included.spans_included < included.spans_total
+    pieces = included.content.split(' [...] ')
+    assert len(pieces) > 1
+    positions = [content.index(piece) for piece in pieces]
+    assert positions == sorted(positions)
+    assert packed.to_dict()['included'][0]['truncated'] is True
+    assert packed.dropped[0]['reason'] == 'partial'
+
+
+def test_over_long_span_is_trimmed_to_max_source_chars():
+    content = 'Travel reimbursement ' + 'requires receipts and approvals ' * 100
+    packer = ContextPacker(Tokenizer(), budget_tokens=10000, span_chars=5000, max_source_chars=300)
+    packed = packer.pack(QUERY, [source('https://www.ncsu.edu/travel', content, 0.9)])
+
+    included, = packed.sources
+    assert 0 < len(included.content) <= 300
+    assert not included.content.endswith(' ')
+    assert packed.dropped == [{'url': 'https://www.ncsu.edu/travel', 'reason': 'partial', 'spans_dropped': {},
+                               'chars_trimmed': included.chars_trimmed}]
+    assert included.chars_trimmed == len(content.strip()) - len(included.content)
+
+
+def test_empty_sources_are_reported():
+    packed = ContextPacker(Tokenizer(), budget_tokens=100).pack(QUERY, [source('https://www.ncsu.edu/a', '', 1.0)])
+    assert packed.sources == []
+    assert packed.dropped == [{'url': 'https://www.ncsu.edu/a', 'reason': 'empty', 'tokens': 0}]
+
+
+def test_budget_comes_from_the_model_window_minus_reserved_tokens():
+    assert context_window('gpt-4o-mini-2024-07-18') == 128000
+    assert context_window('unknown-model') == context_window(None) == 16000
+    assert context_budget('mock-model', reserved_tokens=1000) == 15000
+    assert context_budget('gpt-4.1', reserved_tokens=1000) == 100000
+    assert context_budget('gpt-4.1', reserved_tokens=1000, max_tokens=5000) == 5000
+    assert context_budget('gpt-4', reserved_tokens=9000) == 0
+
+
+def test_unloadable_tiktoken_falls_back_to_the_heuristic(monkeypatch):
+    class Offline:
+        def __init__(self, model):
+            raise OSError('could not download cl100k_base')
+
+    monkeypatch.setattr(context_packer, 'TiktokenTokenizer', Offline)
+    monkeypatch.setattr(context_packer, '_tokenizer_cache', {})
+    assert get_tokenizer('gpt-4o').name == 'heuristic'
+    # Asking for tiktoken explicitly still surfaces the error
+    context_packer._tokenizer_cache.clear()
+    with pytest.raises(OSError):
+        get_tokenizer('gpt-4o', 'tiktoken')
@@ -0,0 +1,74 @@
+"""Near-duplicate detection: SimHash grouping and choosing each group's best URL"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+from scraper.dedup import DEFAULT_MAX_DISTANCE, NearDuplicateIndex, hamming, simhash, url_rank  # noqa: E402
+from scraper.parse_pool import extract_page_text  # noqa: E402
+
+TEXT = ' '.join(f'Students submit receipts for trip {i} within thirty days of returning to campus.' for i in range(30))
+
+
+def test_small_edits_stay_close_and_different_texts_do_not():
+    edited = TEXT.replace('trip 7 ', 'journey 7 ')
+    other = ' '.join(f'Housing applications for hall {i} open after the enrollment deposit is paid.' for i in range(30))
+    assert simhash(TEXT) == simhash(TEXT)
+    assert hamming(simhash(TEXT), simhash(edited)) <= DEFAULT_MAX_DISTANCE
+    assert hamming(simhash(TEXT), simhash(other)) > 2 * DEFAULT_MAX_DISTANCE
+    assert simhash('too short') == 0
+
+
+def test_copies_group_under_the_best_url():
+    index = NearDuplicateIndex()
+    assert index.add(0, TEXT, 'https://www.ncsu.edu/travel/print', rank=0) is None
+    assert index.add(1, TEXT, 'http://www.ncsu.edu/travel', rank=1) == 0
+    assert index.add(2, TEXT, 'https://www.ncsu.edu/travel', rank=2) == 0
+    assert index.add(3, 'Completely different words about parking permits and campus buses.', 'https://www.ncsu.edu/parking') is None
+
+    # https without a print variant wins, whatever the search order
+    assert index.best(0) == 2 and index.best_url(0) == 'https://www.ncsu.edu/travel'
+    assert index.best(3) == 3 and index.best(99) == 99
+    assert [d['url'] for d in index.duplicates] == ['http://www.ncsu.edu/travel', 'https://www.ncsu.edu/travel']
+    assert all(d['duplicate_of'] == 'https://www.ncsu.edu/travel/print' and d['distance'] == 0 for d in index.duplicates)
+
+
+def test_url_rank_prefers_canonical_urls():
+    urls = ['https://www.ncsu.edu/travel?page=2', 'https://www.ncsu.edu/travel/print', 'http://www.ncsu.edu/travel',
+            'https://www.ncsu.edu/travel/policy', 'https://www.ncsu.edu/travel']
+    assert sorted(urls, key=url_rank) == [
+        'https://www.ncsu.edu/travel', 'https://www.ncsu.edu/travel/policy', 'http://www.ncsu.edu/travel',
+        'https://www.ncsu.edu/travel/print', 'https://www.ncsu.edu/travel?page=2',
+    ]
+
+
+def test_default_threshold_on_the_fixture_pages():
+    server = FixtureServer()
+    index = NearDuplicateIndex()
+    groups = {path: index.add(path, extract_page_text(page['html']), server.base_url + path)
+              for path, page in server.pages.items()}
+
+    # The print view collapses into the full page; the edited CSC mirror and distinct pages don't
+    assert groups['/travel/student-reimbursement/print'] == '/travel/student-reimbursement'
+    assert [path for path, original in groups.items() if original is not None] == ['/travel/student-reimbursement/print']
+    assert index.best_url('/travel/student-reimbursement').endswith('/travel/student-reimbursement')
+
+
+def test_research_grades_one_copy_and_reports_the_rest(tmp_path):
+    with FixtureServer() as server:
+        research = NCSUAdvancedResearcher(dict(
+            server.researcher_config(), llm_provider='mock', top_k=6, max_pages=6, verbosity='quiet',
+            output_dir=str(tmp_path)))
+        results = research.research('student travel reimbursement')
+
+    graded = [p['url'] for p in results['graded_pages']]
+    print_url = server.base_url + '/travel/student-reimbursement/print'
+    assert results['near_duplicates'] == [{'url': print_url, 'duplicate_of': server.base_url + '/travel/student-reimbursement',
+                                           'distance': 0}]
+    assert print_url not in graded and len(graded) == len(results['extracted_pages']) - 1
+    assert results['metrics']['counters']['near_duplicates'] == 1
@@ -0,0 +1,85 @@
+"""Early termination in the sequential and streaming pipelines"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+
+QUERY = 'student travel reimbursement'
+
+
+# A fresh server per test, so fetches abandoned by one run don't show up in the next one's log
+@pytest.fixture
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+def researcher(server, tmp_path, **overrides):
+    config = dict(server.researcher_config(), llm_provider='mock', mock_grade_score=0.9, top_k=6, max_pages=6,
+                  verbosity='quiet', output_dir=str(tmp_path))
+    config.update(overrides)
+    return NCSUAdvancedResearcher(config)
+
+
+def test_abandoned_gradings_record_nothing_after_the_run(server, tmp_path):
+    research = researcher(server, tmp_path, early_stop_pages=1, mock_latency=0.3, pipeline_grade_workers=4,
+                          pipeline_mode='streaming')
+    results = research.research(QUERY)
+
+    assert results['early_stop']['rule'] == 'pages'
+    assert any(page['state'] == 'abandoned' for page in results['skipped_pages'])
+    # Let the abandoned gradings finish
+    time.sleep(1.0)
+    assert research.last_metrics.to_dict()['llm'] == results['metrics']['llm']
+    assert results['metrics']['llm']['grade']['calls'] == results['early_stop']['pages_graded']
+
+
+def test_token_rule_counts_graded_page_text(server, tmp_path):
+    research = researcher(server, tmp_path, early_stop_tokens=50, pipeline_grade_workers=1, pipeline_mode='streaming')
+    results = research.research(QUERY)
+
+    assert results['early_stop']['rule'] == 'tokens'
+    assert results['early_stop']['pages_skipped'] == len(results['skipped_pages']) > 0
+
+
+def page_requests(server):
+    return [path for _, path in server.request_log if not path.startswith('/search')]
+
+
+def test_sequential_mode_stops_fetching_once_enough_is_graded(server, tmp_path):
+    research = researcher(server, tmp_path, early_stop_pages=2, near_duplicate_detection=False)
+    results = research.research(QUERY)
+
+    assert results['pipeline']['mode'] == 'sequential'
+    assert results['early_stop'] == {'rule': 'pages', 'pages_graded': 2, 'pages_skipped': 4}
+    assert [p['url'] for p in results['skipped_pages']] == [r['url'] for r in results['search_results'][2:6]]
+    assert page_requests(server) == [p['url'][len(server.base_url):] for p in results['extracted_pages']]
+    assert len(page_requests(server)) == 2
+    assert {p['state'] for p in results['skipped_pages']} == {'not_fetched'}
+    assert results['metrics']['counters']['pages_skipped'] == 4
+    assert results['final_answer'] and len(results['filtered_pages']) == 2
+
+
+def test_sequential_mode_without_a_rule_fetches_everything(server, tmp_path):
+    results = researcher(server, tmp_path).research(QUERY)
+    assert 'early_stop' not in results and len(page_requests(server)) == 6
+
+
+def test_streaming_mode_cancels_queued_fetches(server, tmp_path):
+    research = researcher(server, tmp_path, early_stop_pages=1, pipeline_mode='streaming', pipeline_fetch_workers=1)
+    results = research.research(QUERY)
+
+    cancelled = [p for p in results['skipped_pages'] if p['stage'] == 'fetch' and p['state'] == 'cancelled']
+    assert cancelled
+    # Let any abandoned fetch land before counting
+    time.sleep(0.2)
+    assert len(page_requests(server)) <= 6 - len(cancelled)
@@ -0,0 +1,72 @@
+"""Main-content extraction: keep the article text, drop page chrome"""
+import re
+import sys
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FIXTURES_DIR, FixtureServer  # noqa: E402
+from scraper.extraction import block_text, extract_main_text, page_text  # noqa: E402
+from scraper.parse_pool import extract_page_text  # noqa: E402
+
+_TAG = re.compile(r'<[^>]+>')
+_WORD = re.compile(r'[a-z0-9]+')
+
+ARTICLE = ''.join(
+    f'<p>Paragraph {i} explains travel reimbursement, with receipts, approvals and deadlines for students.</p>'
+    for i in range(4)
+)
+PAGE = f"""<html><body>
+<div class="cookie-banner"><p>We use cookies to give you the best experience, by continuing you agree.</p></div>
+<nav><a href="/a">Admissions</a> <a href="/b">Academics</a></nav>
+<div class="layout">
+  <div class="sidebar-menu"><ul><li><a href="/x">Related link one</a></li><li><a href="/y">Related link two</a></li></ul></div>
+  <div id="main-content"><h1>Travel</h1>{ARTICLE}
+    <ul class="links"><li><a href="/1">Forms</a></li><li><a href="/2">Policies</a></li><li><a href="/3">Contacts</a></li></ul>
+  </div>
+</div>
+<footer><p>Copyright NC State University, Raleigh, North Carolina, all rights reserved.</p></footer>
+</body></html>"""
+
+
+def words(text):
+    return set(_WORD.findall(text.lower()))
+
+
+def test_main_block_is_kept_and_chrome_dropped():
+    text = extract_main_text(BeautifulSoup(PAGE, 'html.parser'))
+
+    assert text.startswith('Travel\n\nParagraph 0 explains')
+    assert text.count('\n\n') == 4
+    for chrome in ('cookies', 'Admissions', 'Related link', 'Forms', 'Copyright'):
+        assert chrome not in text
+    # The plain page text keeps the sidebar and link list
+    assert 'Related link one' in page_text(BeautifulSoup(PAGE, 'html.parser'))
+
+
+def test_pages_without_a_clear_main_block_fall_back_to_the_page_text():
+    short = '<html><body><nav>Menu</nav><div><p>Office hours are 8 to 5 on weekdays, closed on holidays.</p></div></body></html>'
+    assert extract_main_text(BeautifulSoup(short, 'html.parser')) == page_text(BeautifulSoup(short, 'html.parser'))
+    assert extract_main_text(BeautifulSoup('<html><body></body></html>', 'html.parser')) == ''
+
+
+def test_block_text_keeps_one_paragraph_per_block():
+    soup = BeautifulSoup('<div>Call <b>919</b>  555<p>Email us</p><ul><li>One</li><li>Two</li></ul></div>', 'html.parser')
+    assert block_text(soup) == 'Call 919 555\n\nEmail us\n\nOne\n\nTwo'
+
+
+@pytest.mark.parametrize('page', list(FixtureServer().pages.values()), ids=lambda p: p['path'])
+def test_fixture_pages_keep_their_body_and_lose_the_template(page):
+    body = words(_TAG.sub(' ', (FIXTURES_DIR / 'pages' / page['file']).read_text(encoding='utf-8')))
+    main = extract_page_text(page['html'], enhanced=True)
+    full = extract_page_text(page['html'], enhanced=False)
+
+    assert len(main) < len(full)
+    assert len(body & words(main)) / len(body) >= 0.95
+    if page.get('template', 'full') == 'full':
+        assert 'cookies' not in main.lower() and 'cookies' in full.lower()
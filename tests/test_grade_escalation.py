@@ -0,0 +1,80 @@
+"""Grade cascade: a cheap grading model first, borderline pages re-graded by the answer model"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+from utils.metrics import ResearchMetrics  # noqa: E402
+
+CONTENT = "Students submit travel reimbursement requests within 30 days of returning."
+QUERY = 'student travel reimbursement'
+
+
+def researcher(tmp_path, cheap_score, **config):
+    # The answer model grades everything 0.9, so an escalated grade is easy to spot
+    return NCSUAdvancedResearcher(dict(dict(
+        llm_provider='mock', mock_grade_score=0.9,
+        grade_llm={'mock_grade_score': cheap_score, 'mock_failure_rate': 0.0},
+        relevance_threshold=0.6, grade_escalation_margin=0.1, verbosity='quiet', output_dir=str(tmp_path)
+    ), **config))
+
+
+def grade(research):
+    metrics = ResearchMetrics(QUERY)
+    score = research.grade_content_relevance(CONTENT, QUERY, metrics)
+    calls = {stage: entry['calls'] for stage, entry in metrics.llm.items()}
+    return score, calls, metrics.counters.get('grades_escalated', 0)
+
+
+@pytest.mark.parametrize('cheap_score, expected, escalated', [
+    (0.55, 0.9, 1),  # within the margin below the threshold
+    (0.7, 0.9, 1),   # on the margin above it
+    (0.2, 0.2, 0),   # clearly irrelevant: the cheap grade stands
+    (0.95, 0.95, 0),
+])
+def test_only_borderline_grades_are_escalated(tmp_path, cheap_score, expected, escalated):
+    research = researcher(tmp_path, cheap_score)
+    assert research.grade_provider is not research.llm_provider
+
+    score, calls, counted = grade(research)
+    assert score == pytest.approx(expected)
+    assert counted == escalated
+    assert calls == ({'grade': 1, 'grade_escalated': 1} if escalated else {'grade': 1})
+
+
+def test_unparseable_grades_are_escalated(tmp_path):
+    research = researcher(tmp_path, 0.2)
+    research.grade_provider.complete = lambda prompt: "It depends."
+    score, calls, counted = grade(research)
+    assert (score, counted) == (pytest.approx(0.9), 1)
+    assert calls == {'grade': 1, 'grade_escalated': 1}
+
+
+def test_failed_escalation_keeps_the_first_grade(tmp_path):
+    research = researcher(tmp_path, 0.55, mock_failure_rate=1.0)
+    score, calls, counted = grade(research)
+    assert score == pytest.approx(0.55) and counted == 1
+    assert calls == {'grade': 1}
+
+
+def test_no_escalation_without_a_separate_grading_model(tmp_path):
+    research = NCSUAdvancedResearcher(dict(llm_provider='mock', mock_grade_score=0.55, relevance_threshold=0.6,
+                                           grade_escalation_margin=0.1, verbosity='quiet', output_dir=str(tmp_path)))
+    assert research.grade_provider is research.llm_provider
+    assert grade(research) == (pytest.approx(0.55), {'grade': 1}, 0)
+
+
+def test_cached_grades_are_kept_apart_from_unescalated_ones(tmp_path):
+    cascade = researcher(tmp_path, 0.55, grade_cache_size=16)
+    assert grade(cascade)[0] == pytest.approx(0.9)
+    # Served from the cache: no LLM calls at all
+    assert grade(cascade)[1:] == ({}, 0)
+
+    plain = researcher(tmp_path, 0.55, grade_cache_size=16, grade_escalation_margin=None)
+    plain.grade_cache = cascade.grade_cache
+    assert grade(plain)[0] == pytest.approx(0.55)
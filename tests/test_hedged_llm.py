@@ -0,0 +1,133 @@
+"""Hedged and fallback LLM calls across mock providers with injected delays, and fallback models"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+
+from ncsu_advanced_config_base import (  # noqa: E402
+    DEFAULT_LLM_MODELS, HedgedLLMProvider, LLMProviderError, MockLLMProvider, NCSUAdvancedResearcher,
+)
+from utils.context_packer import DEFAULT_CONTEXT_WINDOW, context_window  # noqa: E402
+
+# MockLLMProvider answers a grading prompt with its grade_score, so each provider's reply is recognizable
+PROMPT = "You are an expert content grader. Grade how relevant this content is."
+PRIMARY, BACKUP = 'mock/mock-model', 'mock/mock-model#1'
+
+
+def hedged(primary, backup, hedge_after):
+    return HedgedLLMProvider([primary, backup], hedge_after=hedge_after)
+
+
+def test_primary_wins_before_the_hedge_delay():
+    provider = hedged(MockLLMProvider(latency=0.02, grade_score=0.1), MockLLMProvider(grade_score=0.9),
+                      hedge_after=0.5)
+    assert provider.complete(PROMPT) == '0.100'
+    assert provider.last_usage['estimated'] is False
+
+    stats = provider.stats()
+    assert stats['hedge_after_seconds'] == 0.5
+    primary, backup = stats['providers'][PRIMARY], stats['providers'][BACKUP]
+    assert (primary['calls'], primary['wins'], primary['hedges']) == (1, 1, 0)
+    assert primary['p50_seconds'] == pytest.approx(0.02, abs=0.02)
+    assert primary['prompt_tokens'] == provider.last_usage['prompt_tokens'] > 0
+    assert backup['calls'] == 0
+
+
+def test_backup_wins_when_the_primary_is_slow():
+    provider = hedged(MockLLMProvider(latency=0.5, grade_score=0.1), MockLLMProvider(latency=0.01, grade_score=0.9),
+                      hedge_after=0.05)
+    started = time.perf_counter()
+    assert provider.complete(PROMPT) == '0.900'
+    assert time.perf_counter() - started < 0.3
+
+    stats = provider.stats()['providers']
+    assert (stats[BACKUP]['calls'], stats[BACKUP]['hedges'], stats[BACKUP]['wins']) == (1, 1, 1)
+    assert (stats[PRIMARY]['calls'], stats[PRIMARY]['wins']) == (1, 0)
+    # The losing primary is still running but will be billed too
+    usage = provider.last_usage
+    assert usage['estimated'] is True
+    assert usage['prompt_tokens'] == 2 * stats[BACKUP]['prompt_tokens']
+    assert usage['completion_tokens'] == 2 * stats[BACKUP]['completion_tokens']
+
+    time.sleep(0.6)
+    stats = provider.stats()['providers']
+    assert stats[PRIMARY]['prompt_tokens'] == stats[BACKUP]['prompt_tokens']
+    assert stats[PRIMARY]['p50_seconds'] == pytest.approx(0.5, abs=0.1)
+
+
+def test_falls_back_at_once_when_the_primary_raises():
+    provider = hedged(MockLLMProvider(failure_rate=1.0, grade_score=0.1), MockLLMProvider(grade_score=0.9),
+                      hedge_after=10.0)
+    started = time.perf_counter()
+    assert provider.complete(PROMPT) == '0.900'
+    assert time.perf_counter() - started < 1.0
+    assert provider.last_usage['estimated'] is False
+
+    stats = provider.stats()['providers']
+    assert (stats[PRIMARY]['calls'], stats[PRIMARY]['errors'], stats[PRIMARY]['prompt_tokens']) == (1, 1, 0)
+    assert (stats[BACKUP]['calls'], stats[BACKUP]['fallbacks'], stats[BACKUP]['wins']) == (1, 1, 1)
+
+
+def test_raises_when_every_provider_fails():
+    provider = hedged(MockLLMProvider(failure_rate=1.0), MockLLMProvider(latency=0.01, failure_rate=1.0),
+                      hedge_after=10.0)
+    with pytest.raises(LLMProviderError) as error:
+        provider.complete(PROMPT)
+    assert PRIMARY in str(error.value) and BACKUP in str(error.value)
+
+    stats = provider.stats()['providers']
+    assert [stats[label]['errors'] for label in (PRIMARY, BACKUP)] == [1, 1]
+    assert [stats[label]['wins'] for label in (PRIMARY, BACKUP)] == [0, 0]
+    assert provider.generate_response(PROMPT).startswith('Error generating response')
+
+
+def test_percentile_hedge_delay_waits_for_samples():
+    primary = MockLLMProvider(latency=0.01)
+    provider = HedgedLLMProvider([primary, MockLLMProvider()], hedge_after='p95', hedge_after_default=2.0,
+                                 min_samples=3)
+    assert provider.hedge_delay() == 2.0
+    for _ in range(3):
+        provider.complete(PROMPT)
+    assert provider.hedge_delay() == pytest.approx(0.01, abs=0.02)
+    assert provider.stats()['providers'][PRIMARY]['calls'] == 3
+
+
+@pytest.fixture
+def built_settings(monkeypatch):
+    """Settings each provider is built from; every one is a mock so no SDK or key is needed"""
+    built = []
+
+    def build(settings):
+        built.append(settings)
+        return MockLLMProvider()
+    monkeypatch.setattr(NCSUAdvancedResearcher, '_build_llm_provider', staticmethod(build))
+    return built
+
+
+@pytest.mark.parametrize('fallback, extra, model', [
+    ('anthropic', {}, DEFAULT_LLM_MODELS['anthropic']),
+    ('anthropic', {'llm_fallback_model': 'claude-sonnet-4-5'}, 'claude-sonnet-4-5'),
+    ('openai', {'llm_fallback_model': 'gpt-4.1-nano'}, 'gpt-4.1-nano'),
+    ({'llm_provider': 'anthropic', 'llm_model': 'claude-opus-4-1'}, {'llm_fallback_model': 'ignored'},
+     'claude-opus-4-1'),
+])
+def test_fallback_provider_gets_a_model_of_its_own(built_settings, tmp_path, fallback, extra, model):
+    config = dict(llm_provider='openai', llm_model='gpt-4.1', llm_fallbacks=[fallback], verbosity='quiet',
+                  output_dir=str(tmp_path), **extra)
+    researcher = NCSUAdvancedResearcher(config)
+
+    primary, backup = built_settings
+    assert isinstance(researcher.llm_provider, HedgedLLMProvider)
+    assert (primary['llm_provider'], primary['llm_model']) == ('openai', 'gpt-4.1')
+    assert backup['llm_model'] == model
+
+
+def test_default_models_have_known_context_windows():
+    # Otherwise answers from a fallback would be packed for the small default window
+    for model in DEFAULT_LLM_MODELS.values():
+        assert context_window(model) > DEFAULT_CONTEXT_WINDOW, model
@@ -0,0 +1,146 @@
+"""Research history: page reuse, caches and full-text search"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+from utils.history import ResearchHistory, fts_query, normalize_query  # noqa: E402
+from utils.page_store import PageStore, page_content  # noqa: E402
+
+QUERY = 'student travel reimbursement'
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+def researcher(server, tmp_path, **overrides):
+    config = dict(server.researcher_config(), llm_provider='mock', mock_grade_score=0.9, top_k=3, max_pages=3,
+                  verbosity='quiet', output_dir=str(tmp_path), history_path=str(tmp_path / 'history.db'))
+    config.update(overrides)
+    return NCSUAdvancedResearcher(config)
+
+
+def extracted_page(url, text):
+    return {'url': url, 'title': 'Travel', 'content_id': 'c1', 'word_count': len(text.split()),
+            'extraction_success': True}, {'c1': text}
+
+
+def test_pages_are_only_reused_under_the_same_extraction_settings(server, tmp_path):
+    first = researcher(server, tmp_path).research(QUERY)
+    assert first['history']['pages_reused'] == []
+
+    same = researcher(server, tmp_path).research(QUERY)
+    assert sorted(same['history']['pages_reused']) == sorted(p['url'] for p in first['extracted_pages'])
+
+    full_page = researcher(server, tmp_path, enhanced_extraction=False).research(QUERY)
+    assert full_page['history']['pages_reused'] == []
+
+
+def test_get_page_checks_extraction_and_age(tmp_path):
+    history = ResearchHistory(tmp_path / 'history.db')
+    page, pages = extracted_page('https://www.ncsu.edu/travel', 'Travel reimbursement rules')
+    history.record({'query': 'travel', 'extracted_pages': [page], 'pages': pages}, extraction='main')
+
+    assert history.get_page(page['url'], extraction='main')['content'] == 'Travel reimbursement rules'
+    assert history.get_page(page['url'], extraction='full') is None
+    assert history.get_page(page['url'], max_age_seconds=-1, extraction='main') is None
+
+
+def test_databases_without_extraction_column_are_upgraded(tmp_path):
+    path = tmp_path / 'history.db'
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE pages (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL UNIQUE, title TEXT, "
+                 "content_id TEXT, content TEXT, word_count INTEGER, fetched_at REAL NOT NULL)")
+    conn.execute("INSERT INTO pages (url, title, content, word_count, fetched_at) "
+                 "VALUES ('https://www.ncsu.edu/a', 'A', 'old text', 2, strftime('%s', 'now'))")
+    conn.commit()
+    conn.close()
+
+    history = ResearchHistory(path)
+    assert history.get_page('https://www.ncsu.edu/a', extraction='main') is None
+
+
+@pytest.mark.parametrize('setting', [
+    {'enhanced_extraction': False},
+    {'cross_source_dedup': False},
+    {'near_duplicate_distance': 3},
+    {'early_stop_pages': 1},
+    {'llm_model': 'other-model'},
+])
+def test_stored_answers_are_only_reused_under_the_same_settings(server, tmp_path, setting):
+    first = researcher(server, tmp_path, history_answer_max_age_hours=1).research(QUERY)
+    assert 'answer_reused' not in first
+
+    again = researcher(server, tmp_path, history_answer_max_age_hours=1).research(QUERY.upper() + '?')
+    assert again['final_answer'] == first['final_answer'] and 'answer_reused' in again
+
+    changed = researcher(server, tmp_path, history_answer_max_age_hours=1, **setting).research(QUERY)
+    assert 'answer_reused' not in changed
+
+
+def test_research_results_store_each_page_body_once(server, tmp_path):
+    results = researcher(server, tmp_path, history_path=None).research(QUERY)
+
+    store = PageStore(results['pages'])
+    referenced = {p['content_id'] for key in ('extracted_pages', 'graded_pages', 'filtered_pages')
+                  for p in results[key]}
+    assert referenced <= set(results['pages'])
+    assert all('content' not in p for p in results['extracted_pages'])
+    page = results['filtered_pages'][0]
+    assert page_content(results, page) == store.get(page['content_id'])
+    assert store.put(store.get(page['content_id'])) == page['content_id']
+    assert len(store) == len(results['pages'])
+
+
+def test_search_grade_and_answer_caches(tmp_path):
+    history = ResearchHistory(tmp_path / 'history.db')
+    history.put_search('s1', [{'title': 'Travel', 'url': 'https://www.ncsu.edu/travel', 'snippet': ''}])
+    history.put_grade('g1', 0.75)
+    history.put_answer('a1', 'travel', {'final_answer': 'Submit receipts.', 'sources': []})
+
+    assert history.get_search('s1')[0]['url'] == 'https://www.ncsu.edu/travel'
+    assert history.get_search('s1', max_age_seconds=-1) is None
+    assert history.get_search('missing') is None
+    assert history.get_grade('g1') == 0.75 and history.get_grade('missing') is None
+    answer = history.get_answer('a1', max_age_seconds=60)
+    assert answer['final_answer'] == 'Submit receipts.' and answer['answered_at'] > 0
+    assert history.get_answer('a1', max_age_seconds=-1) is None
+    assert history.stats() == {'runs': 0, 'pages': 0, 'searches': 1, 'grades': 1, 'answers': 1}
+
+
+def test_full_text_search_over_runs_and_pages(tmp_path):
+    history = ResearchHistory(tmp_path / 'history.db')
+    page, pages = extracted_page('https://www.ncsu.edu/travel', 'Travel reimbursement needs itemized receipts')
+    run_id = history.record({'query': 'How do I get reimbursed for travel?', 'final_answer': 'Keep your receipts.',
+                             'sources': [{'title': 'Travel', 'url': page['url']}],
+                             'extracted_pages': [page], 'pages': pages}, provider='mock')
+    history.record({'query': 'Parking permits', 'final_answer': 'Buy one online.'}, index_run=True)
+
+    runs = history.search_runs('receipts travel')
+    assert [r['id'] for r in runs] == [run_id]
+    assert runs[0]['sources'][0]['url'] == page['url']
+    assert [p['url'] for p in history.search_pages('itemized')] == [page['url']]
+    assert history.search_pages('!!') == []
+
+    # Re-recording a page replaces its indexed text
+    page, pages = extracted_page(page['url'], 'Travel advances are paid before the trip')
+    history.record({'query': 'advances', 'extracted_pages': [page], 'pages': pages}, index_run=False)
+    assert history.search_pages('itemized') == []
+    assert len(history.search_pages('advances')) == 1
+    assert [q for q, _ in history.recent_queries()] == ['How do I get reimbursed for travel?', 'Parking permits']
+
+
+def test_query_normalization():
+    assert normalize_query('  How do I APPLY, for graduation?? ') == 'how do i apply for graduation'
+    assert fts_query('a "quoted" term') == '"quoted" OR "term"'
@@ -0,0 +1,117 @@
+"""Per-host pacing: adaptive concurrency (AIMD) in HostLimiter and the fixed delay in HostPacer"""
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from scraper.host_limiter import HostLimiter, HostPacer  # noqa: E402
+
+URL = 'https://www.ncsu.edu/travel'
+
+
+def request(limiter, url=URL, **outcome):
+    with limiter.slot(url) as slot:
+        slot.record(**outcome)
+
+
+def test_limit_grows_by_about_one_per_round_trip_while_fast():
+    limiter = HostLimiter(initial=2, max_limit=4, latency_target=1.0)
+    for _ in range(2):
+        request(limiter, status=200)
+    assert limiter.limit(URL) == 2
+    for _ in range(3):
+        request(limiter, status=200)
+    assert limiter.limit(URL) == 3
+
+    for _ in range(50):
+        request(limiter, status=200)
+    assert limiter.limit(URL) == 4
+    assert limiter.snapshot()['www.ncsu.edu']['ok'] == 55
+
+
+def test_failures_halve_the_limit_once_per_cooldown():
+    limiter = HostLimiter(initial=8, min_limit=1, max_limit=8, cooldown=60.0)
+    request(limiter, status=500)
+    request(limiter, error=True)
+    assert limiter.limit(URL) == 4
+    snapshot = limiter.snapshot()['www.ncsu.edu']
+    assert (snapshot['throttled'], snapshot['errors'], snapshot['decreases']) == (1, 1, 1)
+
+    limiter = HostLimiter(initial=8, min_limit=3, cooldown=0.0)
+    for _ in range(5):
+        request(limiter, status=503)
+    assert limiter.limit(URL) == 3
+
+
+def test_slow_responses_count_as_overload():
+    limiter = HostLimiter(initial=4, latency_target=0.01, cooldown=0.0)
+    with limiter.slot(URL) as slot:
+        time.sleep(0.02)
+        slot.record(status=200)
+    assert limiter.limit(URL) == 2
+    assert limiter.snapshot()['www.ncsu.edu']['slow'] == 1
+
+
+def test_retry_after_pauses_the_host_but_not_others():
+    limiter = HostLimiter(initial=2)
+    request(limiter, status=429, retry_after=0.2)
+    assert limiter.snapshot()['www.ncsu.edu']['paused_seconds'] > 0
+
+    started = time.perf_counter()
+    request(limiter, url='https://registrar.ncsu.edu/', status=200)
+    assert time.perf_counter() - started < 0.1
+    request(limiter, status=200)
+    assert time.perf_counter() - started >= 0.15
+
+
+def test_exception_in_slot_counts_as_error():
+    limiter = HostLimiter(initial=2, cooldown=0.0)
+    try:
+        with limiter.slot(URL):
+            raise ConnectionError('reset')
+    except ConnectionError:
+        pass
+    snapshot = limiter.snapshot()['www.ncsu.edu']
+    assert snapshot['errors'] == 1 and snapshot['in_flight'] == 0
+
+
+def test_scraper_package_does_not_need_utils():
+    code = ("import sys; sys.path.insert(0, 'src'); sys.modules['utils'] = None; "
+            "from scraper.host_limiter import HostLimiter; "
+            "HostLimiter().snapshot()")
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+
+def test_pacer_spaces_concurrent_requests_per_host():
+    pacer = HostPacer(0.1)
+    starts = []
+
+    def fetch(url):
+        with pacer.slot(url):
+            starts.append((url, time.monotonic()))
+
+    threads = [threading.Thread(target=fetch, args=(URL,)) for _ in range(4)]
+    threads.append(threading.Thread(target=fetch, args=('https://registrar.ncsu.edu/',)))
+    began = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    same_host = sorted(t for url, t in starts if url == URL)
+    assert all(b - a >= 0.095 for a, b in zip(same_host, same_host[1:]))
+    # Another host doesn't wait behind this one
+    assert next(t for url, t in starts if url != URL) - began < 0.05
+
+
+def test_pacer_waits_after_a_slow_response():
+    pacer = HostPacer(0.1)
+    with pacer.slot(URL):
+        time.sleep(0.2)
+    finished = time.monotonic()
+    with pacer.slot(URL):
+        assert time.monotonic() - finished >= 0.095
@@ -0,0 +1,57 @@
+"""Deferred imports: heavy dependencies load on first use, not at startup"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from import_time import DEFERRED_MODULES, report  # noqa: E402
+
+
+def loaded_after(code):
+    """Run ``code`` in a fresh interpreter and return the deferred modules it left in sys.modules"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT), str(ROOT / 'src'), str(ROOT / 'benchmarks')]))
+    check = f"import json, sys\n{code}\nprint(json.dumps(sorted(m for m in {DEFERRED_MODULES!r} if m in sys.modules)))"
+    proc = subprocess.run([sys.executable, '-c', check], cwd=str(ROOT), env=env, capture_output=True, text=True,
+                          timeout=60)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('module', ['ncsu_advanced_config_base', 'api_server', 'batch_research', 'utils.config'])
+def test_startup_imports_no_deferred_modules(module):
+    assert loaded_after(f'import {module}') == []
+
+
+def test_researcher_setup_loads_only_the_http_client(tmp_path):
+    code = ("from ncsu_advanced_config_base import NCSUAdvancedResearcher\n"
+            f"NCSUAdvancedResearcher({{'llm_provider': 'mock', 'verbosity': 'quiet', 'output_dir': {str(tmp_path)!r}}})")
+    # The scraper opens its connection pool up front; parsing, Selenium and the SDKs wait
+    assert loaded_after(code) == ['requests']
+
+
+def test_scraping_loads_the_parser_on_first_use():
+    code = ("from fixture_server import FixtureServer\n"
+            "from scraper.models import ScrapingConfig, SearchResult\n"
+            "from scraper.ncsu_scraper import NCSUScraper\n"
+            "with FixtureServer() as server:\n"
+            "    scraper = NCSUScraper(ScrapingConfig(base_url=server.base_url, allowed_domain=server.host, delay=0))\n"
+            "    page = scraper.scrape_page(SearchResult('', server.base_url + '/travel/student-reimbursement'))\n"
+            "    assert page.extraction_success, page.error_message")
+    loaded = loaded_after(code)
+    assert 'bs4' in loaded and 'requests' in loaded
+    assert not {'selenium', 'openai', 'anthropic', 'yaml'} & set(loaded)
+
+
+def test_report_flags_deferred_modules_loaded_at_startup():
+    summary = report('utils.registry', repeat=1)
+    assert summary['deferred_loaded'] == [] and summary['total_ms'] > 0
+    assert 'utils.registry' in {r['module'] for r in summary['slowest_cumulative']}
+
+    eager = report('yaml', repeat=1)
+    assert eager['deferred_loaded'] == ['yaml']
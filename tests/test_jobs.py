@@ -0,0 +1,103 @@
+"""Background research jobs: progress, cancellation and retirement"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from utils.jobs import CANCELLED, DONE, FAILED, QUEUED, JobQueue  # noqa: E402
+
+
+def wait_for(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.status not in (DONE, FAILED, CANCELLED):
+        assert time.monotonic() < deadline, f"{job.id} still {job.status}"
+        time.sleep(0.01)
+
+
+def stepping_runner(steps=50, delay=0.01, started=None):
+    """Runner that reports scrape progress one page at a time"""
+    def run(job, progress):
+        if started is not None:
+            started.set()
+        progress('search', 1, 1)
+        for done in range(1, steps + 1):
+            time.sleep(delay)
+            progress('scrape', done, steps)
+        return {'query': job.query}
+    return run
+
+
+def test_finished_job_reports_stages_and_result():
+    queue = JobQueue(stepping_runner(steps=4, delay=0), workers=1)
+    job = queue.submit('travel', {})
+    wait_for(job)
+
+    assert job.status == DONE and job.result == {'query': 'travel'}
+    assert job.fraction == 1.0
+    snapshot = job.snapshot()
+    assert snapshot['stages']['scrape']['done'] == 4
+    assert snapshot['last_event']['stage'] == 'finished'
+    assert queue.stats()['done'] == 1
+
+
+def test_running_job_stops_at_its_next_checkpoint():
+    started = threading.Event()
+    queue = JobQueue(stepping_runner(started=started), workers=1)
+    job = queue.submit('travel', {})
+    assert started.wait(5)
+    time.sleep(0.05)
+
+    assert queue.cancel(job.id)
+    wait_for(job)
+    assert job.status == CANCELLED and job.result is None
+    assert 0 < job.stages['scrape']['done'] < 50
+    assert not job.cancel()
+
+
+def test_cancelled_queued_job_never_runs():
+    ran = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def runner(job, progress):
+        ran.append(job.query)
+        started.set()
+        release.wait(5)
+        progress('answer', 1, 1)
+
+    queue = JobQueue(runner, workers=1)
+    first = queue.submit('first', {})
+    assert started.wait(5)
+    second = queue.submit('second', {})
+    assert second.status == QUEUED and queue.position(second.id) == 0
+
+    assert second.cancel()
+    release.set()
+    wait_for(first)
+    wait_for(second)
+    assert (first.status, second.status) == (DONE, CANCELLED)
+    assert ran == ['first']
+
+
+def test_failures_are_kept_and_old_jobs_retired():
+    def runner(job, progress):
+        if job.query == 'bad':
+            raise RuntimeError('search is down')
+        return job.query
+
+    queue = JobQueue(runner, workers=1, keep_finished=2)
+    jobs = [queue.submit(query, {}) for query in ('bad', 'a', 'b')]
+    for job in jobs:
+        wait_for(job)
+
+    assert jobs[0].status == FAILED and jobs[0].error == 'search is down'
+    assert 'RuntimeError' in jobs[0].traceback
+    # A job is retired just after it reports finishing
+    deadline = time.monotonic() + 5
+    while queue.get(jobs[0].id) is not None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert [j.id for j in queue.jobs()] == [jobs[1].id, jobs[2].id]
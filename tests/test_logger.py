@@ -0,0 +1,102 @@
+"""Queued logging: JSON records tagged with the correlation ID of the query or job that logged them"""
+import contextvars
+import io
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+from utils.jobs import DONE, JobQueue  # noqa: E402
+from utils.logger import configure_logging, correlation_id, correlation_scope, stop_logging  # noqa: E402
+
+
+@pytest.fixture
+def json_log():
+    """Configure JSON logging into a buffer; calling the fixture's result flushes it and returns the records"""
+    stream = io.StringIO()
+    configure_logging('json', stream=stream)
+
+    def records():
+        stop_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield records
+    stop_logging()
+
+
+def test_records_carry_the_correlation_id_and_extra_fields(json_log):
+    logger = logging.getLogger('tests.logger')
+    logger.setLevel(logging.INFO)
+
+    with correlation_scope('query-1'):
+        assert correlation_id() == 'query-1'
+        logger.info("  fetched page  ", extra={'stage': 'scrape', 'pages': 3})
+        # Threads started in a copy of the context keep the ID
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(logger.warning, "slow host"),
+                                  name='fetch-1')
+        worker.start()
+        worker.join()
+        try:
+            raise ValueError("bad grade")
+        except ValueError:
+            logger.exception("grading failed")
+    logger.info("outside any query")
+    assert correlation_id() is None
+
+    fetched, slow, failed, outside = json_log()
+    assert fetched['message'] == 'fetched page' and fetched['level'] == 'INFO' and fetched['logger'] == 'tests.logger'
+    assert (fetched['stage'], fetched['pages']) == ('scrape', 3)
+    assert fetched['time'].endswith('Z')
+    assert (slow['correlation_id'], slow['thread']) == ('query-1', 'fetch-1')
+    assert failed['correlation_id'] == 'query-1' and failed['message'] == 'grading failed'
+    assert failed['exception'].startswith('Traceback') and 'ValueError: bad grade' in failed['exception']
+    assert outside['correlation_id'] is None
+
+
+def test_text_format_writes_console_lines_as_is():
+    stream = io.StringIO()
+    configure_logging('text', stream=stream)
+    try:
+        logger = logging.getLogger('tests.logger.text')
+        logger.setLevel(logging.INFO)
+        logger.info("🔍 Searching", extra={'console': True})
+        logger.info("plain record")
+        try:
+            raise ValueError("bad grade")
+        except ValueError:
+            logger.exception("grading failed")
+    finally:
+        stop_logging()
+    console, plain, failed, *traceback = stream.getvalue().splitlines()
+    assert console == "🔍 Searching"
+    assert plain.endswith(" - tests.logger.text - INFO - plain record")
+    assert failed.endswith(" - ERROR - grading failed")
+    assert traceback[0].startswith('Traceback') and traceback[-1] == 'ValueError: bad grade'
+
+
+def test_a_job_tags_every_record_of_its_run(json_log, tmp_path):
+    with FixtureServer() as server:
+        config = dict(server.researcher_config(), llm_provider='mock', top_k=3, max_pages=3, verbosity='normal',
+                      output_dir=str(tmp_path))
+        jobs = JobQueue(lambda job, progress: NCSUAdvancedResearcher(job.config).research(job.query, progress=progress),
+                        workers=1)
+        job = jobs.submit('student travel reimbursement', config)
+        finished = threading.Event()
+        seen = job.subscribe(lambda event: event['stage'] == 'finished' and finished.set())
+        assert any(event['stage'] == 'finished' for event in seen) or finished.wait(30)
+        jobs.shutdown()
+
+    assert job.status == DONE and job.result['query_id'] == job.id
+    records = [r for r in json_log() if r['logger'].startswith(('ncsu_advanced_researcher', 'scraper'))]
+    assert records and all(r['correlation_id'] == job.id for r in records)
+    assert any(r.get('stage') == 'scrape' for r in records)
@@ -0,0 +1,111 @@
+"""Per-query metrics: aggregation and the JSON lines / Prometheus exports"""
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+from utils.metrics import ResearchMetrics, percentile, to_json_lines, to_prometheus  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+def sample_metrics():
+    metrics = ResearchMetrics('say "hi"\nthere')
+    metrics.record_span('scrape.page', 0.5, url='https://www.ncsu.edu/a')
+    metrics.record_span('scrape.page', 1.5, url='https://www.ncsu.edu/b')
+    metrics.record_llm('grade', 100, 2, 0.25)
+    metrics.record_llm('grade', 50, 1, 0.75, estimated=True)
+    metrics.record_cache('grade', True)
+    metrics.record_cache('grade', False)
+    metrics.record_cache('grade', False)
+    metrics.incr('bytes_fetched', 2048)
+    return metrics
+
+
+def test_snapshot_aggregates_spans_llm_calls_and_caches():
+    snapshot = sample_metrics().to_dict()
+
+    assert snapshot['stages']['scrape.page'] == {'count': 2, 'seconds': 2.0, 'max_seconds': 1.5}
+    assert snapshot['llm']['grade'] == {'calls': 2, 'prompt_tokens': 150, 'completion_tokens': 3,
+                                        'seconds': 1.0, 'estimated_calls': 1}
+    assert snapshot['caches']['grade'] == {'hits': 1, 'misses': 2, 'hit_rate': 0.3333}
+    assert snapshot['counters'] == {'bytes_fetched': 2048}
+
+
+def test_concurrent_recording_loses_nothing():
+    metrics = ResearchMetrics()
+
+    def work():
+        for _ in range(500):
+            metrics.incr('pages')
+            metrics.record_llm('grade', 1, 1, 0.0)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.counters['pages'] == 4000
+    assert metrics.llm['grade']['calls'] == 4000
+
+
+def test_prometheus_text_has_one_gauge_family_per_metric():
+    text = to_prometheus(sample_metrics().to_dict(), labels={'instance': 'a"b'})
+    lines = text.splitlines()
+
+    assert '# TYPE ncsu_research_stage_seconds gauge' in lines
+    assert not any(line.startswith('# TYPE') and not line.endswith(' gauge') for line in lines)
+    assert 'ncsu_research_stage_spans{instance="a\\"b",stage="scrape.page"} 2' in lines
+    assert 'ncsu_research_llm_tokens{instance="a\\"b",stage="grade",kind="prompt"} 150' in lines
+    assert 'ncsu_research_cache_requests{instance="a\\"b",cache="grade",result="miss"} 2' in lines
+    assert 'ncsu_research_events{instance="a\\"b",name="bytes_fetched"} 2048' in lines
+    # Nothing recorded, nothing rendered
+    assert 'cache_hit_ratio' not in to_prometheus(ResearchMetrics().to_dict())
+
+
+def test_json_lines_have_a_record_per_span_and_a_summary():
+    records = [json.loads(line) for line in to_json_lines(sample_metrics().to_dict()).splitlines()]
+
+    assert [r['type'] for r in records] == ['span', 'span', 'summary']
+    assert records[0]['url'] == 'https://www.ncsu.edu/a' and records[0]['query'] == 'say "hi"\nthere'
+    assert records[-1]['llm']['grade']['calls'] == 2 and 'spans' not in records[-1]
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 95) == 0.0
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(range(1, 101), 95) == 95
+
+
+@pytest.mark.parametrize('metrics_format', ['jsonl', 'prometheus'])
+def test_research_exports_each_query(server, tmp_path, metrics_format):
+    metrics_path = tmp_path / 'metrics.out'
+    research = NCSUAdvancedResearcher(dict(
+        server.researcher_config(), llm_provider='mock', top_k=3, max_pages=2, verbosity='quiet',
+        output_dir=str(tmp_path), metrics_path=str(metrics_path), metrics_format=metrics_format))
+    research.research('student travel reimbursement')
+    research.research('apply to graduate school')
+
+    text = metrics_path.read_text(encoding='utf-8')
+    if metrics_format == 'jsonl':
+        summaries = [json.loads(line) for line in text.splitlines() if '"type": "summary"' in line]
+        assert [s['query'] for s in summaries] == ['student travel reimbursement', 'apply to graduate school']
+        assert all(s['llm']['answer']['calls'] == 1 for s in summaries)
+    else:
+        # The textfile only ever holds the latest query
+        assert 'ncsu_research_llm_calls{stage="answer"} 1' in text.splitlines()
+        assert text.count('# TYPE ncsu_research_duration_seconds gauge') == 1
+        assert not (tmp_path / 'metrics.out.tmp').exists()
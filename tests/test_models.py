@@ -0,0 +1,49 @@
+"""Word and token counts on the slotted page models"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from scraper.models import _WORD_COUNT_CHUNK, ScrapedPage, count_words  # noqa: E402
+
+
+@pytest.mark.parametrize('text', [
+    # Newline-separated words, with a chunk boundary falling inside a word
+    'abcdef\n' * (_WORD_COUNT_CHUNK // 7 * 3),
+    # Whitespace runs with no space character at all
+    '\n\t\n' * _WORD_COUNT_CHUNK,
+    'lead ' + 'x' * (_WORD_COUNT_CHUNK * 2) + '\nend',
+    'word ' * _WORD_COUNT_CHUNK,
+])
+def test_count_words_matches_split_on_long_text(text):
+    assert len(text) > _WORD_COUNT_CHUNK
+    assert count_words(text) == len(text.split())
+
+
+def test_compact_page_counts_words_on_decoded_text():
+    page = ScrapedPage('Title', 'https://www.ncsu.edu/a', 'café hours today', compact=True)
+    assert page.compact
+    assert page.word_count == 3
+
+
+def test_token_count_is_cached_per_tokenizer():
+    class CountingTokenizer:
+        name = 'counting'
+        calls = 0
+
+        def count(self, text):
+            CountingTokenizer.calls += 1
+            return len(text.split())
+
+    page = ScrapedPage('Title', 'https://www.ncsu.edu/a', 'one two three four')
+    tokenizer = CountingTokenizer()
+    assert page.token_count(tokenizer) == 4
+    assert page.token_count(tokenizer) == 4
+    assert CountingTokenizer.calls == 1
+    assert page.token_count() == 5
+
+    page.content = 'one two'
+    assert page.token_count(tokenizer) == 2
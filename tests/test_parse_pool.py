@@ -0,0 +1,74 @@
+"""Process-pool parsing: small pages in-thread, large ones offloaded, in-thread again once the pool breaks"""
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from scraper.models import ScrapingConfig, SearchResult  # noqa: E402
+from scraper.ncsu_scraper import NCSUScraper  # noqa: E402
+from scraper.parse_pool import ParsePool, extract_page_text  # noqa: E402
+
+PAGE = b"<html><body><nav>Menu</nav><main><h1>Travel</h1><p>Submit receipts within 30 days.</p></main></body></html>"
+
+
+def where(body):
+    return 'worker' if multiprocessing.parent_process() is not None else 'caller'
+
+
+def crash_in_worker(body):
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return extract_page_text(body)
+
+
+@pytest.fixture
+def pool():
+    parse_pool = ParsePool(1, min_bytes=1024)
+    yield parse_pool
+    parse_pool.close()
+
+
+def test_small_pages_are_parsed_in_the_calling_thread(pool):
+    assert pool.run(where, PAGE) == 'caller'
+    assert pool.run(extract_page_text, PAGE) == extract_page_text(PAGE)
+    assert pool._executor is None
+    assert pool.stats()['inline'] == 2
+
+
+def test_large_pages_go_to_a_worker_process(pool):
+    body = PAGE + b' ' * 2048
+    assert pool.run(where, body) == 'worker'
+    assert pool.run(extract_page_text, body, False) == extract_page_text(body, False)
+    assert pool.stats()['offloaded'] == 2
+
+
+def test_broken_pool_falls_back_to_parsing_in_thread(pool):
+    body = PAGE + b' ' * 2048
+    assert pool.run(crash_in_worker, body) == extract_page_text(PAGE)
+    assert pool.run(where, body) == 'caller'
+    stats = pool.stats()
+    assert stats['broken'] and stats['fallback'] == 1 and stats['inline'] == 1 and stats['offloaded'] == 0
+
+
+def test_scraper_text_is_the_same_with_and_without_the_pool():
+    with FixtureServer() as server:
+        def scrape(**options):
+            scraper = NCSUScraper(ScrapingConfig(base_url=server.base_url, allowed_domain=server.host, delay=0,
+                                                 **options))
+            page = scraper.scrape_page(SearchResult('', server.base_url + '/travel/student-reimbursement'))
+            if scraper.parse_pool is None:
+                return page, None
+            scraper.parse_pool.close()
+            return page, scraper.parse_pool.stats()
+
+        in_thread, _ = scrape()
+        pooled, stats = scrape(parse_workers=1, parse_min_bytes=0)
+    assert pooled.extraction_success and pooled.content == in_thread.content
+    assert stats['offloaded'] == 1
@@ -0,0 +1,122 @@
+"""Background, compressed result segments: rotation, retention and reading back"""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from utils import persistence  # noqa: E402
+from utils.persistence import ResultWriter, get_writer, prune_files, read_results  # noqa: E402
+
+
+@pytest.fixture
+def writer_factory(tmp_path):
+    writers = []
+
+    def make(**options):
+        writer = ResultWriter(tmp_path, **options)
+        writers.append(writer)
+        return writer
+
+    yield make
+    for writer in writers:
+        writer.close()
+
+
+def segments(directory):
+    return sorted(Path(directory).glob('results-*.jsonl*'))
+
+
+@pytest.mark.parametrize('compression, suffix', [('gzip', '.jsonl.gz'), ('none', '.jsonl')])
+def test_records_round_trip_through_a_segment(tmp_path, writer_factory, compression, suffix):
+    writer = writer_factory(compression=compression)
+    paths = {writer.submit({'query': f'q{i}', 'answer': 'é' * i}) for i in range(3)}
+    assert writer.flush(timeout=5)
+
+    segment, = segments(tmp_path)
+    assert paths == {str(segment)} and segment.name.endswith(suffix)
+    assert [r['query'] for r in read_results(segment)] == ['q0', 'q1', 'q2']
+    assert writer.written == 3 and writer.errors == 0
+
+
+def test_segments_rotate_at_the_size_limit_and_are_pruned(tmp_path, writer_factory):
+    writer = writer_factory(max_segment_bytes=200, retention_files=2)
+    for i in range(5):
+        writer.submit({'query': f'q{i}', 'padding': os.urandom(150).hex()})
+        assert writer.flush(timeout=5)
+
+    kept = segments(tmp_path)
+    assert len(kept) == 2
+    numbers = [int(p.name.split('-')[2].split('.')[0]) for p in kept]
+    assert numbers == sorted(numbers) and numbers[-1] >= 4
+    assert [r['query'] for p in kept for r in read_results(p)][-1] == 'q4'
+
+
+def test_a_new_writer_appends_to_todays_segment(tmp_path, writer_factory):
+    first = writer_factory()
+    first.submit({'query': 'q0'})
+    first.flush(timeout=5)
+    first.close()
+
+    second = writer_factory()
+    second.submit({'query': 'q1'})
+    second.flush(timeout=5)
+    segment, = segments(tmp_path)
+    assert [r['query'] for r in read_results(segment)] == ['q0', 'q1']
+
+
+def test_prune_files_by_count_and_age(tmp_path):
+    now = time.time()
+    for i in range(4):
+        path = tmp_path / f'answer_{i}.txt'
+        path.write_text('x')
+        os.utime(path, (now - i * 86400, now - i * 86400))
+
+    assert prune_files(tmp_path, 'answer_*.txt', max_age_days=2.5) == 1
+    assert prune_files(tmp_path, 'answer_*.txt', max_files=2, keep=tmp_path / 'answer_2.txt') == 0
+    assert prune_files(tmp_path, 'answer_*.txt', max_files=1) == 2
+    assert [p.name for p in tmp_path.iterdir()] == ['answer_0.txt']
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ResultWriter(tmp_path, compression='lz4')
+
+
+def test_rotation_and_pruning_run_on_the_writer_thread(tmp_path, writer_factory, monkeypatch):
+    pruned_on = []
+
+    def prune(*args, **kwargs):
+        pruned_on.append(threading.current_thread().name)
+        return 0
+
+    monkeypatch.setattr(persistence, 'prune_files', prune)
+    writer = writer_factory(max_segment_bytes=300, retention_files=None)
+    submitters = [threading.Thread(target=lambda n=n: [writer.submit({'query': f'{n}-{i}', 'padding': 'x' * 100})
+                                                       for i in range(25)]) for n in range(4)]
+    for thread in submitters:
+        thread.start()
+    for thread in submitters:
+        thread.join()
+    assert writer.flush(timeout=10)
+
+    assert pruned_on and set(pruned_on) == {'result-writer'}
+    records = [r['query'] for p in segments(tmp_path) for r in read_results(p)]
+    assert len(records) == len(set(records)) == 100 and writer.errors == 0
+
+
+def test_one_shared_writer_per_directory(tmp_path):
+    first = get_writer(tmp_path / 'shared', compression='gzip')
+    try:
+        assert get_writer(tmp_path / 'shared' / '..' / 'shared', compression='gzip') is first
+        # Different options don't start a second writer on the same files
+        assert get_writer(tmp_path / 'shared', compression='none') is first
+        assert get_writer(tmp_path / 'other') is not first
+    finally:
+        first.close()
+        get_writer(tmp_path / 'other').close()
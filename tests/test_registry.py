@@ -0,0 +1,77 @@
+"""Resource registry: one build per key under concurrency, LRU eviction and sharing across researchers"""
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+from utils.registry import LRUCache, ResourceRegistry  # noqa: E402
+
+
+def test_lru_cache_evicts_the_least_recently_used_key():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.get('b', 'gone') == 'gone'
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+
+def test_concurrent_requests_for_one_key_wait_for_a_single_build():
+    registry = ResourceRegistry()
+    builds = []
+    lock = threading.Lock()
+
+    def factory():
+        with lock:
+            builds.append(1)
+        time.sleep(0.05)
+        return object()
+
+    with ThreadPoolExecutor(8) as pool:
+        values = list(pool.map(lambda _: registry.get('llm', factory, 'mock'), range(8)))
+
+    assert len(builds) == 1
+    assert all(value is values[0] for value in values)
+    assert registry.get('llm', factory, 'openai') is not values[0]
+    assert len(builds) == 2
+
+    (row,) = [r for r in registry.stats() if r['key'] == 'mock']
+    assert row['resource'] == 'llm' and row['hits'] == 7
+
+
+def test_stats_include_resource_stats_and_clear_by_kind():
+    registry = ResourceRegistry()
+    cache = registry.get('grade_cache', lambda: LRUCache(4), 4)
+    cache.get('missing')
+    registry.get('scraper', object, 'default')
+
+    rows = {r['resource']: r for r in registry.stats()}
+    assert rows['grade_cache']['stats']['misses'] == 1
+    assert 'stats' not in rows['scraper']
+
+    registry.clear('scraper')
+    assert [r['resource'] for r in registry.stats()] == ['grade_cache']
+    assert registry.get('grade_cache', lambda: LRUCache(4), 4) is cache
+
+
+def test_researchers_with_one_config_share_resources(tmp_path):
+    registry = ResourceRegistry()
+    config = dict(llm_provider='mock', grade_cache_size=16, verbosity='quiet', output_dir=str(tmp_path))
+    first = NCSUAdvancedResearcher(config, registry=registry)
+    second = NCSUAdvancedResearcher(dict(config), registry=registry)
+    other = NCSUAdvancedResearcher(dict(config, scrape_delay=0.5), registry=registry)
+    private = NCSUAdvancedResearcher(dict(config))
+
+    assert first.scraper is second.scraper and first.llm_provider is second.llm_provider
+    assert first.grade_cache is second.grade_cache is not None
+    assert other.scraper is not first.scraper
+    assert private.scraper is not first.scraper
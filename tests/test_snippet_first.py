@@ -0,0 +1,67 @@
+"""Snippet-first answering: confident snippets skip page fetches, weak ones fall through to pages"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+
+QUERY = 'student travel reimbursement'
+
+
+# A fresh server per test, so each run's page fetches can be counted
+@pytest.fixture
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+def research(server, tmp_path, **overrides):
+    config = dict(server.researcher_config(), llm_provider='mock', snippet_first=True, snippet_confidence=0.8,
+                  relevance_threshold=0.5, top_k=4, max_pages=4, verbosity='quiet', output_dir=str(tmp_path))
+    config.update(overrides)
+    return NCSUAdvancedResearcher(config).research(QUERY)
+
+
+def page_requests(server):
+    return [path for _, path in server.request_log if not path.startswith('/search')]
+
+
+def test_confident_snippets_answer_without_fetching(server, tmp_path):
+    results = research(server, tmp_path, mock_grade_score=0.9)
+
+    assert results['answer_path'] == 'snippets' and results['final_answer']
+    assert results['snippet_confidence'] == pytest.approx(0.9)
+    assert page_requests(server) == []
+    assert results['pipeline']['mode'] == 'snippets'
+    counters = results['metrics']['counters']
+    assert counters['snippets_graded'] == len(results['search_results']) == len(results['graded_pages'])
+    # Sources are the search results the snippets came from
+    assert {s['url'] for s in results['sources']} <= {r['url'] for r in results['search_results']}
+    assert 'grade' in results['metrics']['llm'] and 'answer' in results['metrics']['llm']
+
+
+def test_weak_snippets_fall_through_to_pages(server, tmp_path):
+    results = research(server, tmp_path, mock_grade_score=0.6)
+
+    assert results['answer_path'] == 'pages' and results['final_answer']
+    assert results['snippet_confidence'] == pytest.approx(0.6)
+    assert len(page_requests(server)) == len(results['extracted_pages']) > 0
+    # Snippet grades plus page grades
+    assert results['metrics']['llm']['grade']['calls'] > results['metrics']['counters']['snippets_graded']
+
+
+@pytest.mark.parametrize('overrides', [{'snippet_first': False}, {'enable_grading': False}])
+def test_snippets_are_not_graded_when_off(server, tmp_path, overrides):
+    results = research(server, tmp_path, mock_grade_score=0.9, **overrides)
+
+    assert results['answer_path'] == 'pages'
+    assert 'snippet_confidence' not in results
+    assert 'snippets_graded' not in results['metrics']['counters']
+    assert page_requests(server)
@@ -0,0 +1,48 @@
+"""Streaming pipeline: concurrent fetches that still respect the per-host delay"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import FixtureServer  # noqa: E402
+from ncsu_advanced_config_base import NCSUAdvancedResearcher  # noqa: E402
+
+QUERY = 'student travel reimbursement'
+
+
+@pytest.fixture
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+def page_fetch_times(server):
+    return sorted(arrived for arrived, path in server.request_log if not path.startswith('/search'))
+
+
+@pytest.mark.parametrize('pipeline_mode', ['streaming', 'sequential'])
+def test_page_fetches_keep_the_scrape_delay(server, tmp_path, pipeline_mode):
+    research = NCSUAdvancedResearcher(dict(
+        server.researcher_config(), llm_provider='mock', top_k=4, max_pages=4, verbosity='quiet',
+        output_dir=str(tmp_path), scrape_delay=0.2, pipeline_mode=pipeline_mode, pipeline_fetch_workers=4))
+    results = research.research(QUERY)
+
+    fetched = page_fetch_times(server)
+    assert len(fetched) == len(results['extracted_pages']) == 4
+    gaps = [b - a for a, b in zip(fetched, fetched[1:])]
+    assert min(gaps) >= 0.18, gaps
+
+
+def test_adaptive_concurrency_replaces_the_delay(server, tmp_path):
+    research = NCSUAdvancedResearcher(dict(
+        server.researcher_config(), llm_provider='mock', top_k=4, max_pages=4, verbosity='quiet',
+        output_dir=str(tmp_path), scrape_delay=5, adaptive_concurrency=True, pipeline_mode='streaming'))
+    research.research(QUERY)
+
+    fetched = page_fetch_times(server)
+    assert len(fetched) == 4 and fetched[-1] - fetched[0] < 2
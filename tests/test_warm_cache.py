@@ -0,0 +1,23 @@
+"""Grouping popular queries into intents for cache warming"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from warm_cache import intent_key, top_intents  # noqa: E402
+
+
+def test_phrasings_of_one_question_share_an_intent():
+    assert intent_key('Parking permit?') == intent_key('parking permits') == 'parking permit'
+    assert intent_key('How do I get a parking permit at NC State?') == 'parking permit'
+    assert intent_key('What is the GPA requirement') != intent_key('What is the GPA')
+
+
+def test_top_intents_pick_the_most_common_phrasing():
+    queries = ['parking permits', 'Parking permit?', 'parking permits', 'library hours', 'Library  hours']
+    intents = top_intents(queries, top=5, min_count=2)
+    assert intents == [
+        {'intent': 'parking permit', 'query': 'parking permits', 'count': 3},
+        {'intent': 'hour library', 'query': 'library hours', 'count': 2},
+    ]
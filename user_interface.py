@@ -11,6 +11,7 @@ import sys
 from pathlib import Path
 from datetime import datetime
 import json
+import time
 import traceback
 
 # Add src to path
@@ -51,7 +52,45 @@ st.set_page_config(
 )
 
 # Import the researcher (after page config)
-from ncsu_advanced_config_base import NCSUAdvancedResearcher
+from ncsu_advanced_config_base import DEFAULT_LLM_MODELS, NCSUAdvancedResearcher
+from utils.history import get_history
+from utils.registry import ResourceRegistry, get_registry
+from utils.jobs import CANCELLED, DONE, FINISHED, QUEUED, JobQueue
+
+HISTORY_PATH = os.path.join('results', 'history.db')
+RESEARCH_WORKERS = int(os.getenv('NCSU_RESEARCH_WORKERS', '2'))
+POLL_SECONDS = 1.0
+
+STAGE_LABELS = {
+    'search': "🔍 **Searching NCSU website...**",
+    'scrape': "📄 **Extracting page content ({done}/{total})...**",
+    'grade': "📊 **Grading relevance ({done}/{total})...**",
+    'filter': "🧹 **Filtering by relevance threshold...**",
+    'answer': "🤖 **Generating answer...**",
+}
+
+
+@st.cache_resource
+def shared_registry() -> ResourceRegistry:
+    """LLM clients, scrapers and caches shared by every session in this server process"""
+    return get_registry()
+
+
+@st.cache_resource
+def research_jobs() -> JobQueue:
+    """Worker pool that runs research for every session in this server process"""
+    registry = shared_registry()
+
+    def run(job, progress):
+        researcher = NCSUAdvancedResearcher(job.config, registry=registry)
+        results = researcher.research(job.query, progress=progress)
+        return {
+            'results': results,
+            'saved_files': researcher.save_results(results),
+            'answer_download': researcher.format_answer(results),
+        }
+
+    return JobQueue(run, workers=RESEARCH_WORKERS)
 
 # Custom CSS for NC State red theme
 st.markdown("""
@@ -176,6 +215,8 @@ if 'results' not in st.session_state:
     st.session_state.results = None
 if 'running' not in st.session_state:
     st.session_state.running = False
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
 
 # Header with logos
 col1, col2, col3 = st.columns([1, 2, 1])
@@ -224,7 +265,7 @@ with st.sidebar:
     
     llm_model = st.text_input(
         "Model",
-        value="gpt-4.1-mini" if llm_provider == "openai" else "claude-3-sonnet-20240229"
+        value=DEFAULT_LLM_MODELS.get(llm_provider, "mock-model")
     )
     
     llm_temperature = st.slider(
@@ -245,6 +286,47 @@ with st.sidebar:
         help="Maximum length of the generated answer"
     )
     
+    llm_fallback = st.selectbox(
+        "Fallback Provider",
+        ["none", "anthropic", "openai"],
+        index=0,
+        help="Backup provider raced against the main one when it is slow, and used when it fails"
+    )
+    
+    llm_fallback_model = st.text_input(
+        "Fallback Model",
+        value=DEFAULT_LLM_MODELS.get(llm_fallback, ""),
+        disabled=llm_fallback == "none",
+        help="Model the fallback provider is called with"
+    )
+    
+    llm_hedge_after = st.number_input(
+        "Hedge After (seconds)",
+        min_value=0.5,
+        max_value=60.0,
+        value=5.0,
+        step=0.5,
+        disabled=llm_fallback == "none",
+        help="How long to wait on the main provider before also asking the fallback"
+    )
+    
+    grading_model = st.text_input(
+        "Grading Model",
+        value="",
+        placeholder="Same as answer model",
+        help="Cheaper model from the same provider for the per-page relevance grades"
+    )
+    
+    grade_escalation_margin = st.slider(
+        "Escalation Margin",
+        min_value=0.0,
+        max_value=0.5,
+        value=0.1,
+        step=0.05,
+        disabled=not grading_model.strip(),
+        help="Re-grade pages scoring this close to the relevance threshold with the answer model (0 = never)"
+    )
+    
     st.markdown("---")
     
     # Search Settings
@@ -282,7 +364,18 @@ with st.sidebar:
     with st.expander("⚙️ Advanced Settings"):
         enable_grading = st.checkbox("Enable Content Grading", value=True, help="Use LLM to grade content relevance")
         selenium_enabled = st.checkbox("Enable Selenium", value=True, help="For JavaScript-heavy pages")
-        enhanced_extraction = st.checkbox("Enhanced Extraction", value=True, help="More comprehensive content extraction")
+        enhanced_extraction = st.checkbox("Enhanced Extraction", value=True, help="Keep only each page's main content, dropping menus, sidebars and banners")
+        streaming_pipeline = st.checkbox("Streaming Pipeline", value=False, help="Fetch pages concurrently and grade each one as soon as it arrives")
+        adaptive_concurrency = st.checkbox("Adaptive Concurrency", value=False, help="Fetch pages in parallel per host, backing off when a server slows down or returns errors")
+        snippet_first = st.checkbox("Snippet-First Answers", value=False, help="Answer from the search result snippets when they grade well enough, fetching pages only otherwise")
+        early_stop_pages = st.number_input(
+            "Stop After N Relevant Pages",
+            min_value=0,
+            max_value=30,
+            value=0,
+            step=1,
+            help="Stop fetching and grading once this many pages meet the relevance threshold (0 = off)"
+        )
         
         st.markdown("---")
         st.markdown("**📊 Additional Options:**")
@@ -308,6 +401,78 @@ with st.sidebar:
             value=30,
             step=10
         )
+    
+    # Research History
+    with st.expander("🕘 Research History"):
+        history_query = st.text_input("Search past answers", placeholder="e.g., parking permit")
+        if history_query:
+            history = get_history(HISTORY_PATH)
+            matches = history.search_runs(history_query, limit=5)
+            if not matches:
+                st.caption("No past research matches.")
+            for match in matches:
+                st.markdown(f"**{match['query']}**  \n{match['snippet']}")
+                st.caption(match['timestamp'] or '')
+    
+    # Shared resources
+    with st.expander("🧰 Shared Resources"):
+        resources = shared_registry().stats()
+        if not resources:
+            st.caption("Nothing built yet - resources are created on the first research run.")
+        else:
+            st.dataframe(
+                [
+                    {
+                        'Resource': row['resource'],
+                        'Reused': row['hits'],
+                        'Init (ms)': round(row['init_seconds'] * 1000, 1),
+                        'Cache hit rate': row.get('stats', {}).get('hit_rate', ''),
+                    }
+                    for row in resources
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+            hosts = {host: limits for row in resources if row['resource'] == 'scraper'
+                     for host, limits in row.get('stats', {}).get('hosts', {}).items()}
+            if hosts:
+                st.caption("Per-host fetch concurrency")
+                st.dataframe(
+                    [
+                        {
+                            'Host': host,
+                            'Limit': limits['limit'],
+                            'In flight': limits['in_flight'],
+                            'p50 (s)': limits['p50_seconds'],
+                            'p95 (s)': limits['p95_seconds'],
+                            'Backoffs': limits['decreases'],
+                        }
+                        for host, limits in hosts.items()
+                    ],
+                    use_container_width=True,
+                    hide_index=True
+                )
+            llm_stats = [(row['stats']['providers'], row['stats']['hedge_after_seconds']) for row in resources
+                         if row['resource'] == 'llm' and 'providers' in row.get('stats', {})]
+            for providers, hedge_after in llm_stats:
+                st.caption(f"LLM providers (hedging after {hedge_after:.1f}s)")
+                st.dataframe(
+                    [
+                        {
+                            'Provider': label,
+                            'Calls': counts['calls'],
+                            'Wins': counts['wins'],
+                            'Errors': counts['errors'],
+                            'Tokens': counts['prompt_tokens'] + counts['completion_tokens'],
+                            'p50 (s)': counts['p50_seconds'],
+                            'p95 (s)': counts['p95_seconds'],
+                            'p99 (s)': counts['p99_seconds'],
+                        }
+                        for label, counts in providers.items()
+                    ],
+                    use_container_width=True,
+                    hide_index=True
+                )
 
 # Main content area
 st.markdown("### 📝 Enter Your Research Query")
@@ -344,8 +509,8 @@ col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     search_button = st.button("🔍 Start Research", use_container_width=True, type="primary")
 
-# Perform research
-if search_button and query:
+# Queue research
+if search_button and query and not st.session_state.job_id:
     st.session_state.running = True
     
     # Create config
@@ -355,69 +520,89 @@ if search_button and query:
         'llm_model': llm_model,
         'llm_temperature': llm_temperature,
         'llm_max_tokens': llm_max_tokens,
+        'llm_fallbacks': [] if llm_fallback == 'none' else [llm_fallback],
+        'llm_fallback_model': llm_fallback_model.strip() or None,
+        'llm_hedge_after': llm_hedge_after,
+        'grade_llm': {'llm_model': grading_model.strip()} if grading_model.strip() else None,
+        'grade_escalation_margin': grade_escalation_margin or None,
         'top_k': top_k,
         'max_pages': max_pages,
         'relevance_threshold': relevance_threshold,
         'enable_grading': enable_grading,
         'selenium_enabled': selenium_enabled,
         'enhanced_extraction': enhanced_extraction,
+        'pipeline_mode': 'streaming' if streaming_pipeline else 'sequential',
+        'adaptive_concurrency': adaptive_concurrency,
+        'snippet_first': snippet_first,
+        'verbosity': 'normal',
+        'early_stop_pages': early_stop_pages or None,
         'min_content_length': min_content_length,
         'max_content_length': max_content_length,
         'output_dir': 'results',
+        'history_path': HISTORY_PATH,
+        'grade_cache_size': 512,
         'timeout': timeout
     }
-    
-    # Progress tracking
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    try:
-        # Initialize researcher
-        status_text.markdown("🔧 **Initializing researcher...**")
-        progress_bar.progress(10)
-        researcher = NCSUAdvancedResearcher(config)
-        
-        # Conduct research
-        status_text.markdown("🔍 **Searching NCSU website...**")
-        progress_bar.progress(30)
-        
-        with st.spinner("Conducting research... This may take a few minutes."):
-            results = researcher.research(query)
-        
-        status_text.markdown("✅ **Research complete!**")
-        progress_bar.progress(100)
-        
-        # Save results
-        saved_files = researcher.save_results(results)
-        
-        # Store in session state
-        st.session_state.results = results
-        st.session_state.saved_files = saved_files
+    st.session_state.job_id = research_jobs().submit(query, config).id
+
+# Poll the running job; the research itself happens on a worker thread
+if st.session_state.job_id:
+    jobs = research_jobs()
+    job = jobs.get(st.session_state.job_id)
+    if job is None:
+        # Dropped from the queue's retention window (e.g. after a very long idle)
+        st.session_state.job_id = None
         st.session_state.running = False
-        
-        # Check if we got any results
-        if not results.get('search_results') or len(results.get('search_results', [])) == 0:
-            st.warning("⚠️ **No search results found.** This might be due to:")
-            st.markdown("""
-            - Search functionality temporarily unavailable
-            - Network connectivity issues  
-            - The query might need to be rephrased
-            
-            **Suggestions:**
-            - Try rephrasing your query with more specific keywords
-            - Check your internet connection
-            - Try again in a few moments
-            """)
+    elif job.status not in FINISHED:
+        snapshot = job.snapshot()
+        progress_bar = st.progress(snapshot['fraction'])
+        status_text = st.empty()
+        if job.status == QUEUED:
+            status_text.markdown(f"⏳ **Waiting for a research worker** "
+                                 f"({jobs.position(job.id)} ahead of you)")
+        elif job.cancel_event.is_set():
+            status_text.markdown("⏹️ **Cancelling...**")
+        elif snapshot['last_event']:
+            event = snapshot['last_event']
+            status_text.markdown(STAGE_LABELS.get(event['stage'], "🔍 **Researching...**").format(**event))
         else:
-            st.success("🎉 Research completed successfully!")
-        
-    except Exception as e:
-        st.error(f"❌ Error during research: {str(e)}")
+            status_text.markdown("🔧 **Initializing researcher...**")
+        if st.button("⏹️ Cancel Research"):
+            jobs.cancel(job.id)
+        time.sleep(POLL_SECONDS)
+        st.rerun()
+    else:
+        st.session_state.job_id = None
         st.session_state.running = False
-        import traceback
-        with st.expander("🔍 Error Details (for debugging)"):
-            st.code(traceback.format_exc())
-        st.info("💡 **Tip:** Try disabling Selenium in Advanced Settings if you're experiencing issues.")
+        if job.status == DONE:
+            results = job.result['results']
+            st.session_state.results = results
+            st.session_state.saved_files = job.result['saved_files']
+            st.session_state.answer_download = job.result['answer_download']
+            st.progress(1.0)
+            
+            # Check if we got any results
+            if not results.get('search_results') or len(results.get('search_results', [])) == 0:
+                st.warning("⚠️ **No search results found.** This might be due to:")
+                st.markdown("""
+                - Search functionality temporarily unavailable
+                - Network connectivity issues  
+                - The query might need to be rephrased
+                
+                **Suggestions:**
+                - Try rephrasing your query with more specific keywords
+                - Check your internet connection
+                - Try again in a few moments
+                """)
+            else:
+                st.success("🎉 Research completed successfully!")
+        elif job.status == CANCELLED:
+            st.info("⏹️ Research cancelled.")
+        else:
+            st.error(f"❌ Error during research: {job.error}")
+            with st.expander("🔍 Error Details (for debugging)"):
+                st.code(job.traceback or job.error)
+            st.info("💡 **Tip:** Try disabling Selenium in Advanced Settings if you're experiencing issues.")
 
 # Display results
 if st.session_state.results:
@@ -475,6 +660,12 @@ if st.session_state.results:
 
     # Get answer text
     answer_text = results.get('final_answer', 'No answer generated')
+    if results.get('answer_error'):
+        st.warning(f"⚠️ The language model failed to answer: {results['answer_error']}")
+    if results.get('answer_path') == 'snippets':
+        st.caption(f"⚡ Answered from search snippets (best snippet grade {results['snippet_confidence']:.2f}) - no pages were fetched")
+    if results.get('answer_reused'):
+        st.caption(f"♻️ Stored answer from {results['answer_reused'][:16].replace('T', ' ')}")
     
     # Show helpful message if no answer
     if not answer_text or answer_text == 'No answer generated':
@@ -516,18 +707,16 @@ For information about the Textiles College, you can visit: https://textiles.ncsu
     # Download answer
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
-        if 'saved_files' in st.session_state:
-            answer_file = st.session_state.saved_files.get('answer')
-            if answer_file and os.path.exists(answer_file):
-                with open(answer_file, 'r', encoding='utf-8') as f:
-                    answer_content = f.read()
-                st.download_button(
-                    label="📥 Download Answer",
-                    data=answer_content,
-                    file_name=f"ncsu_research_answer_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                    mime="text/plain",
-                    use_container_width=True
-                )
+        # Served from memory: the saved copy may still be queued for the background writer
+        answer_content = st.session_state.get('answer_download')
+        if answer_content:
+            st.download_button(
+                label="📥 Download Answer",
+                data=answer_content,
+                file_name=f"ncsu_research_answer_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                mime="text/plain",
+                use_container_width=True
+            )
     
     # Sources
     st.markdown("### 📚 Sources")
@@ -543,6 +732,22 @@ For information about the Textiles College, you can visit: https://textiles.ncsu
             **Word Count:** {source['word_count']:,} words
             """)
     
+    # Stage timings
+    metrics = results.get('metrics')
+    if metrics:
+        with st.expander(f"⏱️ Performance ({metrics.get('total_seconds', 0):.1f}s total)"):
+            stage_rows = [
+                {'Stage': name, 'Spans': stage['count'], 'Seconds': round(stage['seconds'], 3),
+                 'Slowest (s)': round(stage['max_seconds'], 3)}
+                for name, stage in metrics.get('stages', {}).items()
+            ]
+            st.table(stage_rows)
+            for stage, usage in metrics.get('llm', {}).items():
+                st.markdown(
+                    f"**LLM {stage}:** {usage['calls']} calls, "
+                    f"{usage['prompt_tokens']:,} prompt / {usage['completion_tokens']:,} completion tokens"
+                )
+    
     # Detailed data
     with st.expander("📊 View Detailed Research Data"):
         st.json(results)
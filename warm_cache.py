@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+NCSU Cache Warming
+==================
+
+Finds the questions people asked most over the last few days and researches
+them ahead of time, so the search results, pages, grades and answers they
+need are already in the research history when the next busy period starts.
+Meant to run from cron during off-peak hours, e.g.:
+
+    0 4 * * * cd /srv/ncsu && python warm_cache.py --top 50 --max-llm-tokens 400000
+
+Queries come from the research history (every run is indexed there) and/or
+the saved results in ``results/``. Phrasings of the same question ("Parking
+permit?", "parking permits") are grouped into one intent by their non-stopword
+terms and the most common phrasing is warmed.
+
+LLM spend is capped per warming run: each query's prompt and completion
+tokens are added up and a query is only started while the budget left covers
+the most expensive query warmed so far, so a run overshoots by at most one
+query. Warming runs are not indexed as runs
+themselves, so they don't make their own queries look popular.
+
+Answers are stored for every run; set ``history_answer_max_age_hours`` in the
+serving config to answer repeated questions from them.
+
+Usage:
+    python warm_cache.py --top 50 --days 7 --max-llm-tokens 400000
+    python warm_cache.py --from-results results --min-count 3 --dry-run
+    python warm_cache.py --config serve.yaml --skip-fresh-hours 12 --json warm_summary.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from ncsu_advanced_config_base import NCSUAdvancedResearcher
+from utils.config import load_config
+from utils.context_packer import STOPWORDS
+from utils.history import get_history, normalize_query
+from utils.logger import configure_logging, correlation_scope
+from utils.persistence import read_results
+from utils.registry import get_registry
+
+
+def intent_key(query: str) -> str:
+    """Sorted distinct content words of ``query``; phrasings of one question share a key"""
+    terms = {t for t in normalize_query(query).split() if t not in STOPWORDS}
+    # Rough plural folding so "permit" and "permits" group together
+    terms = {t[:-1] if len(t) > 3 and t.endswith('s') and not t.endswith('ss') else t for t in terms}
+    return ' '.join(sorted(terms))
+
+
+def queries_from_history(history_path: str, since: float) -> List[str]:
+    return [query for query, _ in get_history(history_path).recent_queries(since)]
+
+
+def queries_from_results(directory: str, since: float) -> List[str]:
+    """Queries of saved runs (results-* segments and legacy data_*.json files) newer than ``since``"""
+    queries = []
+    for path in sorted(Path(directory).glob('results-*.jsonl*')) + sorted(Path(directory).glob('data_*.json')):
+        if path.stat().st_mtime < since:
+            continue
+        try:
+            if path.name.startswith('data_'):
+                with open(path, 'r', encoding='utf-8') as f:
+                    records: Iterable[Dict[str, Any]] = [json.load(f)]
+            else:
+                records = read_results(path)
+            for record in records:
+                timestamp = record.get('timestamp')
+                if timestamp and datetime.fromisoformat(timestamp).timestamp() < since:
+                    continue
+                if record.get('query'):
+                    queries.append(record['query'])
+        except (OSError, ValueError, ImportError) as e:
+            print(f"⚠️  Skipping {path}: {e}", file=sys.stderr)
+    return queries
+
+
+def top_intents(queries: Iterable[str], top: int, min_count: int = 1) -> List[Dict[str, Any]]:
+    """The ``top`` most asked intents as ``{'intent', 'query', 'count'}``, most asked first
+
+    ``query`` is the intent's most common phrasing (earliest seen on ties).
+    """
+    phrasings: Dict[str, Counter] = defaultdict(Counter)
+    for query in queries:
+        query = ' '.join(query.split())
+        key = intent_key(query)
+        if key:
+            phrasings[key][query] += 1
+    intents = [
+        {'intent': key, 'query': counts.most_common(1)[0][0], 'count': sum(counts.values())}
+        for key, counts in phrasings.items()
+    ]
+    intents = [i for i in intents if i['count'] >= min_count]
+    intents.sort(key=lambda i: i['count'], reverse=True)
+    return intents[:top]
+
+
+class CacheWarmer:
+    """Researches popular queries one at a time within an LLM token budget"""
+
+    def __init__(self, base_config: Dict[str, Any], max_llm_tokens: Optional[int] = None,
+                 skip_fresh_hours: Optional[float] = None, max_minutes: Optional[float] = None):
+        self.base_config = base_config
+        self.max_llm_tokens = max_llm_tokens
+        self.skip_fresh_hours = skip_fresh_hours
+        self.max_minutes = max_minutes
+        self.registry = get_registry()
+        self.counts = {'warmed': 0, 'no_results': 0, 'failed': 0, 'fresh': 0, 'over_budget': 0, 'out_of_time': 0}
+        self.llm_tokens = 0
+        self.most_tokens = 0
+        self.records: List[Dict[str, Any]] = []
+
+    def config(self) -> Dict[str, Any]:
+        return dict(
+            self.base_config,
+            verbosity='quiet',
+            # Search again rather than warming from yesterday's results, and always
+            # write a new answer (never serve a stored one back to ourselves)
+            history_search_max_age_hours=0,
+            history_answer_max_age_hours=None,
+            history_record_runs=False,
+        )
+
+    def warm_one(self, researcher: NCSUAdvancedResearcher, intent: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        record = {'query': intent['query'], 'count': intent['count']}
+        researcher.last_metrics = None
+        try:
+            with correlation_scope(f"warm-{intent['intent'][:40]}"):
+                results = researcher.research(intent['query'])
+            record.update(status='warmed', sources=len(results['sources']), answer_path=results.get('answer_path'))
+            if not results['search_results']:
+                # Nothing to warm, but nothing went wrong either
+                record['status'] = 'no_results'
+            elif results.get('answer_error') or not results.get('answer_path'):
+                record.update(status='failed', error=results.get('answer_error') or "no answer generated")
+        except Exception as e:
+            record.update(status='failed', error=f"{type(e).__name__}: {e}")
+        # Taken from the run's metrics so calls made before a failure still count against the budget
+        metrics = researcher.last_metrics.to_dict() if researcher.last_metrics is not None else {}
+        record['llm_tokens'] = sum(usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0)
+                                   for usage in metrics.get('llm', {}).values())
+        record['seconds'] = round(time.perf_counter() - started, 3)
+        return record
+
+    def run(self, intents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if not self.base_config.get('history_path'):
+            raise ValueError("cache warming needs 'history_path'; that is where the warmed caches are kept")
+        researcher = NCSUAdvancedResearcher(self.config(), registry=self.registry)
+        started = time.perf_counter()
+        for position, intent in enumerate(intents, 1):
+            status = None
+            if self.max_minutes is not None and time.perf_counter() - started > self.max_minutes * 60:
+                status = 'out_of_time'
+            elif self.max_llm_tokens is not None and self.llm_tokens + self.most_tokens > self.max_llm_tokens:
+                status = 'over_budget'
+            elif self.skip_fresh_hours is not None and researcher.stored_answer(intent['query'], self.skip_fresh_hours):
+                status = 'fresh'
+            if status:
+                self.counts[status] += 1
+                self.records.append({'query': intent['query'], 'count': intent['count'], 'status': status})
+                continue
+
+            record = self.warm_one(researcher, intent)
+            self.records.append(record)
+            self.counts[record['status']] += 1
+            self.llm_tokens += record['llm_tokens']
+            self.most_tokens = max(self.most_tokens, record['llm_tokens'])
+            icon = {'warmed': '✅', 'no_results': '🔍'}.get(record['status'], '❌')
+            print(f"{icon} [{position}/{len(intents)}] {record['query']} (asked {intent['count']}x, "
+                  f"{record['llm_tokens']:,} tokens, {record['seconds']:.1f}s)", file=sys.stderr)
+        return self.summary(time.perf_counter() - started)
+
+    def summary(self, wall: float) -> Dict[str, Any]:
+        return {
+            'queries': dict(self.counts),
+            'llm_tokens': self.llm_tokens,
+            'max_llm_tokens': self.max_llm_tokens,
+            'wall_seconds': round(wall, 3),
+            'records': self.records,
+            'history': get_history(self.base_config['history_path']).stats(),
+        }
+
+
+def collect_queries(args, config: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Queries from the requested sources, and a note on where they came from"""
+    since = time.time() - args.days * 86400
+    queries, sources = [], []
+    if args.from_results:
+        found = queries_from_results(args.from_results, since)
+        queries += found
+        sources.append(f"{len(found)} from {args.from_results}")
+    if not args.from_results or args.history:
+        history_path = config.get('history_path')
+        if not history_path or not os.path.exists(history_path):
+            print(f"⚠️  No research history at {history_path}", file=sys.stderr)
+        else:
+            found = queries_from_history(history_path, since)
+            queries += found
+            sources.append(f"{len(found)} from {history_path}")
+    return queries, sources
+
+
+def print_summary(summary: Dict[str, Any]):
+    counts = summary['queries']
+    print(f"\n🔥 CACHE WARMING SUMMARY")
+    print("=" * 70)
+    print(f"✅ {counts['warmed']} warmed | 🔍 {counts['no_results']} no search results | "
+          f"❌ {counts['failed']} failed | ♻️  {counts['fresh']} still fresh | "
+          f"💸 {counts['over_budget']} over budget | ⏰ {counts['out_of_time']} out of time")
+    budget = f" of {summary['max_llm_tokens']:,}" if summary['max_llm_tokens'] is not None else ""
+    print(f"🤖 LLM tokens: {summary['llm_tokens']:,}{budget} in {summary['wall_seconds']:.1f}s")
+    history = summary['history']
+    print(f"🕘 History: {history['searches']} searches | {history['pages']} pages | "
+          f"{history['grades']} grades | {history['answers']} answers")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Research the most popular recent queries ahead of time")
+    parser.add_argument('--history', action='store_true',
+                        help="Read queries from the research history (the default unless --from-results is given)")
+    parser.add_argument('--from-results', metavar='DIR', help="Read queries from saved results in this directory")
+    parser.add_argument('--days', type=float, default=7, help="How far back to look for queries")
+    parser.add_argument('--top', type=int, default=25, help="Number of most asked intents to warm")
+    parser.add_argument('--min-count', type=int, default=2, help="Ignore intents asked fewer times than this")
+    parser.add_argument('--max-llm-tokens', type=int, help="LLM token budget (prompt + completion) for the run")
+    parser.add_argument('--max-minutes', type=float, help="Stop starting new queries after this long")
+    parser.add_argument('--skip-fresh-hours', type=float,
+                        help="Skip intents with a stored answer newer than this")
+    parser.add_argument('--config', help="YAML or JSON file with researcher config (use the serving config)")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="Extra researcher config (value parsed as JSON when possible)")
+    parser.add_argument('--dry-run', action='store_true', help="List the intents that would be warmed and exit")
+    parser.add_argument('--json', help="Write the summary to this file")
+    parser.add_argument('--log-format', choices=('text', 'json'), default='text')
+    args = parser.parse_args()
+
+    configure_logging(args.log_format)
+    config = load_config(args.config, args.set)
+    queries, sources = collect_queries(args, config)
+    intents = top_intents(queries, args.top, args.min_count)
+    print(f"📋 {len(queries)} queries ({', '.join(sources) or 'no sources'}) -> "
+          f"{len(intents)} intents to warm", file=sys.stderr)
+
+    if args.dry_run:
+        for intent in intents:
+            print(f"{intent['count']:>6}  {intent['query']}")
+        return
+
+    summary = CacheWarmer(config, max_llm_tokens=args.max_llm_tokens, skip_fresh_hours=args.skip_fresh_hours,
+                          max_minutes=args.max_minutes).run(intents)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Summary written to {args.json}")
+    # Queries without search results are a normal outcome, not a failed run
+    sys.exit(1 if summary['queries']['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()